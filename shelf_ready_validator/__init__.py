@@ -1,13 +1,21 @@
 import click
-import pandas as pd
-from pydantic import ValidationError
+import os.path
 from rich.console import Console
 from rich.theme import Theme
 from functools import update_wrapper
-from shelf_ready_validator.models import MonographRecord, OtherMaterialRecord
-from shelf_ready_validator.errors import format_errors
-from shelf_ready_validator.sheet import write_sheet
-from shelf_ready_validator.connect import ftpConnection, sftpConnection
+from itertools import count
+from shelf_ready_validator import profiling
+from shelf_ready_validator.batch import BatchSummary, find_files
+from shelf_ready_validator.cache import ResultCache
+from shelf_ready_validator.index import find_records, load_index, read_indexed_records
+from shelf_ready_validator.output import OUTPUT_FORMATS, get_result_printer
+from shelf_ready_validator.pipeline import PIPELINES
+from shelf_ready_validator.report import (
+    REPORT_FORMATS,
+    AsyncReportWriter,
+    get_report_writer,
+    report_chunks,
+)
 from shelf_ready_validator.translate import VendorRecord, read_marc_records
 from datetime import datetime
 
@@ -33,31 +41,246 @@ console = Console(tab_size=5, theme=theme)
     "--file",
     "file",
     prompt="Which file would like to open?",
-    help="The MARC file you would like to open.",
+    help="The MARC file you would like to open. Can also be a directory, a glob "
+    "pattern or a comma-separated list to validate several files in one pass.",
+)
+@click.option(
+    "--workers",
+    "workers",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of processes to use when validating records.",
+)
+@click.option(
+    "--record",
+    "record_number",
+    type=click.IntRange(min=1),
+    help="Only read the record at this position in the file.",
+)
+@click.option(
+    "--control-no",
+    "control_no",
+    help="Only read records with this control number (001).",
+)
+@click.option(
+    "--reader",
+    "backend",
+    default="sierra",
+    show_default=True,
+    type=click.Choice(["sierra", "mmap"]),
+    help="How to read the MARC file. mmap reads large files with less memory.",
+)
+@click.option(
+    "--no-cache",
+    "no_cache",
+    is_flag=True,
+    default=False,
+    help="Validate every record instead of reusing results for unchanged records.",
+)
+@click.option(
+    "--pipeline",
+    "pipeline",
+    default="sync",
+    show_default=True,
+    type=click.Choice(PIPELINES),
+    help="async reads, validates and exports records at the same time.",
+)
+@click.option(
+    "--quiet",
+    "quiet",
+    is_flag=True,
+    default=False,
+    help="Do not print anything for each record; only print summaries.",
+)
+@click.option(
+    "--output",
+    "output_format",
+    default="text",
+    show_default=True,
+    type=click.Choice(OUTPUT_FORMATS),
+    help="json writes a line of JSON for each record to stdout without formatting.",
+)
+@click.option(
+    "--profile",
+    "profile",
+    is_flag=True,
+    default=False,
+    help="Print the time spent in each stage of the run when it finishes.",
+)
+@click.option(
+    "--profile-json",
+    "profile_json",
+    type=click.Path(dir_okay=False),
+    help="Write the --profile timings to a JSON file. Implies --profile.",
+)
+@click.option(
+    "--profile-stats",
+    "profile_stats",
+    type=click.Path(dir_okay=False),
+    help="Save cProfile statistics of the main thread to a file for pstats. "
+    "Implies --profile.",
 )
 @click.pass_context
-def cli(ctx, vendor, file):
+def cli(
+    ctx,
+    vendor,
+    file,
+    workers,
+    record_number,
+    control_no,
+    backend,
+    no_cache,
+    pipeline,
+    quiet,
+    output_format,
+    profile,
+    profile_json,
+    profile_stats,
+):
     """
     Read and validate MARC records
     """
+    files = find_files(file)
+    if len(files) == 1:
+        filename = os.path.basename(files[0])
+    elif files:
+        filename = "batch"
+    else:
+        filename = f"{file.split('/')[-1]}"
+    printer = get_result_printer(output_format, console, quiet)
     ctx.obj = {
-        "file": f"{file.split('/')[-1]}",
+        "file": filename,
         "filepath": file,
+        "files": files,
         "vendor_name": vendor,
+        "workers": workers,
+        "backend": backend,
+        "record_numbers": None,
+        "connections": None,
+        "use_cache": not no_cache,
+        "cache": None,
+        "pipeline": pipeline,
+        "printer": printer,
     }
+    ctx.call_on_close(printer.close)
+    ctx.call_on_close(lambda: close_connections(ctx.obj))
+    ctx.call_on_close(lambda: close_cache(ctx.obj))
+    if profile or profile_json or profile_stats:
+        start_profile(ctx, profile_json, profile_stats)
+
+
+def start_profile(ctx, profile_json, profile_stats):
+    """
+    Starts timing each stage of the run. When the commands finish, prints a
+    summary table and writes the JSON metrics and cProfile statistics.
+    """
+    profiler = profiling.enable()
+    stats = None
+    if profile_stats:
+        import cProfile
+
+        stats = cProfile.Profile()
+        stats.enable()
+
+    def finish_profile():
+        if stats is not None:
+            stats.disable()
+            stats.dump_stats(profile_stats)
+        profiling.disable()
+        for line in profiler.lines():
+            ctx.obj["printer"].message(line)
+        if profile_json:
+            profiler.write_json(profile_json)
+
+    ctx.call_on_close(finish_profile)
+
+
+def get_cache(ctx):
+    """
+    Opens the validation result cache the first time it is needed.
+    Returns None if --no-cache was used.
+    """
+    if ctx["use_cache"] and ctx["cache"] is None:
+        ctx["cache"] = ResultCache()
+    return ctx["cache"]
+
+
+def close_cache(ctx):
+    if ctx["cache"] is not None:
+        ctx["cache"].close()
+
+
+def get_connection(ctx):
+    """
+    Returns the connection to the vendor's site. The FTP/SFTP clients are only
+    imported the first time a command needs a connection.
+    """
+    if ctx["connections"] is None:
+        from shelf_ready_validator.connect import ConnectionManager
+
+        ctx["connections"] = ConnectionManager()
+    return ctx["connections"].get(ctx["vendor_name"])
+
+
+def close_connections(ctx):
+    """
+    Prints how many times each vendor site was logged in to and closes the
+    connections that were opened by the commands
+    """
+    if ctx["connections"] is None:
+        return
+    for line in ctx["connections"].summary():
+        ctx["printer"].message(line)
+    ctx["connections"].close()
 
 
 @cli.result_callback()
-def process_commands(processors, vendor, file):
+@click.pass_obj
+def process_commands(
+    ctx,
+    processors,
+    vendor,
+    file,
+    workers,
+    record_number,
+    control_no,
+    backend,
+    no_cache,
+    pipeline,
+    quiet,
+    output_format,
+    profile,
+    profile_json,
+    profile_stats,
+):
     """
     Creates iterator for all records in a MARC file.
+    When a record number or control number is given, uses the file's index to
+    read only the matching records.
+    When --file names more than one file, the validate commands read the files
+    themselves (see validate_input).
     Runs record through each function that is called by the command input.
     Return a TypeError if a command is called that does not return a value.
     """
-    if ".mrc" in file:
-        reader = read_marc_records(file)
+    files = ctx["files"]
+    if len(files) > 1:
+        if record_number or control_no:
+            raise click.UsageError(
+                "--record and --control-no can only be used with a single file"
+            )
+        reader = ()
+    elif files and (record_number or control_no):
+        entries = find_records(load_index(files[0]), record_number, control_no)
+        if not entries:
+            raise click.ClickException(f"No matching records found in {files[0]}")
+        ctx["record_numbers"] = [entry.record_number for entry in entries]
+        reader = read_indexed_records(files[0], entries)
+    elif files:
+        reader = read_marc_records(files[0], backend)
     else:
         reader = ()
+    reader = profiling.timed("read", reader)
     for processor in processors:
         reader = processor(reader)
     for _ in reader:
@@ -78,6 +301,55 @@ def processor(f):
     return update_wrapper(new_func, f)
 
 
+def numbered_records(ctx, reader):
+    """
+    Pairs each record with its position in the file.
+    """
+    if ctx["record_numbers"] is not None:
+        return zip(ctx["record_numbers"], reader)
+    return zip(count(1), reader)
+
+
+def is_batch(ctx):
+    """
+    Checks if --file names more than one MARC file
+    """
+    return len(ctx["files"]) > 1
+
+
+def require_single_file(ctx, command):
+    """
+    Raises a UsageError if --file names more than one MARC file
+    """
+    if is_batch(ctx):
+        raise click.UsageError(f"{command} can only be used with a single file")
+
+
+def validate_input(ctx, reader):
+    """
+    Validates the records from reader or, when --file names more than one
+    file, every record in every file through a single work queue.
+    Results for records that have not changed since they were last validated
+    are read from the result cache.
+    """
+    from shelf_ready_validator.validate import validate_files, validate_records
+
+    if is_batch(ctx):
+        return validate_files(
+            ctx["files"],
+            ctx["workers"],
+            backend=ctx["backend"],
+            cache=get_cache(ctx),
+            pipeline=ctx["pipeline"],
+        )
+    return validate_records(
+        numbered_records(ctx, reader),
+        ctx["workers"],
+        cache=get_cache(ctx),
+        pipeline=ctx["pipeline"],
+    )
+
+
 def generator(f):
     """Similar to the :func:`processor` but passes through old values
     unchanged and does not pass through the values as parameter.
@@ -98,13 +370,7 @@ def list_vendor_files(ctx):
     """
     Lists all files on vendor FTP/SFTP site.
     """
-    match ctx["vendor_name"]:
-        case "eastview":
-            vendor_connect = sftpConnection(ctx["vendor_name"])
-        case "leila":
-            vendor_connect = ftpConnection(ctx["vendor_name"])
-        case _:
-            raise ValueError(f"Missing FTP/SFTP credentials for {ctx['vendor_name']}")
+    vendor_connect = get_connection(ctx)
     vendor_connect.list_all_files()
     yield ctx["vendor_name"]
 
@@ -116,45 +382,42 @@ def list_recent_files(ctx):
     """
     Lists files on vendor FTP/SFTP site that were created in the last week.
     """
-    match ctx["vendor_name"]:
-        case "eastview":
-            vendor_connect = sftpConnection(ctx["vendor_name"])
-        case "leila":
-            vendor_connect = ftpConnection(ctx["vendor_name"])
-        case _:
-            raise ValueError(f"Missing FTP/SFTP credentials for {ctx['vendor_name']}")
+    vendor_connect = get_connection(ctx)
     vendor_connect.list_recent_records()
     yield ctx["vendor_name"]
 
 
 @cli.command("get-recent-files", short_help="get recent records via sftp")
+@click.option(
+    "--max-concurrency",
+    "max_concurrency",
+    default=4,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of files to download at a time.",
+)
 @click.pass_obj
 @generator
-def get_recent_files(ctx):
+def get_recent_files(ctx, max_concurrency):
     """
     Retrieves records from vendor FTP/SFTP site that were created in the last week.
+    Downloads up to max_concurrency files at a time.
     """
-    match ctx["vendor_name"]:
-        case "eastview":
-            vendor_connect = sftpConnection(ctx["vendor_name"])
-        case "leila":
-            vendor_connect = ftpConnection(ctx["vendor_name"])
-        case _:
-            raise ValueError(f"Missing FTP/SFTP credentials for {ctx['vendor_name']}")
-    vendor_connect.get_recent_records()
+    vendor_connect = get_connection(ctx)
+    vendor_connect.get_recent_records(max_concurrency)
     yield ctx["vendor_name"]
 
 
 @cli.command("read", short_help="read MARC records")
 @processor
-def read_marc(reader):
+@click.pass_obj
+def read_marc(ctx, reader):
     """
     Prints MARC records from file one-by-one
     """
-    n = 0
+    require_single_file(ctx, "read")
     while True:
-        for record in reader:
-            n += 1
+        for n, record in numbered_records(ctx, reader):
             console.print(f"Printing record [record]#{n}[/]")
             console.print(record)
             yield record
@@ -165,15 +428,15 @@ def read_marc(reader):
 
 @cli.command("read-input", short_help="print records as dictionary")
 @processor
-def read_input(reader):
+@click.pass_obj
+def read_input(ctx, reader):
     """
     Converts MARC record to dict input that is used by validator
     Prints dict to terminal
     """
-    n = 0
+    require_single_file(ctx, "read-input")
     while True:
-        for record in reader:
-            n += 1
+        for n, record in numbered_records(ctx, reader):
             r = VendorRecord(record)
             converted_record = r.dict_input
             console.print(f"Printing record [record]#{n}[/]")
@@ -184,180 +447,216 @@ def read_input(reader):
         break
 
 
+def report_results(ctx, results):
+    """
+    Prints errors for each validation result with the result printer
+    Creates a dict output of errors for each record and yields it
+    Results from several files are printed under the name of each file
+    """
+    printer = ctx["printer"]
+    filename = None
+    for result in results:
+        n = result["record_number"]
+        out_report = {
+            "vendor_code": result["vendor_code"],
+            "record_number": n,
+            "control_number": result["control_number"],
+        }
+        if "filename" in result:
+            if result["filename"] != filename:
+                filename = result["filename"]
+                printer.message(f"\nChecking all records in {filename}...")
+            out_report["filename"] = filename
+        if result["valid"]:
+            out_report["valid"] = True
+            errors = []
+        else:
+            out_report["valid"] = False
+            error_summary = dict(result["error_summary"])
+            errors = error_summary.pop("errors")
+            out_report.update(error_summary)
+        with profiling.stage("print"):
+            printer.report(out_report, errors)
+        yield out_report
+
+
 @cli.command("validate-all", short_help="validate all records")
 @processor
-def validate_all(reader):
+@click.pass_obj
+def validate_all(ctx, reader):
     """
     Loops through file of MARC records and validate each record
     Prints errors for each record to terminal
-    Creates a dict output of errors for each record and adds the output to a list
-    Returns dict output to use with export command
+    Creates a dict output of errors for each record
+    Yields dict output for each record to use with export command
     """
-    n = 0
-    output = []
     while True:
-        console.print("\nChecking all records...")
-        for record in reader:
-            n += 1
-            r = VendorRecord(record)
-            out_report = {
-                "vendor_code": r.dict_input["bib_vendor_code"],
-                "record_number": n,
-                "control_number": record["001"].data,
-            }
-            if r.material_type == "monograph_record":
-                try:
-                    MonographRecord(**r.dict_input)
-                    out_report["valid"] = True
-                    console.print(
-                        f"\n[record]Record #{n}[/] (control_no [control_no]{record['001'].data}[/]) is valid."
-                    )
-                except ValidationError as e:
-                    out_report["valid"] = False
-                    error_summary = format_errors(e)
-                    console.print(
-                        f"\nRecord [record]#{n}[/] contains [error]{error_summary['error_count']} error(s)[/]"
-                    )
-                    for error in error_summary["errors"]:
-                        console.print(
-                            f"\t{error['msg']}: {error['input']} {error['loc']}"
-                        )
-                    del error_summary["errors"]
-                    out_report.update(error_summary)
-                output.append(out_report)
-            else:
-                try:
-                    OtherMaterialRecord(**r.dict_input)
-                    out_report["valid"] = True
-                    console.print(
-                        f"\n[record]Record #{n}[/] (control_no [control_no]{record['001'].data}[/]) is valid."
-                    )
-                except ValidationError as e:
-                    out_report["valid"] = False
-                    error_summary = format_errors(e)
-                    console.print(
-                        f"\nRecord [record]#{n}[/] contains [error]{error_summary['error_count']} error(s)[/]"
-                    )
-                    for error in error_summary["errors"]:
-                        console.print(
-                            f"\t{error['msg']}: {error['input']} {error['loc']}"
-                        )
-                    del error_summary["errors"]
-                    out_report.update(error_summary)
-                output.append(out_report)
-        yield output
+        ctx["printer"].message("\nChecking all records...")
+        results = validate_input(ctx, reader)
+        if is_batch(ctx):
+            summary = BatchSummary()
+            yield from report_results(ctx, summary.track(results))
+            ctx["printer"].summary("\n" + "\n".join(summary.lines()), summary.as_dict())
+        else:
+            yield from report_results(ctx, results)
         break
 
 
+@cli.command("validate-remote", short_help="validate files on vendor ftp/sftp")
+@click.option(
+    "--name",
+    "names",
+    multiple=True,
+    help="File on the vendor site to validate. Can be used more than once. "
+    "Defaults to files created in the last week.",
+)
+@click.pass_obj
+@generator
+def validate_remote(ctx, names):
+    """
+    Validates files on vendor FTP/SFTP site while they are read, without saving them
+    Prints errors for each record to terminal
+    Yields dict output for each record to use with export command
+    """
+    from shelf_ready_validator.validate import validate_records
+
+    vendor_connect = get_connection(ctx)
+    for name, remote_file in vendor_connect.open_files(list(names) or None):
+        ctx["printer"].message(f"\nChecking all records in {name}...")
+        records = numbered_records(
+            ctx, profiling.timed("read", read_marc_records(remote_file))
+        )
+        results = validate_records(
+            records, ctx["workers"], cache=get_cache(ctx), pipeline=ctx["pipeline"]
+        )
+        for out_report in report_results(ctx, results):
+            out_report["filename"] = name
+            yield out_report
+
+
 @cli.command("validate-brief", short_help="get validation summary")
 @processor
-def validate_summary(reader):
+@click.pass_obj
+def validate_summary(ctx, reader):
     """
     Validate all records in file, print summary of errors
+    With several files, prints a summary for each file and for the batch
     """
+    if is_batch(ctx):
+        summary = BatchSummary()
+        for result in validate_input(ctx, reader):
+            summary.add(result)
+        output = "\n" + "\n".join(summary.lines())
+        ctx["printer"].summary(output, summary.as_dict())
+        yield output
+        return
     total_records = 0
     invalid_records = 0
     valid_records = 0
     errored_records = []
     while True:
-        for record in reader:
+        for result in validate_input(ctx, reader):
             total_records += 1
-            r = VendorRecord(record)
-            control_number = record["001"].data
-            if r.material_type == "monograph_record":
-                try:
-                    MonographRecord(**r.dict_input)
-                    valid_records += 1
-                except ValidationError as e:
-                    invalid_records += 1
-                    error_count = e.error_count()
-                    error_output = (control_number, error_count)
-                    errored_records.append(error_output)
+            if result["valid"]:
+                valid_records += 1
             else:
-                try:
-                    OtherMaterialRecord(**r.dict_input)
-                    valid_records += 1
-                except ValidationError as e:
-                    invalid_records += 1
-                    error_count = e.error_count()
-                    error_output = (control_number, error_count)
-                    errored_records.append(error_output)
+                invalid_records += 1
+                error_output = (result["control_number"], result["error_count"])
+                errored_records.append(error_output)
         if invalid_records > 0:
             output = f"\nFile contains {total_records} record(s): {valid_records} valid record(s) and [error]{invalid_records} invalid record(s)[/]. \n\n[error]Invalid record list and error count:[/] \n{errored_records} \n\nFor more detailed error information run `validator validate-all`"
         else:
             output = f"\nFile contains {total_records} valid record(s)"
-        console.print(output)
+        ctx["printer"].summary(
+            output,
+            {
+                "file": ctx["file"],
+                "records": total_records,
+                "valid": valid_records,
+                "invalid": invalid_records,
+                "invalid_records": errored_records,
+            },
+        )
         yield output
         break
 
 
 @cli.command("validate-raw", short_help="get raw validation errors")
 @processor
-def validate_raw(reader):
+@click.pass_obj
+def validate_raw(ctx, reader):
     """
     Returns raw validation error output
     """
     errored_records = []
-    n = 0
     while True:
-        for record in reader:
-            n += 1
-            r = VendorRecord(record)
-            control_number = record["001"].data
-            if r.material_type == "monograph_record":
-                try:
-                    MonographRecord(**r.dict_input)
-                    console.print(
-                        f"Record # {n} (control no {control_number}) validates"
-                    )
-                except ValidationError as e:
-                    console.print(
-                        f"Record #{n} (control no {control_number}) has errors"
-                    )
-                    console.print(e.errors())
-                    errored_records.append(e.errors())
-            else:
-                try:
-                    OtherMaterialRecord(**r.dict_input)
-                    console.print(
-                        f"Record # {n} (control no {control_number} validates"
-                    )
-                except ValidationError as e:
-                    console.print(
-                        f"Record #{n} (control no {control_number}) has errors"
-                    )
-                    console.print(e.errors())
-                    errored_records.append(e.errors())
+        for result in validate_input(ctx, reader):
+            with profiling.stage("print"):
+                ctx["printer"].raw(result)
+            if not result["valid"]:
+                errored_records.append(result["errors"])
         yield errored_records
         break
 
 
 @cli.command("export", short_help="export validation report")
+@click.option(
+    "--chunk-size",
+    "chunk_size",
+    default=500,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of report rows to write at a time.",
+)
+@click.option(
+    "--format",
+    "report_format",
+    default="sheet",
+    show_default=True,
+    type=click.Choice(REPORT_FORMATS),
+    help="Write the report to the google sheet or to a local file.",
+)
+@click.option(
+    "--out",
+    "out",
+    type=click.Path(dir_okay=True),
+    help="File to append csv/jsonl reports to, or directory of the parquet dataset.",
+)
 @processor
 @click.pass_obj
-def export_error_report(ctx, output):
-    """
-    Writes error report from validate-all command to file
-    """
-    for out in output:
-        output_df = pd.DataFrame(out, dtype="string")
-        output_df = output_df.fillna("None")
-        file = ctx["file"]
-        output_df.insert(loc=0, column="filename", value=file)
-        output_df.insert(
-            loc=0,
-            column="validation-date",
-            value=datetime.today().strftime("%Y-%m-%d %I:%M:%S"),
-        )
-        rows = output_df.values.tolist()
-        write_sheet(
-            "1ZYuhMIE1WiduV98Pdzzw7RwZ08O-sJo7HJihWVgSOhQ",
-            "RecordOutput!A1:M10000",
-            "USER_ENTERED",
-            "INSERT_ROWS",
-            rows,
-        )
-        yield output_df
+def export_error_report(ctx, reports, chunk_size, report_format, out):
+    """
+    Writes error report from validate-all command to google sheet or local file
+    Rows are written as they are validated, chunk_size rows at a time
+    Parquet reports are added to a dataset partitioned by vendor and date
+    With --pipeline async, chunks are written in the background while the next
+    ones are validated
+    """
+    if report_format != "sheet" and out is None:
+        raise click.UsageError(f"--out is required with --format {report_format}")
+    validation_date = datetime.today()
+    writer = get_report_writer(
+        report_format,
+        out,
+        vendor=ctx["vendor_name"],
+        date=validation_date.strftime("%Y-%m-%d"),
+        file=ctx["file"],
+    )
+    if ctx["pipeline"] == "async":
+        writer = AsyncReportWriter(writer)
+    with writer:
+        for output_df in report_chunks(
+            reports,
+            ctx["file"],
+            validation_date.strftime("%Y-%m-%d %I:%M:%S"),
+            chunk_size,
+        ):
+            with profiling.stage("export", len(output_df)):
+                writer.write(output_df)
+            yield output_df
+    summary = writer.summary()
+    if summary:
+        ctx["printer"].message(summary)
 
 
 def main():
@@ -0,0 +1,118 @@
+import glob
+import os.path
+from collections import Counter
+from typing import Any, Generator, Iterable
+
+
+def find_files(spec: str) -> list[str]:
+    """
+    Expands the value of the --file option to a list of MARC files.
+
+    Args:
+        spec: a MARC file, a directory of MARC files, a glob pattern or a
+            comma-separated list of any of these
+
+    Returns:
+        list of paths to MARC files, largest first so the biggest files start
+        validating while the smaller ones fill in behind them. Files are only
+        listed once. Empty if spec does not name any MARC files (e.g. "none").
+
+    """
+    files: list[str] = []
+    for path in (part.strip() for part in spec.split(",")):
+        if os.path.isdir(path):
+            matches = sorted(glob.glob(os.path.join(glob.escape(path), "*.mrc")))
+        elif glob.has_magic(path):
+            matches = sorted(
+                match
+                for match in glob.glob(path, recursive=True)
+                if os.path.isfile(match)
+            )
+        elif ".mrc" in path:
+            matches = [path]
+        else:
+            matches = []
+        files.extend(match for match in matches if match not in files)
+    return sorted(files, key=_file_size, reverse=True)
+
+
+def file_names(files: list[str]) -> dict[str, str]:
+    """
+    Returns the name each file is reported under: its base name, or its path
+    if another file in the list has the same base name
+    """
+    base_names = Counter(os.path.basename(file) for file in files)
+    return {
+        file: file if base_names[os.path.basename(file)] > 1 else os.path.basename(file)
+        for file in files
+    }
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+class BatchSummary:
+    """
+    Number of records, valid and invalid records and errors in each file of a
+    batch and in the batch as a whole
+    """
+
+    def __init__(self) -> None:
+        self.files: dict[str, Counter] = {}
+
+    def add(self, result: dict[str, Any]) -> None:
+        totals = self.files.setdefault(result["filename"], Counter())
+        totals["records"] += 1
+        totals["valid" if result["valid"] else "invalid"] += 1
+        totals["errors"] += result["error_count"]
+
+    def track(
+        self, results: Iterable[dict[str, Any]]
+    ) -> Generator[dict[str, Any], None, None]:
+        """
+        Adds each validation result to the summary as it passes through
+        """
+        for result in results:
+            self.add(result)
+            yield result
+
+    def total(self) -> Counter:
+        return sum(self.files.values(), Counter())
+
+    def lines(self) -> list[str]:
+        """
+        Returns a line for each file and a line for the whole batch
+        """
+        lines = [
+            f"{filename}: {self._describe(totals)}"
+            for filename, totals in self.files.items()
+        ]
+        lines.append(f"All {len(self.files)} file(s): {self._describe(self.total())}")
+        return lines
+
+    def as_dict(self) -> dict[str, Any]:
+        """
+        Returns the totals for each file and for the whole batch
+        """
+        return {
+            "files": {
+                filename: self._counts(totals)
+                for filename, totals in self.files.items()
+            },
+            "total": self._counts(self.total()),
+        }
+
+    @staticmethod
+    def _counts(totals: Counter) -> dict[str, int]:
+        return {key: totals[key] for key in ("records", "valid", "invalid", "errors")}
+
+    @staticmethod
+    def _describe(totals: Counter) -> str:
+        return (
+            f"{totals['records']} record(s), {totals['valid']} valid, "
+            f"{totals['invalid']} invalid, {totals['errors']} error(s)"
+        )
@@ -0,0 +1,213 @@
+import hashlib
+import os.path
+import pickle
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Optional, Union
+
+from pymarc import Record
+
+from shelf_ready_validator.mapped import MappedRecord
+
+CACHE_ENV = "RL_VALIDATOR_RESULT_CACHE"
+"""Environment variable with the path of the validation result cache"""
+
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+"""Default size of the cached results before the least recently used are evicted"""
+
+RESULT_KEYS = (
+    "control_number",
+    "vendor_code",
+    "valid",
+    "error_count",
+    "errors",
+    "error_summary",
+)
+"""Keys of a validation result that only depend on the record"""
+
+QUERY_BATCH_SIZE = 500
+"""Number of keys looked up in a single query"""
+
+
+def default_cache_path() -> str:
+    """
+    Returns the path of the result cache. Uses RL_VALIDATOR_RESULT_CACHE if it
+    is set, otherwise result_cache.db in the directory files are downloaded to.
+    """
+    if os.environ.get(CACHE_ENV):
+        return os.environ[CACHE_ENV]
+    return os.path.join(
+        os.environ.get("USERPROFILE", os.path.expanduser("~")),
+        "github/RL-shelf-ready-validation/temp/result_cache.db",
+    )
+
+
+@lru_cache(maxsize=None)
+def rules_version() -> str:
+    """
+    Returns a hash of everything that decides the result of validating a record:
+    the models and their validators, the conversion of pymarc and memory-mapped
+    records to dict input, the formatting of errors and the item and order
+    location rules. Results cached with a different version are not used.
+    """
+    import pydantic_core
+
+    from shelf_ready_validator import errors, mapped, models, translate, validate
+
+    version = hashlib.sha256(pydantic_core.__version__.encode())
+    for module in (models, translate, mapped, errors, validate):
+        with open(module.__file__, "rb") as fh:  # type: ignore[arg-type]
+            version.update(fh.read())
+    version.update(repr(sorted(models.VALID_LOCATION_COMBINATIONS, key=str)).encode())
+    version.update(repr((models.ITEM_LOCATIONS, models.ORDER_LOCATIONS)).encode())
+    return version.hexdigest()
+
+
+def record_key(record: Union[Record, MappedRecord]) -> bytes:
+    """
+    Returns the sha256 hash of a record in MARC transmission format. Memory-mapped
+    records are hashed without being decoded.
+    """
+    return hashlib.sha256(record.as_marc()).digest()
+
+
+class ResultCache:
+    """
+    A SQLite cache of validation results keyed by the hash of each record's MARC
+    bytes, so records that are sent again unchanged are not validated again.
+
+    Results cached with an earlier version of the validation rules are removed
+    when the cache is opened. Once the cached results are larger than max_bytes
+    the least recently used are evicted. The cache can be shared by threads.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_bytes: int = MAX_CACHE_BYTES,
+        version: Optional[str] = None,
+    ) -> None:
+        self.path = path or default_cache_path()
+        self.max_bytes = max_bytes
+        self.version = version or rules_version()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS results (
+                    key BLOB PRIMARY KEY,
+                    version TEXT NOT NULL,
+                    result BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)"
+            )
+            self.conn.execute("DELETE FROM results WHERE version != ?", (self.version,))
+        (self.size,) = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()
+
+    def get_many(self, keys: list[bytes]) -> dict[bytes, dict[str, Any]]:
+        """
+        Returns the cached result for each key that is in the cache and marks
+        them as recently used
+        """
+        found: dict[bytes, dict[str, Any]] = {}
+        with self.lock:
+            for start in range(0, len(keys), QUERY_BATCH_SIZE):
+                batch = keys[start : start + QUERY_BATCH_SIZE]
+                placeholders = ", ".join("?" * len(batch))
+                rows = self.conn.execute(
+                    "SELECT key, result FROM results "
+                    f"WHERE version = ? AND key IN ({placeholders})",
+                    [self.version, *batch],
+                ).fetchall()
+                found.update((key, pickle.loads(result)) for key, result in rows)
+            if found:
+                with self.conn:
+                    self.conn.executemany(
+                        "UPDATE results SET last_used = ? WHERE key = ?",
+                        [(time.time(), key) for key in found],
+                    )
+            self.hits += len(found)
+            self.misses += len(set(keys)) - len(found)
+        return found
+
+    def put_many(self, items: list[tuple[bytes, dict[str, Any]]]) -> None:
+        """
+        Caches the result for each key, then evicts the least recently used
+        results if the cache is too large
+        """
+        if not items:
+            return
+        now = time.time()
+        rows = []
+        for key, result in items:
+            data = pickle.dumps(
+                {name: result[name] for name in RESULT_KEYS},
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+            rows.append((key, self.version, data, len(data), now))
+        new_sizes = {row[0]: row[3] for row in rows}
+        with self.lock:
+            replaced = 0
+            keys = list(new_sizes)
+            for start in range(0, len(keys), QUERY_BATCH_SIZE):
+                batch = keys[start : start + QUERY_BATCH_SIZE]
+                placeholders = ", ".join("?" * len(batch))
+                (size,) = self.conn.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM results "
+                    f"WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchone()
+                replaced += size
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)", rows
+                )
+            self.size += sum(new_sizes.values()) - replaced
+            if self.size > self.max_bytes:
+                self.evict()
+
+    def evict(self) -> None:
+        """
+        Removes the least recently used results until the cache is no larger
+        than max_bytes
+        """
+        keep = 0
+        evicted: list[tuple[bytes]] = []
+        with self.lock:
+            for key, size in self.conn.execute(
+                "SELECT key, size FROM results ORDER BY last_used DESC"
+            ).fetchall():
+                if evicted or keep + size > self.max_bytes:
+                    evicted.append((key,))
+                else:
+                    keep += size
+            with self.conn:
+                self.conn.executemany("DELETE FROM results WHERE key = ?", evicted)
+            self.size = keep
+
+    def __len__(self) -> int:
+        with self.lock:
+            (count,) = self.conn.execute("SELECT COUNT(*) FROM results").fetchone()
+        return count
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "ResultCache":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
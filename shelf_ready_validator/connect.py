@@ -1,9 +1,108 @@
 import ftplib
-import paramiko
 import os.path
+import posixpath
 import json
+import shutil
+import threading
+import time
+from contextlib import contextmanager
 from rich import print
-from datetime import datetime, timedelta
+from datetime import datetime
+from shelf_ready_validator.download import (
+    ClientPool,
+    download_files,
+    download_summary,
+)
+from shelf_ready_validator.listing import list_ftp_files, list_sftp_files, recent_files
+from shelf_ready_validator.manifest import SyncManifest, hash_file
+
+
+def _print_all_files(files):
+    today = datetime.now()
+    for file in files:
+        update_date = datetime.fromtimestamp(file.mtime)
+        print(
+            f"{file.name} was created {(today - update_date).days} days ago "
+            f"on {update_date.strftime('%Y-%m-%d')}"
+        )
+
+
+def _print_recent_files(files):
+    today = datetime.now()
+    for file in recent_files(files):
+        update_date = datetime.fromtimestamp(file.mtime)
+        print(
+            f"{file.name} is new today ({today.strftime('%Y-%m-%d')}) "
+            f"and was created on {update_date.strftime('%Y-%m-%d')}"
+        )
+
+
+def _sync_files(vendor, files, download, manifest=None):
+    """
+    Downloads the files that are new or have changed since they were last
+    downloaded and records each download in the sync manifest.
+    Opens the default manifest if one is not given.
+    """
+    today = datetime.now()
+    sync_manifest = manifest or SyncManifest()
+    try:
+        new_files = []
+        for file in files:
+            if sync_manifest.is_current(vendor, file):
+                print(f"{file.name} has already been downloaded")
+            else:
+                new_files.append(file)
+
+        def on_complete(file, stats):
+            sync_manifest.record(
+                vendor, file, stats.local_path, hash_file(stats.local_path)
+            )
+
+        start = time.perf_counter()
+        all_stats = download(new_files, on_complete)
+        for stats in all_stats:
+            print(f"{stats.file} is new today, {today.strftime('%Y-%m-%d')} ({stats})")
+        print(download_summary(all_stats, time.perf_counter() - start))
+    finally:
+        if manifest is None:
+            sync_manifest.close()
+    return [stats.local_path for stats in all_stats]
+
+
+@contextmanager
+def _retr_pipe(ftp_client, name):
+    """
+    Retrieves a file from an ftp site in a background thread and returns the
+    read end of a pipe that the data is written to as it arrives
+    """
+    read_fd, write_fd = os.pipe()
+    reader = os.fdopen(read_fd, "rb")
+    writer = os.fdopen(write_fd, "wb")
+    errors = []
+
+    def retrieve():
+        try:
+            ftp_client.retrbinary(f"RETR {name}", writer.write)
+        except BrokenPipeError:
+            # the file was closed before it was read to the end
+            pass
+        except Exception as e:
+            errors.append(e)
+        finally:
+            try:
+                writer.close()
+            except BrokenPipeError:
+                pass
+
+    thread = threading.Thread(target=retrieve, daemon=True)
+    thread.start()
+    try:
+        yield reader
+    finally:
+        reader.close()
+        thread.join()
+    if errors:
+        raise errors[0]
 
 
 class ftpConnection:
@@ -13,95 +112,159 @@ class ftpConnection:
 
     def __init__(self, vendor: str):
         self.vendor = vendor
+        self.handshakes = 0
+        self.handshake_seconds = 0.0
+        self._ftp_creds = None
+        self._ftp_client = None
 
     def _open_ftp_creds(self):
-        ftp_cred_path = os.path.join(
-            os.environ["USERPROFILE"], f".cred/.sftp/{self.vendor}.json"
-        )
-        ftp_cred_file = open(ftp_cred_path, "r")
-        ftp_creds = json.load(ftp_cred_file)
-        return ftp_creds
+        if self._ftp_creds is None:
+            ftp_cred_path = os.path.join(
+                os.environ["USERPROFILE"], f".cred/.sftp/{self.vendor}.json"
+            )
+            with open(ftp_cred_path, "r") as ftp_cred_file:
+                self._ftp_creds = json.load(ftp_cred_file)
+        return self._ftp_creds
 
     def _create_ftp_client(self):
         ftp_creds = self._open_ftp_creds()
-        ftp_client = ftplib.FTP(
-            host=ftp_creds["host"],
-            user=ftp_creds["username"],
-            passwd=ftp_creds["password"],)
-        ftp_client.encoding = "utf-8"
-        ftp_client.login()
+        start = time.perf_counter()
+        ftp_client = ftplib.FTP(encoding="utf-8")
+        ftp_client.connect(host=ftp_creds["host"], port=ftp_creds.get("port", 21))
+        ftp_client.login(user=ftp_creds["username"], passwd=ftp_creds["password"])
+        self.handshakes += 1
+        self.handshake_seconds += time.perf_counter() - start
         return ftp_client
 
+    def _get_ftp_client(self):
+        """
+        Returns the ftp session for this connection, logging in the first time
+        it is used. The session is reused until the connection is closed.
+        """
+        if self._ftp_client is None:
+            self._ftp_client = self._create_ftp_client()
+        return self._ftp_client
+
+    def close(self):
+        """
+        Closes the ftp session
+        """
+        if self._ftp_client is not None:
+            try:
+                self._ftp_client.close()
+            finally:
+                self._ftp_client = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _download_files(self, files, local, max_concurrency=4, on_complete=None):
+        """
+        Downloads files from the vendor ftp site to a local directory,
+        up to max_concurrency files at a time, each over its own ftp session.
+        Partial downloads are resumed with REST.
+        """
+        filepath = self._open_ftp_creds()["filepath"]
+
+        def open_client():
+            ftp_client = self._create_ftp_client()
+            ftp_client.cwd(filepath)
+            return ftp_client
+
+        def fetch(ftp_client, file, part_path, offset):
+            with open(part_path, "ab") as fh:
+                ftp_client.retrbinary(f"RETR {file}", fh.write, rest=offset or None)
+
+        with ClientPool(open_client, ftplib.FTP.close, max_concurrency) as pool:
+            return download_files(
+                files, local, fetch, pool, max_concurrency, on_complete
+            )
+
     def get_records(self):
         """
         Gets all records from a vendor ftp site
         """
-        filepath = self._open_ftp_creds()["filepath"]
-        ftp_client = self._create_ftp_client()
         local = os.path.join(
             os.environ["USERPROFILE"],
             f"github/RL-shelf-ready-validation/temp/{self.vendor}/",
         )
+        ftp_client = self._get_ftp_client()
+        local_file_list = []
+        for file in self.list_files():
+            with open(f"{local + file.name}", "wb") as fh:
+                ftp_client.retrbinary(f"RETR {file.name}", fh.write)
+            local_file_list.append(file.name)
+        return local_file_list
+
+    def list_files(self):
+        """
+        Returns a RemoteFile with the name, size and modification time of each
+        file on the vendor ftp site. Uses MLSD if the server supports it.
+        """
+        filepath = self._open_ftp_creds()["filepath"]
+        ftp_client = self._get_ftp_client()
         ftp_client.cwd(filepath)
-        dir_list = []
-        ftp_client.retrlines("NLST", dir_list.append)
-        for file in dir_list:
-            ftp_client.retrbinary(f"RETR {file}", open(f"{local + file}", "wb").write)
-        ftp_client.close()
+        return list_ftp_files(ftp_client)
 
     def list_all_files(self):
         """
         Checks vendor ftp site and lists each file
         """
-        today = datetime.now()
+        _print_all_files(self.list_files())
+
+    def open_files(self, names=None):
+        """
+        Opens files on the vendor ftp site one at a time for reading without
+        saving them. Each file is read from a pipe that RETR writes to as the
+        data arrives. Opens the files created in the last week if names are not given.
+        Yields (name, file) tuples.
+        If a file is not read to the end, the ftp session is closed since the
+        server is still waiting for the transfer to finish.
+        """
         filepath = self._open_ftp_creds()["filepath"]
-        ftp_client = self._create_ftp_client()
-        ftp_client.cwd(filepath)
-        dir_list = []
-        ftp_client.retrlines("LIST", dir_list.append)
-        for file in dir_list:
-            file_date = datetime.strptime(f"{file[43:49]} {today.year}", "%b %d %Y")
-            print(f"{file[56:]} was created {(today - file_date).days} days ago on {file_date.strftime('%Y-%m-%d')}")
-        ftp_client.close()
+        ftp_client = self._get_ftp_client()
+        completed = False
+        try:
+            ftp_client.cwd(filepath)
+            if names is None:
+                names = [file.name for file in recent_files(self.list_files())]
+            for name in names:
+                with _retr_pipe(ftp_client, name) as remote_file:
+                    yield name, remote_file
+            completed = True
+        finally:
+            if not completed:
+                self.close()
 
-    def get_recent_records(self):
+    def get_recent_records(self, max_concurrency=4, manifest=None):
         """
         Checks vendor ftp site and lists each file.
         If a file has been created within the last week it will be downloaded
+        unless the sync manifest shows it was already downloaded and has not changed.
+        Up to max_concurrency files are downloaded at a time.
         """
-        today = datetime.now()
-        filepath = self._open_ftp_creds()["filepath"]
-        ftp_client = self._create_ftp_client()
         local = os.path.join(
             os.environ["USERPROFILE"],
             f"github/RL-shelf-ready-validation/temp/{self.vendor}/",
         )
-        ftp_client.cwd(filepath)
-        dir_list = []
-        ftp_client.retrlines("LIST", dir_list.append)
-        for file in dir_list:
-            file_date = datetime.strptime(f"{file[43:49]} {today.year}", "%b %d %Y")
-            if file_date >= today - timedelta(days=7):
-                ftp_client.retrbinary(f"RETR {file[56:]}", open(f"{local + file[56:]}", "wb").write)
-                print(f"{file[56:]} is new today, {today.strftime('%Y-%m-%d')}")
-        ftp_client.close()
+        return _sync_files(
+            self.vendor,
+            recent_files(self.list_files()),
+            lambda files, on_complete: self._download_files(
+                files, local, max_concurrency, on_complete
+            ),
+            manifest,
+        )
     
     def list_recent_records(self):
         """
         Checks vendor ftp site and lists each file.
         If a file has been created within the last week it will be downloaded
         """
-        today = datetime.now()
-        filepath = self._open_ftp_creds()["filepath"]
-        ftp_client = self._create_ftp_client()
-        ftp_client.cwd(filepath)
-        dir_list = []
-        ftp_client.retrlines("LIST", dir_list.append)
-        for file in dir_list:
-            file_date = datetime.strptime(f"{file[43:49]} {today.year}", "%b %d %Y")
-            if file_date >= today - timedelta(days=7):
-                print(f"{file[56:]} is new today ({today.strftime('%Y-%m-%d')}) and was created on {file_date.strftime('%Y-%m-%d')}")
-        ftp_client.close()
+        _print_recent_files(self.list_files())
 
 
 class sftpConnection:
@@ -111,17 +274,26 @@ class sftpConnection:
 
     def __init__(self, vendor: str):
         self.vendor = vendor
+        self.handshakes = 0
+        self.handshake_seconds = 0.0
+        self._ssh_creds = None
+        self._ssh_client = None
+        self._sftp_client = None
 
     def _open_ssh_creds(self):
-        ssh_cred_path = os.path.join(
-            os.environ["USERPROFILE"], f".cred/.sftp/{self.vendor}.json"
-        )
-        ssh_cred_file = open(ssh_cred_path, "r")
-        ssh_creds = json.load(ssh_cred_file)
-        return ssh_creds
+        if self._ssh_creds is None:
+            ssh_cred_path = os.path.join(
+                os.environ["USERPROFILE"], f".cred/.sftp/{self.vendor}.json"
+            )
+            with open(ssh_cred_path, "r") as ssh_cred_file:
+                self._ssh_creds = json.load(ssh_cred_file)
+        return self._ssh_creds
 
     def _create_sftp_client(self):
+        import paramiko
+
         ssh_creds = self._open_ssh_creds()
+        start = time.perf_counter()
         ssh_client = paramiko.SSHClient()
         ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
         ssh_client.connect(
@@ -131,14 +303,74 @@ class sftpConnection:
             password=ssh_creds["password"],
         )
         sftp_client = ssh_client.open_sftp()
+        self.handshakes += 1
+        self.handshake_seconds += time.perf_counter() - start
+        self._ssh_client = ssh_client
         return sftp_client
 
+    def _get_sftp_client(self):
+        """
+        Returns the sftp session for this connection, connecting the first time
+        it is used. The session is reused until the connection is closed.
+        """
+        if self._sftp_client is None:
+            self._sftp_client = self._create_sftp_client()
+        return self._sftp_client
+
+    def close(self):
+        """
+        Closes the sftp session and its ssh connection
+        """
+        try:
+            if self._sftp_client is not None:
+                self._sftp_client.close()
+            if self._ssh_client is not None:
+                self._ssh_client.close()
+        finally:
+            self._sftp_client = None
+            self._ssh_client = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _download_files(
+        self, sftp_client, filepath, files, local, max_concurrency=4, on_complete=None
+    ):
+        """
+        Downloads files from the vendor sftp site to a local directory,
+        up to max_concurrency files at a time, each over its own sftp channel
+        on the ssh connection used by sftp_client.
+        Partial downloads are resumed from where they stopped.
+        """
+        import paramiko
+
+        transport = sftp_client.get_channel().get_transport()
+
+        def fetch(channel, file, part_path, offset):
+            with channel.open(posixpath.join(filepath, file), "rb") as remote_file:
+                remote_file.seek(offset)
+                remote_file.prefetch()
+                with open(part_path, "ab") as fh:
+                    shutil.copyfileobj(remote_file, fh, 32768)
+
+        with ClientPool(
+            lambda: paramiko.SFTPClient.from_transport(transport),
+            paramiko.SFTPClient.close,
+            max_concurrency,
+        ) as pool:
+            return download_files(
+                files, local, fetch, pool, max_concurrency, on_complete
+            )
+
     def get_records(self):
         """
         Gets all records from a vendor sftp site
         """
         filepath = self._open_ssh_creds()["filepath"]
-        sftp_client = self._create_sftp_client()
+        sftp_client = self._get_sftp_client()
         local = os.path.join(
             os.environ["USERPROFILE"],
             f"github/RL-shelf-ready-validation/temp/{self.vendor}/",
@@ -149,63 +381,109 @@ class sftpConnection:
         for file in dir_list:
             sftp_client.get(file, f"{local + file}")
             local_file_list.append(file)
-        sftp_client.close()
         return local_file_list
 
+    def list_files(self):
+        """
+        Returns a RemoteFile with the name, size and modification time of each
+        file on the vendor sftp site, read with a single listdir_attr request
+        """
+        filepath = self._open_ssh_creds()["filepath"]
+        return list_sftp_files(self._get_sftp_client(), filepath)
+
     def list_all_files(self):
         """
         Checks vendor sftp site and lists each file
         """
-        today = datetime.now()
+        _print_all_files(self.list_files())
+
+    def open_files(self, names=None):
+        """
+        Opens files on the vendor sftp site one at a time for reading without
+        saving them. Reads ahead with prefetch so records can be read while the
+        rest of the file is still arriving. Opens the files created in the last
+        week if names are not given.
+        Yields (name, file) tuples.
+        """
         filepath = self._open_ssh_creds()["filepath"]
-        sftp_client = self._create_sftp_client()
-        dir_list = sftp_client.listdir(filepath)
-        sftp_client.chdir(filepath)
-        for file in dir_list:
-            file_data = sftp_client.stat(file)
-            update_date = datetime.fromtimestamp(file_data.st_mtime)
-            print(f"{file} was created {(today - update_date).days} days ago on {update_date.strftime('%Y-%m-%d')}")
-        sftp_client.close()
+        sftp_client = self._get_sftp_client()
+        if names is None:
+            names = [file.name for file in recent_files(self.list_files())]
+        for name in names:
+            remote_path = posixpath.join(filepath, name)
+            with sftp_client.open(remote_path, "rb") as remote_file:
+                remote_file.prefetch()
+                yield name, remote_file
 
-    def get_recent_records(self):
+    def get_recent_records(self, max_concurrency=4, manifest=None):
         """
         Checks vendor sftp site and lists each file.
         If a file has been created within the last week it will be downloaded
+        unless the sync manifest shows it was already downloaded and has not changed.
+        Up to max_concurrency files are downloaded at a time.
         """
-        today = datetime.now()
         filepath = self._open_ssh_creds()["filepath"]
-        sftp_client = self._create_sftp_client()
+        sftp_client = self._get_sftp_client()
         local = os.path.join(
             os.environ["USERPROFILE"],
             f"github/RL-shelf-ready-validation/temp/{self.vendor}/",
         )
-        dir_list = sftp_client.listdir(filepath)
-        todays_files = []
-        sftp_client.chdir(filepath)
-        for file in dir_list:
-            local_path = local + file
-            file_data = sftp_client.stat(file)
-            update_date = datetime.fromtimestamp(file_data.st_mtime)
-            if update_date >= today - timedelta(days=7):
-                sftp_client.get(file, local_path)
-                print(f"{file} is new today, {today.strftime('%Y-%m-%d')}")
-            todays_files.append(local_path)
-        sftp_client.close()
-        return todays_files
+        return _sync_files(
+            self.vendor,
+            recent_files(self.list_files()),
+            lambda files, on_complete: self._download_files(
+                sftp_client, filepath, files, local, max_concurrency, on_complete
+            ),
+            manifest,
+        )
     
     def list_recent_records(self):
         """
         Checks vendor sftp site and lists each file.
         If a file has been created within the last week it will be downloaded
         """
-        today = datetime.now()
-        filepath = self._open_ssh_creds()["filepath"]
-        sftp_client = self._create_sftp_client()
-        dir_list = sftp_client.listdir(filepath)
-        sftp_client.chdir(filepath)
-        for file in dir_list:
-            file_data = sftp_client.stat(file)
-            update_date = datetime.fromtimestamp(file_data.st_mtime)
-            if update_date >= today - timedelta(days=7):
-                print(f"{file} is new today ({today.strftime('%Y-%m-%d')}) and was created on {update_date.strftime('%Y-%m-%d')}")
-        sftp_client.close()
\ No newline at end of file
+        _print_recent_files(self.list_files())
+
+
+class ConnectionManager:
+    """
+    Keeps one connection to each vendor site for a CLI run so chained commands
+    share a single login. Connections are opened when first used and closed
+    together with close.
+    """
+
+    def __init__(self):
+        self.connections = {}
+
+    def get(self, vendor: str):
+        """
+        Returns the connection for a vendor, creating it the first time
+        """
+        if vendor not in self.connections:
+            match vendor:
+                case "eastview":
+                    self.connections[vendor] = sftpConnection(vendor)
+                case "leila":
+                    self.connections[vendor] = ftpConnection(vendor)
+                case _:
+                    raise ValueError(f"Missing FTP/SFTP credentials for {vendor}")
+        return self.connections[vendor]
+
+    def summary(self):
+        """
+        Returns the number of logins to each vendor site and the time they took
+        """
+        return [
+            f"Opened {connection.handshakes} connection(s) to {vendor} in "
+            f"{connection.handshake_seconds:.2f}s"
+            for vendor, connection in self.connections.items()
+            if connection.handshakes
+        ]
+
+    def close(self):
+        """
+        Closes every open connection
+        """
+        for connection in self.connections.values():
+            connection.close()
+        self.connections = {}
@@ -0,0 +1,219 @@
+import os.path
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Generator, NamedTuple, Optional
+
+
+PART_SUFFIX = ".part"
+"""Suffix of files that are still being downloaded"""
+
+PART_INFO_SUFFIX = ".part-info"
+"""Suffix of the file with the size and mtime of the remote file a .part is from"""
+
+
+class RemoteFile(NamedTuple):
+    """
+    A file on a vendor site
+    """
+
+    name: str
+    size: int
+    mtime: float
+
+
+class DownloadStats(NamedTuple):
+    """
+    Size and transfer time of a downloaded file. offset is the number of bytes
+    that were already downloaded when the transfer was resumed.
+    """
+
+    file: str
+    local_path: str
+    size: int
+    seconds: float
+    offset: int = 0
+
+    @property
+    def transferred(self) -> int:
+        return self.size - self.offset
+
+    @property
+    def rate(self) -> float:
+        """
+        Throughput in bytes per second
+        """
+        if not self.seconds:
+            return float(self.transferred)
+        return self.transferred / self.seconds
+
+    def __str__(self) -> str:
+        output = f"{self.transferred} bytes in {self.seconds:.2f}s, {self.rate / 1024:.1f} KB/s"
+        if self.offset:
+            output += f", resumed at {self.offset} bytes"
+        return output
+
+
+class ClientPool:
+    """
+    A pool of at most max_size connections to a vendor site.
+
+    Connections are opened with open_client the first time they are needed,
+    reused by later downloads and closed with close_client when the pool is
+    closed.
+    """
+
+    def __init__(
+        self,
+        open_client: Callable[[], Any],
+        close_client: Callable[[Any], None],
+        max_size: int,
+    ) -> None:
+        self.open_client = open_client
+        self.close_client = close_client
+        self.max_size = max_size
+        self.clients: list[Any] = []
+        self.opened = 0
+        self.idle: queue.LifoQueue = queue.LifoQueue()
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def client(self) -> Generator[Any, None, None]:
+        """
+        Borrows a connection from the pool, opening a new one if all open
+        connections are in use and the pool is not full
+        """
+        try:
+            client = self.idle.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                can_open = self.opened < self.max_size
+                if can_open:
+                    self.opened += 1
+            if can_open:
+                try:
+                    client = self.open_client()
+                except BaseException:
+                    with self.lock:
+                        self.opened -= 1
+                    raise
+                with self.lock:
+                    self.clients.append(client)
+            else:
+                client = self.idle.get()
+        try:
+            yield client
+        finally:
+            self.idle.put(client)
+
+    def close(self) -> None:
+        for client in self.clients:
+            self.close_client(client)
+        self.clients = []
+        self.opened = 0
+        self.idle = queue.LifoQueue()
+
+    def __enter__(self) -> "ClientPool":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def _part_info(file: RemoteFile) -> str:
+    return f"{file.size}\t{file.mtime!r}\n"
+
+
+def _read_part_info(info_path: str) -> Optional[str]:
+    try:
+        with open(info_path, encoding="utf-8") as fh:
+            return fh.read()
+    except FileNotFoundError:
+        return None
+
+
+def download_files(
+    files: list[RemoteFile],
+    local_dir: str,
+    fetch: Callable[[Any, str, str, int], None],
+    pool: ClientPool,
+    max_concurrency: int = 4,
+    on_complete: Optional[Callable[[RemoteFile, DownloadStats], None]] = None,
+) -> list[DownloadStats]:
+    """
+    Downloads files from a vendor site, up to max_concurrency at a time, each
+    over its own connection from pool.
+
+    Files are downloaded to a .part file that is renamed once the whole file
+    has been received. If a .part file is left from an earlier transfer of the
+    same version of the file, the download resumes from the end of it. The
+    size and mtime of the remote file are saved next to the .part file, and
+    the .part file is discarded if the remote file has changed since.
+
+    Args:
+        files: RemoteFile for each file to download
+        local_dir: directory to save files to
+        fetch: function that appends a file, starting at offset, to a .part
+            file with a connection from pool. Called as
+            fetch(client, file, part_path, offset)
+        pool: ClientPool of connections to the vendor site
+        max_concurrency: number of files to download at once
+        on_complete: function called with the RemoteFile and DownloadStats of
+            each file once it has been saved
+
+    Returns:
+        list of DownloadStats in the same order as files
+
+    Raises:
+        OSError: if the size of a downloaded file does not match the size of
+            the file on the vendor site. The .part file is kept so the download
+            can be resumed.
+
+    """
+
+    def download(file: RemoteFile) -> DownloadStats:
+        local_path = os.path.join(local_dir, file.name)
+        part_path = local_path + PART_SUFFIX
+        info_path = local_path + PART_INFO_SUFFIX
+        offset = 0
+        if os.path.exists(part_path):
+            offset = os.path.getsize(part_path)
+            if offset > file.size or _read_part_info(info_path) != _part_info(file):
+                os.remove(part_path)
+                offset = 0
+        if not offset:
+            with open(info_path, "w", encoding="utf-8") as fh:
+                fh.write(_part_info(file))
+        with pool.client() as client:
+            start = time.perf_counter()
+            fetch(client, file.name, part_path, offset)
+            seconds = time.perf_counter() - start
+        size = os.path.getsize(part_path)
+        if size != file.size:
+            raise OSError(
+                f"Downloaded {size} of {file.size} bytes of {file.name}; "
+                "run again to resume"
+            )
+        os.replace(part_path, local_path)
+        os.remove(info_path)
+        stats = DownloadStats(file.name, local_path, size, seconds, offset)
+        if on_complete is not None:
+            on_complete(file, stats)
+        return stats
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        return list(executor.map(download, files))
+
+
+def download_summary(all_stats: list[DownloadStats], seconds: float) -> str:
+    """
+    Returns the number of files and bytes downloaded and the overall throughput
+    """
+    size = sum(stats.transferred for stats in all_stats)
+    rate = size / seconds if seconds else float(size)
+    return (
+        f"Downloaded {len(all_stats)} file(s), {size} bytes in {seconds:.2f}s "
+        f"({rate / 1024:.1f} KB/s)"
+    )
@@ -1,8 +1,121 @@
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Mapping, Union
 from pydantic import ValidationError
 from pydantic_core import ErrorDetails
 from shelf_ready_validator.translate import RLMarcEncoding
 
+MAX_TABLE_ITEMS = 100
+"""Number of items in a record whose error locations are looked up in tables"""
+
+ITEM_LIBRARIES = ("RL", "BL", "BPL")
+"""Values of the item "library" field that appear in item error locations"""
+
+IGNORED_FIELDS = frozenset(("852_ind1", "852_ind2", "949_ind1", "949_ind2"))
+"""Missing and extra fields that are not reported"""
+
+MARC_TAGS: Mapping[str, str] = MappingProxyType(
+    {member.name: member.value for member in RLMarcEncoding}
+)
+"""MARC tag or subfield of each field used by the validator"""
+
+
+def _field_locations() -> Mapping[tuple, Any]:
+    locations: dict[tuple, Any] = {}
+    for name, tag in MARC_TAGS.items():
+        locations[(name,)] = tag
+        for n in range(MAX_TABLE_ITEMS):
+            item_location = (f"item_{n}", tag)
+            for library in ITEM_LIBRARIES:
+                locations[("items", n, library, name)] = item_location
+    return MappingProxyType(locations)
+
+
+FIELD_LOCATIONS = _field_locations()
+"""
+MARC location of each error location in a record or in one of its first
+MAX_TABLE_ITEMS items, e.g. ("bib_call_no",) -> "852" and
+("items", 0, "RL", "item_barcode") -> ("item_0", "949$i")
+"""
+
+ITEM_LOCATIONS: Mapping[tuple, tuple[str, str]] = MappingProxyType(
+    {("items", n): (f"item_{n}", MARC_TAGS["items"]) for n in range(MAX_TABLE_ITEMS)}
+)
+"""MARC location of errors for a whole item, e.g. ("items", 0) -> ("item_0", "949")"""
+
+LOCATION_CHECK_LOCATIONS: Mapping[tuple, tuple[str, str, str, str]] = MappingProxyType(
+    {
+        (str(n), "item_location", "item_type", "order_location"): (
+            f"item_{n}",
+            MARC_TAGS["item_location"],
+            MARC_TAGS["item_type"],
+            MARC_TAGS["order_location"],
+        )
+        for n in range(MAX_TABLE_ITEMS)
+    }
+)
+"""MARC location of each "Item/Order location check" error location"""
+
+EXTRA_LOCATIONS: Mapping[str, tuple[str, ...]] = MappingProxyType(
+    {
+        name: tuple(f"{tag}_{i}" for i in range(MAX_TABLE_ITEMS))
+        for name, tag in MARC_TAGS.items()
+    }
+)
+"""Numbered MARC locations of repeated extra fields, e.g. "949_0", "949_1"..."""
+
+CTX_KEYS = {"literal_error": "expected", "string_pattern_mismatch": "pattern"}
+"""Key of the error context that decides the message of each error type"""
+
+ERROR_MESSAGES: dict[tuple[str, Any], str] = {
+    ("literal_error", "' '"): "Invalid indicator",
+    ("literal_error", "'1'"): "Invalid indicator",
+    ("literal_error", "'EVP', 'AUXAM', or 'LEILA'"): "Invalid vendor code",
+    ("literal_error", "'RL'"): "Invalid library identifier",
+    ("literal_error", "'8528'"): "Invalid item call tag",
+    ("literal_error", "'43'"): "Invalid item agency code",
+    (
+        "string_pattern_mismatch",
+        "^33433[0-9]{9}$|^33333[0-9]{9}$|^34444[0-9]{9}$",
+    ): "Invalid barcode",
+    (
+        "string_pattern_mismatch",
+        "^ReCAP 23-\\d{6}$|^ReCAP 24-\\d{6}$",
+    ): "Invalid ReCAP call number",
+    (
+        "string_pattern_mismatch",
+        "^\\d{3,}$",
+    ): "Invalid price; price should not include a decimal point",
+    (
+        "string_pattern_mismatch",
+        "^\\d{1,}$",
+    ): "Invalid price; price should not include a decimal point",
+    (
+        "string_pattern_mismatch",
+        "^\\d{6}$",
+    ): "Invalid date; invoice date should be YYMMDD",
+    (
+        "string_pattern_mismatch",
+        "^\\d{1,}\\.\\d{2}$",
+    ): "Invalid price; item price should include a decimal point",
+    (
+        "string_pattern_mismatch",
+        "^[^a-z]+",
+    ): "Invalid item message; message should be in all caps",
+}
+"""Message for each error type and value of its context key (see CTX_KEYS)"""
+
+FIELD_ERROR_MESSAGES: dict[tuple[str, str], str] = {
+    ("literal_error", "item_location"): "Item location does not match a valid location",
+    (
+        "literal_error",
+        "order_location",
+    ): "Order location does not match a valid location",
+}
+"""
+Message for each error type and field, for fields whose valid values are read
+from the location rules and so can change
+"""
+
 
 def missing_errors(error: ErrorDetails) -> dict:
     """
@@ -20,14 +133,18 @@ def missing_errors(error: ErrorDetails) -> dict:
     new_error: dict = {}
     new_error.update(error)
     new_error["input"] = error["loc"]
-    if error["loc"][0] == "items" and len(error["loc"]) == 4:
+    location = FIELD_LOCATIONS.get(error["loc"])
+    if location is not None:
+        new_error["loc"] = location
+        return new_error
+    elif error["loc"][0] == "items" and len(error["loc"]) == 4:
         new_error["loc"] = (
             f"item_{error['loc'][1]}",
-            RLMarcEncoding[str(error["loc"][3])].value,
+            MARC_TAGS[str(error["loc"][3])],
         )
         return new_error
     else:
-        new_error["loc"] = RLMarcEncoding[str(error["loc"][0])].value
+        new_error["loc"] = MARC_TAGS[str(error["loc"][0])]
         return new_error
 
 
@@ -46,11 +163,16 @@ def extra_errors(error: ErrorDetails) -> dict:
     new_error: dict = {}
     new_error.update(error)
     if type(error["input"]) is str:
-        new_error["loc"] = RLMarcEncoding[str(error["loc"][0])].value
+        new_error["loc"] = MARC_TAGS[str(error["loc"][0])]
+        return new_error
+    elif len(error["input"]) <= MAX_TABLE_ITEMS:
+        new_error["loc"] = list(
+            EXTRA_LOCATIONS[str(error["loc"][0])][: len(error["input"])]
+        )
         return new_error
     else:
         new_error["loc"] = [
-            f"{RLMarcEncoding[str(error['loc'][0])].value}_" + str(i)
+            f"{MARC_TAGS[str(error['loc'][0])]}_" + str(i)
             for i in range(len(error["input"]))
         ]
         return new_error
@@ -71,11 +193,15 @@ def item_order_errors(error: ErrorDetails) -> dict:
     """
     new_error: dict = {}
     new_error.update(error)
+    location = LOCATION_CHECK_LOCATIONS.get(error["loc"])
+    if location is not None:
+        new_error["loc"] = location
+        return new_error
     new_error["loc"] = (
         f"item_{error['loc'][0]}",
-        str(RLMarcEncoding[str(error["loc"][1])].value),
-        str(RLMarcEncoding[str(error["loc"][2])].value),
-        str(RLMarcEncoding[str(error["loc"][3])].value),
+        MARC_TAGS[str(error["loc"][1])],
+        MARC_TAGS[str(error["loc"][2])],
+        str(MARC_TAGS[str(error["loc"][3])]),
     )
     return new_error
 
@@ -96,112 +222,32 @@ def match_errors(error: ErrorDetails) -> dict:
     """
     new_error: dict = {}
     new_error.update(error)
-    if error["loc"][0] == "items" and len(error["loc"]) == 4:
+    location = FIELD_LOCATIONS.get(error["loc"]) or ITEM_LOCATIONS.get(error["loc"])
+    if location is not None:
+        new_error["loc"] = location
+    elif error["loc"][0] == "items" and len(error["loc"]) == 4:
         new_error["loc"] = (
             f"item_{error['loc'][1]}",
-            RLMarcEncoding[str(error["loc"][3])].value,
+            MARC_TAGS[str(error["loc"][3])],
         )
     elif error["loc"][0] == "items" and len(error["loc"]) == 2:
         new_error["loc"] = (
             f"item_{error['loc'][1]}",
-            RLMarcEncoding[str(error["loc"][0])].value,
+            MARC_TAGS[str(error["loc"][0])],
         )
     else:
-        new_error["loc"] = RLMarcEncoding[str(error["loc"][0])].value
-    match (error["type"], error["ctx"]):
-        case (
-            "literal_error",
-            {"expected": "' '"},
-        ):
-            new_error["msg"] = "Invalid indicator"
-            return new_error
-        case (
-            "literal_error",
-            {"expected": "'1'"},
-        ):
-            new_error["msg"] = "Invalid indicator"
-            return new_error
-        case (
-            "literal_error",
-            {"expected": "'EVP', 'AUXAM', or 'LEILA'"},
-        ):
-            new_error["msg"] = "Invalid vendor code"
-            return new_error
-        case (
-            "literal_error",
-            {"expected": "'RL'"},
-        ):
-            new_error["msg"] = "Invalid library identifier"
-            return new_error
-        case (
-            "literal_error",
-            {"expected": "'8528'"},
-        ):
-            new_error["msg"] = "Invalid item call tag"
-            return new_error
-        case (
-            "literal_error",
-            {
-                "expected": "'rcmb2', 'rcmf2', 'rcmg2', 'rc2ma', 'rcmp2', 'rcph2', 'rcpm2', 'rcpt2' or 'rc2cf'"
-            },
-        ):
-            new_error["msg"] = "Item location does not match a valid location"
-            return new_error
-        case (
-            "literal_error",
-            {
-                "expected": "'MAB', 'MAF', 'MAG', 'MAL', 'MAP', 'MAS', 'PAD', 'PAH', 'PAM', 'PAT' or 'SC'"
-            },
-        ):
-            new_error["msg"] = "Order location does not match a valid location"
-            return new_error
-        case ("literal_error", {"expected": "'43'"}):
-            new_error["msg"] = "Invalid item agency code"
-            return new_error
-        case (
-            "string_pattern_mismatch",
-            {"pattern": "^33433[0-9]{9}$|^33333[0-9]{9}$|^34444[0-9]{9}$"},
-        ):
-            new_error["msg"] = "Invalid barcode"
-            return new_error
-        case (
-            "string_pattern_mismatch",
-            {"pattern": "^ReCAP 23-\\d{6}$|^ReCAP 24-\\d{6}$"},
-        ):
-            new_error["msg"] = "Invalid ReCAP call number"
-            return new_error
-        case (
-            "string_pattern_mismatch",
-            {"pattern": "^\\d{3,}$"} | {"pattern": "^\\d{1,}$"},
-        ):
-            new_error["msg"] = "Invalid price; price should not include a decimal point"
-            return new_error
-        case (
-            "string_pattern_mismatch",
-            {"pattern": "^\\d{6}$"},
-        ):
-            new_error["msg"] = "Invalid date; invoice date should be YYMMDD"
-            return new_error
-        case (
-            "string_pattern_mismatch",
-            {"pattern": "^\\d{1,}\\.\\d{2}$"},
-        ):
-            new_error["msg"] = (
-                "Invalid price; item price should include a decimal point"
-            )
-            return new_error
-        case (
-            "string_pattern_mismatch",
-            {"pattern": "^[^a-z]+"},
-        ):
-            new_error["msg"] = "Invalid item message; message should be in all caps"
-            return new_error
-        case _:
-            pass
+        new_error["loc"] = MARC_TAGS[str(error["loc"][0])]
+    message = FIELD_ERROR_MESSAGES.get((error["type"], str(error["loc"][-1])))
+    if message is None:
+        message = ERROR_MESSAGES.get(
+            (error["type"], error["ctx"].get(CTX_KEYS.get(error["type"], "")))
+        )
+    if message is not None:
+        new_error["msg"] = message
     return new_error
 
 
-def format_errors(e: ValidationError) -> dict[str, Any]:
+def format_errors(e: Union[ValidationError, list[ErrorDetails]]) -> dict[str, Any]:
     """
     A function to format a list of errors based on error type.
     Formats data to make it easier read when printed to terminal during validation.
@@ -209,7 +255,8 @@ def format_errors(e: ValidationError) -> dict[str, Any]:
     read when printed to terminal during validation.
 
     Args:
-        e: ValidationError (output from pydantic model)
+        e: ValidationError (output from pydantic model) or list of errors
+            (output from validate_batch)
 
     Returns:
         dict:
@@ -231,7 +278,9 @@ def format_errors(e: ValidationError) -> dict[str, Any]:
     invalid_fields = []
     other_errors = []
     other_error_fields = []
-    for error in e.errors():
+    if isinstance(e, ValidationError):
+        e = e.errors()
+    for error in e:
         if error["type"] == "missing":
             converted_error = missing_errors(error)
             missing_fields.append(converted_error["loc"])
@@ -258,15 +307,9 @@ def format_errors(e: ValidationError) -> dict[str, Any]:
             invalid_fields.append(converted_error["loc"])
             errors.append(converted_error)
     missing_fields[:] = (
-        value
-        for value in missing_fields
-        if value not in ("852_ind1", "852_ind2", "949_ind1", "949_ind2")
-    )
-    extra_fields[:] = (
-        value
-        for value in extra_fields
-        if value not in ("852_ind1", "852_ind2", "949_ind1", "949_ind2")
+        value for value in missing_fields if value not in IGNORED_FIELDS
     )
+    extra_fields[:] = (value for value in extra_fields if value not in IGNORED_FIELDS)
     error_summary = {
         "error_count": len(missing_fields) + len(extra_fields) + len(errors),
         "missing_field_count": len(missing_fields),
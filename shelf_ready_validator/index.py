@@ -0,0 +1,138 @@
+import io
+import os.path
+from typing import BinaryIO, Generator, NamedTuple, Optional
+
+from bookops_marc import SierraBibReader
+from pymarc import Record
+
+LEADER_LEN = 24
+DIRECTORY_ENTRY_LEN = 12
+INDEX_HEADER = "record_number\toffset\tlength\tcontrol_number"
+
+
+class IndexEntry(NamedTuple):
+    """
+    Location of a single record in a MARC file
+    """
+
+    record_number: int
+    offset: int
+    length: int
+    control_number: str
+
+
+def index_path(file: str) -> str:
+    """
+    Returns path of the sidecar index for a MARC file
+    """
+    return f"{file}.idx"
+
+
+def get_control_number(data: bytes) -> str:
+    """
+    Reads the 001 field of a record in transmission format using the directory.
+    Returns an empty string if the record does not have an 001.
+    """
+    base_address = int(data[12:17])
+    for entry_start in range(LEADER_LEN, base_address - 1, DIRECTORY_ENTRY_LEN):
+        if data[entry_start : entry_start + 3] == b"001":
+            length = int(data[entry_start + 3 : entry_start + 7])
+            offset = base_address + int(data[entry_start + 7 : entry_start + 12])
+            return data[offset : offset + length - 1].decode("utf-8", "replace")
+    return ""
+
+
+def scan_marc_file(fh: BinaryIO) -> Generator[IndexEntry, None, None]:
+    """
+    Reads through a MARC file using the record length in each leader and
+    yields the position of each record. Only the leader and directory of each
+    record are parsed.
+    """
+    offset = 0
+    record_number = 0
+    while True:
+        record_length = fh.read(5)
+        if len(record_length) < 5:
+            break
+        try:
+            length = int(record_length)
+        except ValueError:
+            length = 0
+        if length < LEADER_LEN:
+            raise ValueError(
+                f"Invalid record length {record_length!r} at byte {offset}"
+            )
+        data = record_length + fh.read(length - 5)
+        if len(data) < length:
+            raise ValueError(f"Truncated record at byte {offset}")
+        record_number += 1
+        yield IndexEntry(record_number, offset, length, get_control_number(data))
+        offset += length
+
+
+def build_index(file: str) -> list[IndexEntry]:
+    """
+    Scans a MARC file and writes the position of each record to a
+    sidecar .idx file next to it
+    """
+    with open(file, "rb") as fh:
+        index = list(scan_marc_file(fh))
+    with open(index_path(file), "w", encoding="utf-8") as idx:
+        idx.write(f"{INDEX_HEADER}\n")
+        for entry in index:
+            idx.write("\t".join(str(value) for value in entry) + "\n")
+    return index
+
+
+def load_index(file: str) -> list[IndexEntry]:
+    """
+    Reads the sidecar index for a MARC file.
+    The index is (re)built if it does not exist or is older than the file.
+    """
+    idx_file = index_path(file)
+    if not os.path.exists(idx_file):
+        return build_index(file)
+    if os.path.getmtime(idx_file) < os.path.getmtime(file):
+        return build_index(file)
+    index = []
+    with open(idx_file, "r", encoding="utf-8") as idx:
+        if idx.readline().rstrip("\n") != INDEX_HEADER:
+            return build_index(file)
+        for line in idx:
+            record_number, offset, length, control_number = line.rstrip("\n").split(
+                "\t"
+            )
+            index.append(
+                IndexEntry(int(record_number), int(offset), int(length), control_number)
+            )
+    return index
+
+
+def find_records(
+    index: list[IndexEntry],
+    record_number: Optional[int] = None,
+    control_number: Optional[str] = None,
+) -> list[IndexEntry]:
+    """
+    Returns index entries matching a record number and/or control number
+    """
+    return [
+        entry
+        for entry in index
+        if (record_number is None or entry.record_number == record_number)
+        and (control_number is None or entry.control_number == control_number)
+    ]
+
+
+def read_indexed_records(
+    file: str, entries: list[IndexEntry]
+) -> Generator[Record, None, None]:
+    """
+    Seeks to each indexed record in a .mrc file and returns the record
+    """
+    with open(file, "rb") as fh:
+        for entry in entries:
+            fh.seek(entry.offset)
+            reader = SierraBibReader(io.BytesIO(fh.read(entry.length)))
+            for record in reader:
+                yield record
@@ -0,0 +1,138 @@
+import ftplib
+import re
+import stat
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from shelf_ready_validator.download import RemoteFile
+
+UNIX_LIST_LINE = re.compile(
+    r"^(?P<type>[-dlbcps])\S*\s+\d+\s+\S+(?:\s+\S+)?\s+(?P<size>\d+)\s+"
+    r"(?P<month>[A-Za-z]{3})\s+(?P<day>\d{1,2})\s+(?P<time_or_year>\d{1,2}:\d{2}|\d{4})"
+    r"\s(?P<name>.+)$"
+)
+"""
+LIST line in `ls -l` format, whatever the widths of its columns. Some servers
+leave out the group column.
+"""
+
+DOS_LIST_LINE = re.compile(
+    r"^(?P<date>\d{2}-\d{2}-\d{2,4})\s+(?P<time>\d{1,2}:\d{2}[AP]M)\s+"
+    r"(?P<size><DIR>|\d+)\s+(?P<name>.+)$",
+    re.IGNORECASE,
+)
+"""LIST line in the MS-DOS format used by IIS"""
+
+
+def parse_mlsd_modify(modify: str) -> float:
+    """
+    Converts an MLSD modify fact (YYYYMMDDHHMMSS[.sss] in UTC) to a timestamp
+    """
+    modified = datetime.strptime(modify[:14], "%Y%m%d%H%M%S")
+    return modified.replace(tzinfo=timezone.utc).timestamp()
+
+
+def parse_list_line(line: str, now: Optional[datetime] = None) -> Optional[RemoteFile]:
+    """
+    Parses a line of LIST output in `ls -l` or MS-DOS format.
+
+    `ls -l` output only includes the year for files older than six months, so
+    for dates without a year the most recent date that is not in the future
+    is used.
+
+    Args:
+        line: a line of LIST output
+        now: current date and time, used to find the year of recent files
+
+    Returns:
+        RemoteFile, or None if the line is not a regular file or could not
+        be parsed
+
+    """
+    now = now or datetime.now()
+    match = UNIX_LIST_LINE.match(line)
+    if match:
+        if match["type"] != "-":
+            return None
+        time_or_year = match["time_or_year"]
+        if ":" in time_or_year:
+            modified = datetime.strptime(
+                f"{match['month']} {match['day']} {now.year} {time_or_year}",
+                "%b %d %Y %H:%M",
+            )
+            if modified > now + timedelta(days=1):
+                modified = modified.replace(year=now.year - 1)
+        else:
+            modified = datetime.strptime(
+                f"{match['month']} {match['day']} {time_or_year}", "%b %d %Y"
+            )
+        return RemoteFile(match["name"], int(match["size"]), modified.timestamp())
+    match = DOS_LIST_LINE.match(line)
+    if match:
+        if match["size"].upper() == "<DIR>":
+            return None
+        date_format = "%m-%d-%Y" if len(match["date"]) == 10 else "%m-%d-%y"
+        modified = datetime.strptime(
+            f"{match['date']} {match['time'].upper()}", f"{date_format} %I:%M%p"
+        )
+        return RemoteFile(match["name"], int(match["size"]), modified.timestamp())
+    return None
+
+
+def list_ftp_files(ftp_client: ftplib.FTP, path: str = "") -> list[RemoteFile]:
+    """
+    Lists the files in a directory on an ftp site. Uses MLSD, which returns the
+    size and modification time of each file in a machine-readable format, and
+    falls back to parsing LIST output if the server does not support it.
+
+    Args:
+        ftp_client: logged in ftp session
+        path: directory to list; defaults to the current directory
+
+    Returns:
+        list of RemoteFile
+
+    """
+    try:
+        return [
+            RemoteFile(name, int(facts["size"]), parse_mlsd_modify(facts["modify"]))
+            for name, facts in ftp_client.mlsd(path, facts=["type", "size", "modify"])
+            if facts.get("type") == "file"
+        ]
+    except ftplib.error_perm as e:
+        if not str(e).startswith(("500", "501", "502", "504")):
+            raise
+    lines: list[str] = []
+    ftp_client.retrlines(f"LIST {path}".rstrip(), lines.append)
+    now = datetime.now()
+    files = [parse_list_line(line, now) for line in lines]
+    return [file for file in files if file is not None]
+
+
+def list_sftp_files(sftp_client, path: str) -> list[RemoteFile]:
+    """
+    Lists the files in a directory on an sftp site with a single request
+
+    Args:
+        sftp_client: paramiko SFTPClient
+        path: directory to list
+
+    Returns:
+        list of RemoteFile
+
+    """
+    return [
+        RemoteFile(attr.filename, attr.st_size, attr.st_mtime)
+        for attr in sftp_client.listdir_attr(path)
+        if attr.st_mode is None or stat.S_ISREG(attr.st_mode)
+    ]
+
+
+def recent_files(
+    files: list[RemoteFile], days: int = 7, now: Optional[datetime] = None
+) -> list[RemoteFile]:
+    """
+    Returns the files that were modified in the last number of days
+    """
+    cutoff = (now or datetime.now()) - timedelta(days=days)
+    return [file for file in files if file.mtime >= cutoff.timestamp()]
@@ -0,0 +1,127 @@
+import hashlib
+import os.path
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Optional
+
+from shelf_ready_validator.download import RemoteFile
+
+MANIFEST_ENV = "RL_VALIDATOR_SYNC_MANIFEST"
+"""Environment variable with the path of the sync manifest"""
+
+
+def default_manifest_path() -> str:
+    """
+    Returns the path of the sync manifest. Uses RL_VALIDATOR_SYNC_MANIFEST if it
+    is set, otherwise sync_manifest.db in the directory files are downloaded to.
+    """
+    if os.environ.get(MANIFEST_ENV):
+        return os.environ[MANIFEST_ENV]
+    return os.path.join(
+        os.environ["USERPROFILE"],
+        "github/RL-shelf-ready-validation/temp/sync_manifest.db",
+    )
+
+
+def hash_file(path: str) -> str:
+    """
+    Returns the sha256 hash of a file
+    """
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+class SyncManifest:
+    """
+    A SQLite record of the files that have been downloaded from each vendor.
+
+    Files are keyed by vendor and file name. A file is only downloaded again
+    when its size or modification time on the vendor site changes. Each
+    download is recorded in its own transaction, so downloads that finished
+    before an error are not repeated.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path or default_manifest_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS files (
+                    vendor TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    sha256 TEXT,
+                    local_path TEXT NOT NULL,
+                    downloaded_at TEXT NOT NULL,
+                    PRIMARY KEY (vendor, filename)
+                )
+                """
+            )
+
+    def get(self, vendor: str, filename: str) -> Optional[dict[str, Any]]:
+        """
+        Returns the manifest entry for a file, or None if it was never downloaded
+        """
+        with self.lock:
+            cursor = self.conn.execute(
+                "SELECT * FROM files WHERE vendor = ? AND filename = ?",
+                (vendor, filename),
+            )
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([column[0] for column in cursor.description], row))
+
+    def is_current(self, vendor: str, file: RemoteFile) -> bool:
+        """
+        Checks if a file was downloaded, is still on disk and has not changed on the
+        vendor site since
+        """
+        entry = self.get(vendor, file.name)
+        return (
+            entry is not None
+            and entry["size"] == file.size
+            and entry["mtime"] == file.mtime
+            and os.path.exists(entry["local_path"])
+        )
+
+    def record(
+        self,
+        vendor: str,
+        file: RemoteFile,
+        local_path: str,
+        sha256: Optional[str] = None,
+    ) -> None:
+        """
+        Records a finished download
+        """
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    vendor,
+                    file.name,
+                    file.size,
+                    file.mtime,
+                    sha256,
+                    local_path,
+                    datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "SyncManifest":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
@@ -0,0 +1,209 @@
+import io
+import mmap
+from typing import Generator, Optional, Union
+
+from bookops_marc import SierraBibReader
+from pymarc import Field, Record, Subfield, marc8_to_unicode
+from pymarc.constants import END_OF_FIELD, SUBFIELD_INDICATOR
+
+from shelf_ready_validator.index import DIRECTORY_ENTRY_LEN, LEADER_LEN
+
+SUBJECT_TAGS = (
+    "600",
+    "610",
+    "611",
+    "630",
+    "648",
+    "650",
+    "651",
+    "653",
+    "654",
+    "655",
+    "656",
+    "657",
+    "658",
+    "662",
+    "690",
+    "691",
+    "696",
+    "697",
+    "698",
+    "699",
+)
+"""Tags returned by pymarc's Record.subjects"""
+
+
+def is_marc8(leader: bytes) -> bool:
+    """
+    Checks if a record is encoded in MARC-8, i.e. does not have "a" (UCS/Unicode)
+    in leader position 9
+    """
+    return leader[9:10] != b"a"
+
+
+def decode_value(data: bytes, marc8: bool = False) -> str:
+    """
+    Decodes a subfield value the same way pymarc does: as UTF-8, or from MARC-8
+    for MARC-8 records
+    """
+    if marc8:
+        return marc8_to_unicode(data)
+    return data.decode("utf-8")
+
+
+def decode_field(tag: str, data: bytes, marc8: bool = False) -> Field:
+    """
+    Decodes a single field in transmission format (without the field terminator)
+    the same way pymarc does
+    """
+    if tag < "010" and tag.isdigit():
+        return Field(tag=tag, data=data.decode("iso8859-1" if marc8 else "utf-8"))
+    subs = data.split(SUBFIELD_INDICATOR.encode("ascii"))
+    indicators = subs[0].decode("ascii")
+    first_indicator = indicators[0:1] or " "
+    second_indicator = indicators[1:2] or " "
+    subfields = [
+        Subfield(
+            code=subfield[0:1].decode("ascii"), value=decode_value(subfield[1:], marc8)
+        )
+        for subfield in subs[1:]
+        if subfield
+    ]
+    return Field(
+        tag=tag,
+        indicators=[first_indicator, second_indicator],
+        subfields=subfields,
+    )
+
+
+class MappedRecord:
+    """
+    A MARC record read from a slice of a memory-mapped file.
+
+    Supports the parts of the pymarc Record interface used by the validator.
+    The directory is read the first time the record is accessed and each field
+    is only decoded the first time it is read.
+    """
+
+    def __init__(self, data: Union[bytes, memoryview]) -> None:
+        self._data = memoryview(data)
+        self._directory: Optional[list[tuple[str, int, int]]] = None
+        self._fields: dict[int, Field] = {}
+        self._marc8 = is_marc8(bytes(self._data[:LEADER_LEN]))
+
+    def __reduce__(self):
+        return (MappedRecord, (bytes(self._data),))
+
+    def _get_directory(self) -> list[tuple[str, int, int]]:
+        """
+        Returns (tag, start, end) of each field in the record
+        """
+        if self._directory is None:
+            data = self._data
+            base_address = int(bytes(data[12:17]))
+            directory = bytes(data[LEADER_LEN : base_address - 1]).decode("ascii")
+            self._directory = []
+            for entry_start in range(0, len(directory), DIRECTORY_ENTRY_LEN):
+                entry = directory[entry_start : entry_start + DIRECTORY_ENTRY_LEN]
+                start = base_address + int(entry[7:12])
+                end = start + int(entry[3:7])
+                if data[end - 1 : end] == END_OF_FIELD.encode("ascii"):
+                    end -= 1
+                self._directory.append((entry[0:3], start, end))
+        return self._directory
+
+    def _get_field(self, position: int) -> Field:
+        if position not in self._fields:
+            tag, start, end = self._get_directory()[position]
+            self._fields[position] = decode_field(
+                tag, bytes(self._data[start:end]), self._marc8
+            )
+        return self._fields[position]
+
+    @property
+    def leader(self) -> str:
+        return bytes(self._data[:LEADER_LEN]).decode("ascii")
+
+    @property
+    def fields(self) -> list[Field]:
+        return [self._get_field(i) for i in range(len(self._get_directory()))]
+
+    def get_fields(self, *args: str) -> list[Field]:
+        """
+        Returns fields with the given tags in the order they appear in the record
+        """
+        return [
+            self._get_field(i)
+            for i, (tag, _, _) in enumerate(self._get_directory())
+            if not args or tag in args
+        ]
+
+    def get(self, tag: str, default: Optional[Field] = None) -> Optional[Field]:
+        try:
+            return self[tag]
+        except KeyError:
+            return default
+
+    def __contains__(self, tag: str) -> bool:
+        return any(entry[0] == tag for entry in self._get_directory())
+
+    def __getitem__(self, tag: str) -> Field:
+        for i, entry in enumerate(self._get_directory()):
+            if entry[0] == tag:
+                return self._get_field(i)
+        raise KeyError
+
+    @property
+    def subjects(self) -> list[Field]:
+        return self.get_fields(*SUBJECT_TAGS)
+
+    @property
+    def physicaldescription(self) -> list[Field]:
+        return self.get_fields("300")
+
+    def as_marc(self) -> bytes:
+        return bytes(self._data)
+
+    def as_record(self) -> Record:
+        """
+        Fully parses the record with SierraBibReader
+        """
+        return next(iter(SierraBibReader(io.BytesIO(self.as_marc()))))
+
+    def __str__(self) -> str:
+        return str(self.as_record())
+
+
+def read_mapped_records(file: str) -> Generator[MappedRecord, None, None]:
+    """
+    Memory-maps a .mrc file and returns each record as a slice of the mapped file
+    without copying it
+    """
+    with open(file, "rb") as fh:
+        if fh.seek(0, io.SEEK_END) == 0:
+            return
+        mapped_file = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped_file)
+    try:
+        offset = 0
+        while offset + 5 <= len(view):
+            record_length = bytes(view[offset : offset + 5])
+            try:
+                length = int(record_length)
+            except ValueError:
+                length = 0
+            if length < LEADER_LEN:
+                raise ValueError(
+                    f"Invalid record length {record_length!r} at byte {offset}"
+                )
+            if offset + length > len(view):
+                raise ValueError(f"Truncated record at byte {offset}")
+            yield MappedRecord(view[offset : offset + length])
+            offset += length
+    finally:
+        view.release()
+        try:
+            mapped_file.close()
+        except BufferError:
+            # records are still in use; the mapping is released with the last one
+            pass
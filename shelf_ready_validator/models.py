@@ -1,7 +1,11 @@
-from typing import Literal, Optional, Annotated, Union, List
+import json
+import os
+from importlib.resources import files
+from typing import Any, Literal, Optional, Annotated, Union, List
 
 from pydantic import (
     BaseModel,
+    BeforeValidator,
     Field,
     ConfigDict,
     ValidationError,
@@ -9,6 +13,100 @@ from pydantic import (
 )
 from pydantic_core import InitErrorDetails, PydanticCustomError
 
+LOCATION_RULES_ENV = "RL_VALIDATOR_LOCATION_RULES"
+
+
+def _read_location_rules(path: Optional[str] = None) -> dict[str, Any]:
+    path = path or os.environ.get(LOCATION_RULES_ENV)
+    if path:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    rules_file = files("shelf_ready_validator").joinpath("data/location_rules.json")
+    return json.loads(rules_file.read_text(encoding="utf-8"))
+
+
+def load_location_rules(
+    path: Optional[str] = None,
+) -> frozenset[tuple[Optional[str], Optional[str], str]]:
+    """
+    Reads valid combinations of item location, item type and order location
+    from a JSON file.
+
+    Args:
+        path: path to a JSON file. Defaults to the file named by the
+            RL_VALIDATOR_LOCATION_RULES environment variable, or the
+            data/location_rules.json file included with the package.
+
+    Returns:
+        frozenset of (item_location, item_type, order_location) tuples
+
+    """
+    rules = _read_location_rules(path)
+    return frozenset(
+        (rule["item_location"], rule["item_type"], rule["order_location"])
+        for rule in rules["valid_combinations"]
+    )
+
+
+def load_location_codes(
+    path: Optional[str] = None,
+) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """
+    Reads the valid item and order location codes from a JSON file. Codes
+    used in valid_combinations are valid even if they are not listed in
+    item_locations or order_locations.
+
+    Args:
+        path: path to a JSON file (see load_location_rules)
+
+    Returns:
+        tuple of item location codes and tuple of order location codes
+
+    """
+    rules = _read_location_rules(path)
+    codes = []
+    for field in ("item_location", "order_location"):
+        field_codes = list(rules.get(f"{field}s", []))
+        field_codes.extend(rule[field] for rule in rules["valid_combinations"])
+        codes.append(tuple(dict.fromkeys(c for c in field_codes if c is not None)))
+    return codes[0], codes[1]
+
+
+VALID_LOCATION_COMBINATIONS = load_location_rules()
+"""
+Valid (item_location, item_type, order_location) combinations for monograph items
+Loaded once at import time so each item is checked with a set lookup
+
+"""
+
+ITEM_LOCATIONS, ORDER_LOCATIONS = load_location_codes()
+"""Valid item (949$l) and order (960$t) location codes, in the order they are listed"""
+
+
+def _one_of(codes: tuple[str, ...]) -> BeforeValidator:
+    """
+    Validator that accepts only the given codes. Raises the same literal_error
+    as a Literal of the codes, so errors are reported in the same way.
+    """
+    allowed = frozenset(codes)
+    quoted = [repr(code) for code in codes]
+    expected = (
+        quoted[0] if len(quoted) == 1 else f"{', '.join(quoted[:-1])} or {quoted[-1]}"
+    )
+
+    def check(value: Any) -> Any:
+        if not isinstance(value, str) or value not in allowed:
+            raise PydanticCustomError(
+                "literal_error", "Input should be {expected}", {"expected": expected}
+            )
+        return value
+
+    return BeforeValidator(check)
+
+
+ItemLocation = Annotated[str, _one_of(ITEM_LOCATIONS)]
+OrderLocation = Annotated[str, _one_of(ORDER_LOCATIONS)]
+
 
 class ItemBPL(BaseModel):
     """
@@ -77,20 +175,7 @@ class ItemNYPLRL(BaseModel):
     message: Optional[Annotated[str, Field(..., pattern=r"^[^a-z]+")]] = None
     item_vendor_code: Annotated[Literal["EVP", "AUXAM", "LEILA"], Field(...)]
     item_agency: Literal["43"]
-    item_location: Optional[
-        Literal[
-            "rcmb2",
-            "rcmf2",
-            "rcmg2",
-            "rc2ma",
-            "rcmp2",
-            "rcmb2",
-            "rcph2",
-            "rcpm2",
-            "rcpt2",
-            "rc2cf",
-        ]
-    ] = None
+    item_location: Optional[ItemLocation] = None
     item_type: Optional[Literal["55", "2"]] = None
     library: Annotated[Literal["RL"], Field(...)]
     item_ind1: Literal[" "]
@@ -131,9 +216,7 @@ class MonographRecord(BaseModel):
     invoice_number: str
     invoice_copies: Annotated[str, Field(pattern=r"^[0-9]+$")]
     order_price: Annotated[str, Field(pattern=r"^\d{3,}$")]
-    order_location: Literal[
-        "MAB", "MAF", "MAG", "MAL", "MAP", "MAS", "PAD", "PAH", "PAM", "PAT", "SC"
-    ]
+    order_location: OrderLocation
     order_fund: str
     order_ind1: Literal[" "]
     order_ind2: Literal[" "]
@@ -156,89 +239,8 @@ class MonographRecord(BaseModel):
             for item in item_list:
                 item_location = item.get("item_location")
                 item_type = item.get("item_type")
-                valid_types = [
-                    ("rcmb2", "2", "MAB"),
-                    (
-                        "rcmf2",
-                        "55",
-                        "MAF",
-                    ),
-                    (
-                        "rcmf2",
-                        None,
-                        "MAF",
-                    ),
-                    (
-                        "rcmg2",
-                        "55",
-                        "MAG",
-                    ),
-                    (
-                        "rcmg2",
-                        None,
-                        "MAG",
-                    ),
-                    (
-                        "rc2ma",
-                        "55",
-                        "MAL",
-                    ),
-                    ("rc2ma", None, "MAL"),
-                    (None, None, "MAL"),
-                    (None, "55", "MAL"),
-                    (
-                        "rcmp2",
-                        "2",
-                        "MAP",
-                    ),
-                    (
-                        "rcmb2",
-                        "2",
-                        "MAS",
-                    ),
-                    (
-                        "rcph2",
-                        "55",
-                        "PAH",
-                    ),
-                    (
-                        "rcph2",
-                        None,
-                        "PAH",
-                    ),
-                    (
-                        "rcpm2",
-                        "55",
-                        "PAM",
-                    ),
-                    (
-                        "rcpm2",
-                        None,
-                        "PAM",
-                    ),
-                    (
-                        "rcpt2",
-                        "55",
-                        "PAT",
-                    ),
-                    (
-                        "rcpt2",
-                        None,
-                        "PAT",
-                    ),
-                    (
-                        "rc2cf",
-                        "55",
-                        "SC",
-                    ),
-                    (
-                        "rc2cf",
-                        None,
-                        "SC",
-                    ),
-                ]
                 item_group = (item_location, item_type, order_location)
-                if item_group in valid_types:
+                if item_group in VALID_LOCATION_COMBINATIONS:
                     pass
                 elif None in item_group:
                     pass
@@ -303,9 +305,7 @@ class OtherMaterialRecord(BaseModel):
     invoice_number: str
     invoice_copies: Annotated[str, Field(pattern=r"^[0-9]+$")]
     order_price: Annotated[str, Field(pattern=r"^\d{3,}$")]
-    order_location: Literal[
-        "MAB", "MAF", "MAG", "MAL", "MAP", "MAS", "PAD", "PAH", "PAM", "PAT", "SC"
-    ]
+    order_location: OrderLocation
     order_fund: str
     order_ind1: Literal[" "]
     order_ind2: Literal[" "]
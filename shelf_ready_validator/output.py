@@ -0,0 +1,187 @@
+import json
+import queue
+import sys
+import threading
+from typing import Any, Optional, TextIO
+
+from rich.console import Console
+
+OUTPUT_FORMATS = ("text", "json")
+"""Ways of printing validation results to the terminal"""
+
+BATCH_SIZE = 256
+"""Number of results handed to the JSON writer thread at a time"""
+
+
+class ResultPrinter:
+    """
+    Prints validation results to the terminal with rich markup as each record is
+    validated. With quiet, nothing is printed for each record; messages and
+    summaries are still printed.
+    """
+
+    def __init__(self, console: Console, quiet: bool = False) -> None:
+        self.console = console
+        self.quiet = quiet
+
+    def message(self, text: str) -> None:
+        """Prints a progress message, such as the name of the file being checked"""
+        self.console.print(text)
+
+    def report(self, result: dict[str, Any], errors: list[dict[str, Any]]) -> None:
+        """
+        Prints the outcome of validate-all for a record
+
+        Args:
+            result: output report of a record, as yielded to export
+            errors: formatted errors of an invalid record
+
+        """
+        if self.quiet:
+            return
+        n = result["record_number"]
+        if result["valid"]:
+            self.console.print(
+                f"\n[record]Record #{n}[/] (control_no [control_no]{result['control_number']}[/]) is valid."
+            )
+        else:
+            self.console.print(
+                f"\nRecord [record]#{n}[/] contains [error]{result['error_count']} error(s)[/]"
+            )
+            for error in errors:
+                self.console.print(f"\t{error['msg']}: {error['input']} {error['loc']}")
+
+    def raw(self, result: dict[str, Any]) -> None:
+        """Prints the outcome of validate-raw for a record"""
+        if self.quiet:
+            return
+        n = result["record_number"]
+        control_number = result["control_number"]
+        if result["valid"]:
+            self.console.print(f"Record # {n} (control no {control_number}) validates")
+        else:
+            self.console.print(f"Record #{n} (control no {control_number}) has errors")
+            self.console.print(result["errors"])
+
+    def summary(self, text: str, data: dict[str, Any]) -> None:
+        """
+        Prints a summary of the validated records
+
+        Args:
+            text: summary with rich markup
+            data: the same summary as a dict, used by the JSON output
+
+        """
+        self.console.print(text)
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "ResultPrinter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class JsonResultPrinter(ResultPrinter):
+    """
+    Writes each validation result as a line of JSON, with no rich markup.
+
+    Results are passed to a writer thread BATCH_SIZE at a time and encoded and
+    written there, so the validation loop only appends each result to a list.
+    Messages are printed to stderr so stdout only contains JSON lines. An error
+    from the writer thread is raised by the next batch or by close.
+    """
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        err_console: Optional[Console] = None,
+        quiet: bool = False,
+        batch_size: int = BATCH_SIZE,
+        queue_size: int = 8,
+    ) -> None:
+        super().__init__(err_console or Console(stderr=True), quiet)
+        self.stream = stream or sys.stdout
+        self.batch_size = batch_size
+        self.batch: list[dict[str, Any]] = []
+        self.error: Optional[Exception] = None
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.thread = threading.Thread(
+            target=self._drain, name="json-output", daemon=True
+        )
+        self.thread.start()
+
+    def _drain(self) -> None:
+        for batch in iter(self.queue.get, None):
+            if self.error is not None:
+                continue
+            try:
+                self.stream.write(
+                    "".join(json.dumps(item, default=str) + "\n" for item in batch)
+                )
+                self.stream.flush()
+            except Exception as e:
+                self.error = e
+
+    def _write(self, item: dict[str, Any]) -> None:
+        self.batch.append(item)
+        if len(self.batch) >= self.batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self.error is not None:
+            raise self.error
+        if self.batch:
+            self.queue.put(self.batch)
+            self.batch = []
+
+    def report(self, result: dict[str, Any], errors: list[dict[str, Any]]) -> None:
+        if not self.quiet:
+            self._write({**result, "errors": errors})
+
+    def raw(self, result: dict[str, Any]) -> None:
+        if not self.quiet:
+            self._write(
+                {
+                    "record_number": result["record_number"],
+                    "control_number": result["control_number"],
+                    "valid": result["valid"],
+                    "errors": result["errors"],
+                }
+            )
+
+    def summary(self, text: str, data: dict[str, Any]) -> None:
+        self._write(data)
+
+    def close(self) -> None:
+        try:
+            self._flush()
+        finally:
+            self.queue.put(None)
+            self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+
+def get_result_printer(
+    output_format: str, console: Console, quiet: bool = False
+) -> ResultPrinter:
+    """
+    Returns the printer for an output format
+
+    Args:
+        output_format: one of OUTPUT_FORMATS
+        console: console results are printed to in text format
+        quiet: do not print anything for each record
+
+    Returns:
+        ResultPrinter
+
+    """
+    if output_format == "json":
+        return JsonResultPrinter(quiet=quiet)
+    if output_format == "text":
+        return ResultPrinter(console, quiet)
+    raise ValueError(f"Unknown output format: {output_format}")
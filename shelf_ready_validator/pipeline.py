@@ -0,0 +1,166 @@
+import asyncio
+import queue
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Generator, Iterable, Iterator
+
+PIPELINES = ("sync", "async")
+"""Ways of running the read, validate and report stages"""
+
+QUEUE_SIZE = 4
+"""Default number of chunks waiting between two stages of the async pipeline"""
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+async def _read_stage(
+    chunks: Iterator[Any], read_queue: asyncio.Queue, stop: threading.Event
+) -> None:
+    """
+    Reads chunks in a thread so the event loop is free while the file is read
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        if stop.is_set():
+            chunk = _DONE
+        else:
+            chunk = await loop.run_in_executor(None, next, chunks, _DONE)
+        await read_queue.put(chunk)
+        if chunk is _DONE:
+            return
+
+
+async def _validate_stage(
+    func: Callable[[Any], Any],
+    executor: Executor,
+    read_queue: asyncio.Queue,
+    validated_queue: asyncio.Queue,
+) -> None:
+    """
+    Submits each chunk to the executor. The futures are queued in the order the
+    chunks were read, so the size of validated_queue limits the number of chunks
+    in flight.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = await read_queue.get()
+        if chunk is _DONE:
+            await validated_queue.put(_DONE)
+            return
+        await validated_queue.put(loop.run_in_executor(executor, func, chunk))
+
+
+async def _deliver_stage(validated_queue: asyncio.Queue, output: queue.Queue) -> None:
+    """
+    Passes results to the consumer in order. Waits in a thread when the
+    consumer is behind so the other stages keep running.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        future = await validated_queue.get()
+        if future is _DONE:
+            return
+        result = await future
+        await loop.run_in_executor(None, output.put, result)
+
+
+async def _run_pipeline(
+    chunks: Iterator[Any],
+    func: Callable[[Any], Any],
+    executor: Executor,
+    output: queue.Queue,
+    stop: threading.Event,
+    queue_size: int,
+) -> None:
+    read_queue: asyncio.Queue = asyncio.Queue(queue_size)
+    validated_queue: asyncio.Queue = asyncio.Queue(queue_size)
+    tasks = [
+        asyncio.ensure_future(_read_stage(chunks, read_queue, stop)),
+        asyncio.ensure_future(
+            _validate_stage(func, executor, read_queue, validated_queue)
+        ),
+        asyncio.ensure_future(_deliver_stage(validated_queue, output)),
+    ]
+    done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    for task in pending:
+        task.cancel()
+    for task in done:
+        task.result()
+
+
+def pipeline_map(
+    func: Callable[[Any], Any],
+    chunks: Iterable[Any],
+    workers: int = 1,
+    queue_size: int = QUEUE_SIZE,
+) -> Generator[Any, None, None]:
+    """
+    Calls func on each chunk and yields the results in order, running the
+    reading of chunks, the calls to func and the consumer of the results at
+    the same time.
+
+    The stages run as asyncio tasks in a background thread, joined by queues of
+    at most queue_size chunks so a large file is never read into memory all at
+    once. Chunks are read in a thread and func is called in a process pool with
+    more than one worker, or in a single thread otherwise. The wall time of the
+    whole pipeline is close to that of its slowest stage rather than the sum of
+    all of them.
+
+    Args:
+        func: function called with each chunk. Must be picklable with more than
+            one worker.
+        chunks: iterable of chunks, such as lists of numbered records
+        workers: number of worker processes to call func in
+        queue_size: number of chunks waiting between two stages. Raised to two
+            chunks per worker so every worker is kept busy.
+
+    Yields:
+        func(chunk) for each chunk, in the order the chunks were read
+
+    """
+    queue_size = max(queue_size, workers * 2)
+    output: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def run() -> None:
+        try:
+            executor: Executor
+            if workers > 1:
+                executor = ProcessPoolExecutor(max_workers=workers)
+            else:
+                executor = ThreadPoolExecutor(max_workers=1)
+            with executor:
+                asyncio.run(
+                    _run_pipeline(
+                        iter(chunks), func, executor, output, stop, queue_size
+                    )
+                )
+        except BaseException as e:
+            output.put(_Failure(e))
+        else:
+            output.put(_DONE)
+
+    thread = threading.Thread(target=run, name="validation-pipeline", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = output.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        # stop reading and let the pipeline drain if the consumer stopped early
+        stop.set()
+        while thread.is_alive():
+            try:
+                output.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        thread.join()
@@ -0,0 +1,212 @@
+import json
+import platform
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any, ContextManager, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+STAGES = ("read", "translate", "validate", "format_errors", "cache", "print", "export")
+"""Pipeline stages in the order they are listed in the profile summary"""
+
+
+class StageTime:
+    """
+    Wall and CPU time spent in a stage and the number of times it was called.
+    CPU time is the time of the thread that ran the stage, so stages running
+    in different threads at the same time are not counted twice.
+    """
+
+    __slots__ = ("calls", "wall", "cpu")
+
+    def __init__(self, calls: int = 0, wall: float = 0.0, cpu: float = 0.0) -> None:
+        self.calls = calls
+        self.wall = wall
+        self.cpu = cpu
+
+    def add(self, calls: int, wall: float, cpu: float) -> None:
+        self.calls += calls
+        self.wall += wall
+        self.cpu += cpu
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"calls": self.calls, "wall_seconds": self.wall, "cpu_seconds": self.cpu}
+
+
+class Profiler:
+    """
+    Times each stage of a run. Stages can be timed from any thread; timings
+    from worker processes are added with merge.
+    """
+
+    def __init__(self) -> None:
+        self.stages: dict[str, StageTime] = {}
+        self.started = datetime.now(timezone.utc)
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self._lock = threading.Lock()
+
+    def add(self, name: str, wall: float, cpu: float, calls: int = 1) -> None:
+        with self._lock:
+            self.stages.setdefault(name, StageTime()).add(calls, wall, cpu)
+
+    def merge(self, stages: dict[str, StageTime]) -> None:
+        """Adds the timings of another profiler, e.g. one in a worker process"""
+        for name, stage_time in stages.items():
+            self.add(name, stage_time.wall, stage_time.cpu, stage_time.calls)
+
+    @contextmanager
+    def stage(self, name: str, calls: int = 1) -> Iterator[None]:
+        """
+        Times the body of a with block as calls calls to a stage, e.g. a chunk
+        of 100 records as 100 calls
+        """
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - wall, time.thread_time() - cpu, calls)
+
+    def timed(self, name: str, iterable: Iterable[T]) -> Iterator[T]:
+        """Yields from iterable, timing each step as a call to a stage"""
+        iterator = iter(iterable)
+        while True:
+            wall = time.perf_counter()
+            cpu = time.thread_time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.add(name, time.perf_counter() - wall, time.thread_time() - cpu)
+            yield item
+
+    @property
+    def records(self) -> int:
+        """Number of records read"""
+        read = self.stages.get("read")
+        return read.calls if read else 0
+
+    def _ordered_stages(self) -> list[tuple[str, StageTime]]:
+        order = {name: i for i, name in enumerate(STAGES)}
+        return sorted(
+            self.stages.items(),
+            key=lambda item: (order.get(item[0], len(order)), item[0]),
+        )
+
+    def as_dict(self, command: Optional[list[str]] = None) -> dict[str, Any]:
+        """
+        Metrics for the run so far, as written by write_json
+
+        Args:
+            command: command line arguments of the run
+
+        """
+        try:
+            package_version: Optional[str] = version("shelf-ready-validator")
+        except PackageNotFoundError:
+            package_version = None
+        return {
+            "version": package_version,
+            "python": platform.python_version(),
+            "started": self.started.isoformat(timespec="seconds"),
+            "command": command if command is not None else sys.argv[1:],
+            "records": self.records,
+            "wall_seconds": time.perf_counter() - self._wall,
+            "cpu_seconds": time.process_time() - self._cpu,
+            "stages": {name: stage.as_dict() for name, stage in self._ordered_stages()},
+        }
+
+    def write_json(self, path: str) -> None:
+        """Writes the metrics for the run to a JSON file"""
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.as_dict(), fh, indent=2)
+            fh.write("\n")
+
+    def lines(self) -> list[str]:
+        """
+        Summary table of the time spent in each stage, total and per record.
+        Stages run at the same time with --pipeline async or --workers, so
+        their times can add up to more than the length of the run.
+        """
+        total = time.perf_counter() - self._wall
+        records = self.records
+        per_record = f" ({total / records * 1000:.3f} ms per record)" if records else ""
+        lines = [
+            f"\nProfile of {records:,} record(s) in {total:.2f}s{per_record}",
+            f"{'stage':<14}{'calls':>10}{'wall s':>10}{'cpu s':>10}"
+            f"{'ms/record':>11}{'% wall':>8}",
+        ]
+        for name, stage in self._ordered_stages():
+            ms_per_record = stage.wall / records * 1000 if records else 0.0
+            share = stage.wall / total if total else 0.0
+            lines.append(
+                f"{name:<14}{stage.calls:>10,}{stage.wall:>10.3f}{stage.cpu:>10.3f}"
+                f"{ms_per_record:>11.3f}{share:>8.1%}"
+            )
+        return lines
+
+
+_profiler: Optional[Profiler] = None
+_local = threading.local()
+
+
+def enable() -> Profiler:
+    """Starts timing stages with a new profiler and returns it"""
+    global _profiler
+    _profiler = Profiler()
+    return _profiler
+
+
+def disable() -> None:
+    global _profiler
+    _profiler = None
+
+
+def active() -> Optional[Profiler]:
+    """
+    Returns the profiler stages are timed with in this thread, or None if
+    profiling is off
+    """
+    return getattr(_local, "profiler", None) or _profiler
+
+
+@contextmanager
+def collect() -> Iterator[Profiler]:
+    """
+    Times the stages run in this thread with a new profiler instead of the
+    active one. Used by worker processes to send their timings back with
+    their results.
+    """
+    previous = getattr(_local, "profiler", None)
+    _local.profiler = Profiler()
+    try:
+        yield _local.profiler
+    finally:
+        _local.profiler = previous
+
+
+def stage(name: str, calls: int = 1) -> ContextManager[None]:
+    """
+    Times the body of a with block as a stage of the active profiler. Does
+    nothing if profiling is off.
+    """
+    profiler = active()
+    if profiler is None:
+        return nullcontext()
+    return profiler.stage(name, calls)
+
+
+def timed(name: str, iterable: Iterable[T]) -> Iterable[T]:
+    """
+    Times each step of iterable as a call to a stage of the active profiler.
+    Returns iterable unchanged if profiling is off.
+    """
+    profiler = active()
+    if profiler is None:
+        return iterable
+    return profiler.timed(name, iterable)
@@ -0,0 +1,294 @@
+import asyncio
+import os
+import threading
+import uuid
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Generator, Iterable, Optional
+
+from shelf_ready_validator.sheet import SheetWriter
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+SPREADSHEET_ID = "1ZYuhMIE1WiduV98Pdzzw7RwZ08O-sJo7HJihWVgSOhQ"
+SHEET_RANGE = "RecordOutput!A1:M10000"
+
+REPORT_COLUMNS = [
+    "vendor_code",
+    "record_number",
+    "control_number",
+    "valid",
+    "error_count",
+    "missing_field_count",
+    "missing_fields",
+    "extra_field_count",
+    "extra_fields",
+    "invalid_field_count",
+    "invalid_fields",
+    "other_errors",
+    "other_error_fields",
+]
+"""Columns of the error report, in the order they are written"""
+
+REPORT_HEADER = ["validation-date", "filename"] + REPORT_COLUMNS
+"""Columns of each chunk returned by report_chunks"""
+
+COUNT_COLUMNS = [
+    "record_number",
+    "error_count",
+    "missing_field_count",
+    "extra_field_count",
+    "invalid_field_count",
+]
+"""Integer columns of the error report, which are missing for valid records"""
+
+
+def report_chunks(
+    reports: Iterable[dict[str, Any]],
+    file: str,
+    validation_date: str,
+    chunk_size: int = 500,
+) -> Generator["pd.DataFrame", None, None]:
+    """
+    Splits a stream of record reports from validate-all into DataFrames of at
+    most chunk_size rows. Only one chunk is held in memory at a time.
+
+    Args:
+        reports: iterable of record reports from validate-all
+        file: name of the validated file, used for reports that do not have
+            a filename
+        validation_date: date and time of the validation run
+        chunk_size: maximum number of rows in each DataFrame
+
+    Yields:
+        DataFrame with validation-date and filename columns followed by
+        REPORT_COLUMNS. Missing values are filled with "None".
+
+    """
+    import pandas as pd
+
+    iterator = iter(reports)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        output_df = pd.DataFrame(chunk, columns=REPORT_HEADER[1:])
+        output_df = output_df.astype(
+            {column: "Int64" for column in COUNT_COLUMNS}
+        ).astype("string")
+        output_df["filename"] = output_df["filename"].fillna(file)
+        output_df = output_df.fillna("None")
+        output_df.insert(loc=0, column="validation-date", value=validation_date)
+        yield output_df
+
+
+class ReportWriter:
+    """
+    Base class for writers that append chunks of the error report to a sink.
+    Writers are context managers and close their sink on exit.
+    """
+
+    def write(self, output_df: "pd.DataFrame") -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def summary(self) -> Optional[str]:
+        """
+        Returns a summary of what was written, if the writer keeps one
+        """
+        return None
+
+    def __enter__(self) -> "ReportWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class SheetReportWriter(ReportWriter):
+    """
+    Appends each chunk of the report to the RecordOutput google sheet. One
+    SheetWriter, and so one set of credentials and one Sheets service, is used
+    for the whole report.
+    """
+
+    def __init__(self, spreadsheet_id: str, range_name: str) -> None:
+        self.sheet_writer = SheetWriter(spreadsheet_id, range_name)
+
+    def write(self, output_df: "pd.DataFrame") -> None:
+        self.sheet_writer.append(output_df.values.tolist())
+
+    def summary(self) -> Optional[str]:
+        return self.sheet_writer.summary()
+
+
+class CsvReportWriter(ReportWriter):
+    """
+    Appends each chunk of the report to a .csv file. The header is only
+    written when the file is new or empty.
+    """
+
+    def __init__(self, out: str) -> None:
+        self.fh = open(out, "a", newline="", encoding="utf-8")
+        self.header = self.fh.tell() == 0
+
+    def write(self, output_df: "pd.DataFrame") -> None:
+        output_df.to_csv(self.fh, header=self.header, index=False)
+        self.header = False
+
+    def close(self) -> None:
+        self.fh.close()
+
+
+class JsonlReportWriter(ReportWriter):
+    """
+    Appends each chunk of the report to a .jsonl file, one row per line
+    """
+
+    def __init__(self, out: str) -> None:
+        self.fh = open(out, "a", encoding="utf-8")
+
+    def write(self, output_df: "pd.DataFrame") -> None:
+        output_df.to_json(self.fh, orient="records", lines=True, force_ascii=False)
+
+    def close(self) -> None:
+        self.fh.close()
+
+
+class ParquetReportWriter(ReportWriter):
+    """
+    Writes each chunk of the report as an Arrow record batch to a new Parquet
+    file in a dataset partitioned by vendor and validation date:
+
+        {out}/vendor={vendor}/date={date}/{file}-{id}.parquet
+
+    Each run adds a file to the dataset so reports can be queried together
+    with pyarrow.dataset or pandas.read_parquet. Requires pyarrow.
+    """
+
+    def __init__(self, out: str, vendor: str, date: str, file: str) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("pyarrow is required to export reports to parquet")
+        self.pa = pa
+        self.schema = pa.schema(
+            [(column, pa.string()) for column in REPORT_HEADER],
+        )
+        partition = os.path.join(out, f"vendor={vendor}", f"date={date}")
+        os.makedirs(partition, exist_ok=True)
+        self.path = os.path.join(
+            partition, f"{os.path.splitext(file)[0]}-{uuid.uuid4().hex}.parquet"
+        )
+        self.writer = pq.ParquetWriter(self.path, self.schema)
+
+    def write(self, output_df: "pd.DataFrame") -> None:
+        batch = self.pa.RecordBatch.from_pandas(
+            output_df, schema=self.schema, preserve_index=False
+        )
+        self.writer.write_batch(batch)
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class AsyncReportWriter(ReportWriter):
+    """
+    Writes chunks of the report with another writer in a background asyncio
+    task, so the next chunk is validated and built while the previous one is
+    sent. At most queue_size chunks wait to be written. An error from the
+    wrapped writer is raised by the next call to write or by close.
+    """
+
+    def __init__(self, writer: ReportWriter, queue_size: int = 2) -> None:
+        self.writer = writer
+        self.error: Optional[Exception] = None
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(
+            target=self.loop.run_forever, name="report-writer", daemon=True
+        )
+        self.thread.start()
+        self.queue: asyncio.Queue = self._call(self._make_queue(queue_size))
+        self.task = asyncio.run_coroutine_threadsafe(self._drain(), self.loop)
+
+    def _call(self, coro: Any) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    @staticmethod
+    async def _make_queue(queue_size: int) -> asyncio.Queue:
+        return asyncio.Queue(queue_size)
+
+    async def _drain(self) -> None:
+        while True:
+            output_df = await self.queue.get()
+            if output_df is None:
+                return
+            if self.error is not None:
+                continue
+            try:
+                await self.loop.run_in_executor(None, self.writer.write, output_df)
+            except Exception as e:
+                self.error = e
+
+    def write(self, output_df: "pd.DataFrame") -> None:
+        if self.error is not None:
+            raise self.error
+        self._call(self.queue.put(output_df))
+
+    def close(self) -> None:
+        try:
+            self._call(self.queue.put(None))
+            self.task.result()
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.loop.close()
+            self.writer.close()
+        if self.error is not None:
+            raise self.error
+
+    def summary(self) -> Optional[str]:
+        return self.writer.summary()
+
+
+REPORT_FORMATS = ("sheet", "csv", "jsonl", "parquet")
+"""Formats export can write the error report in"""
+
+
+def get_report_writer(
+    report_format: str,
+    out: Optional[str] = None,
+    vendor: Optional[str] = None,
+    date: Optional[str] = None,
+    file: Optional[str] = None,
+) -> ReportWriter:
+    """
+    Returns the writer for a report format
+
+    Args:
+        report_format: one of REPORT_FORMATS
+        out: path of the .csv or .jsonl file or of the parquet dataset directory
+        vendor: vendor name, used to partition parquet datasets
+        date: validation date (YYYY-MM-DD), used to partition parquet datasets
+        file: name of the validated file, used to name parquet files
+
+    Returns:
+        ReportWriter
+
+    """
+    if report_format == "sheet":
+        return SheetReportWriter(SPREADSHEET_ID, SHEET_RANGE)
+    if out is None:
+        raise ValueError(f"An output path is required for {report_format} reports")
+    match report_format:
+        case "csv":
+            return CsvReportWriter(out)
+        case "jsonl":
+            return JsonlReportWriter(out)
+        case "parquet":
+            return ParquetReportWriter(out, str(vendor), str(date), str(file))
+        case _:
+            raise ValueError(f"Unknown report format: {report_format}")
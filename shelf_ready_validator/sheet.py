@@ -1,25 +1,37 @@
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+import json
 import os.path
+import time
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Optional
+
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
 
 
 SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
 
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+"""HTTP statuses from the Sheets API that are retried"""
 
-def write_sheet(
-    spreadsheet_id, range_name, value_input_option, insert_data_option, values
-):
+MAX_BATCH_ROWS = 1000
+MAX_BATCH_BYTES = 2_000_000
+"""Rows are sent in batches below the recommended 2MB Sheets API payload size"""
+
+
+def get_credentials() -> "Credentials":
     """
-    A function to append data to a google sheet
+    Loads google credentials from the token file in the user's .cred directory,
+    refreshing them or running the authorization flow when needed.
     """
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+
     cred_path = os.path.join(
         os.environ["USERPROFILE"], ".cred/.google/desktop-app.json"
     )
     token_path = os.path.join(os.environ["USERPROFILE"], ".cred/.google/token.json")
 
+    creds = None
     if os.path.exists(token_path):
         creds = Credentials.from_authorized_user_file(token_path, SCOPES)
     if not creds or not creds.valid:
@@ -30,27 +42,162 @@ def write_sheet(
             creds = flow.run_local_server()
         with open(token_path, "w") as token:
             token.write(creds.to_json())
+    return creds
+
+
+class SheetWriter:
+    """
+    Appends rows to a google sheet.
+
+    Credentials are loaded and the Sheets service is built the first time rows
+    are written and reused for every call after that. Rows are sent in batches
+    of at most batch_size rows and max_bytes of JSON and requests that fail
+    with a 429 or 5xx status are retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        spreadsheet_id: str,
+        range_name: str,
+        value_input_option: str = "USER_ENTERED",
+        insert_data_option: str = "INSERT_ROWS",
+        batch_size: int = MAX_BATCH_ROWS,
+        max_bytes: int = MAX_BATCH_BYTES,
+        max_retries: int = 5,
+        backoff: float = 1.0,
+        service: Any = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.spreadsheet_id = spreadsheet_id
+        self.range_name = range_name
+        self.value_input_option = value_input_option
+        self.insert_data_option = insert_data_option
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.sleep = sleep
+        self._service = service
+        self.rows_written = 0
+        self.requests = 0
+        self.retries = 0
+        self.seconds = 0.0
+
+    @property
+    def service(self) -> Any:
+        if self._service is None:
+            from googleapiclient.discovery import build
+
+            self._service = build(
+                "sheets", "v4", credentials=get_credentials(), cache_discovery=False
+            )
+        return self._service
+
+    def _batches(self, values: list[list]) -> Iterator[list[list]]:
+        """
+        Splits rows into batches of at most batch_size rows and max_bytes
+        """
+        batch: list[list] = []
+        batch_bytes = 0
+        for row in values:
+            row_bytes = len(json.dumps(row, default=str))
+            if batch and (
+                len(batch) >= self.batch_size
+                or batch_bytes + row_bytes > self.max_bytes
+            ):
+                yield batch
+                batch = []
+                batch_bytes = 0
+            batch.append(row)
+            batch_bytes += row_bytes
+        if batch:
+            yield batch
 
-    try:
-        service = build("sheets", "v4", credentials=creds)
+    def _append_batch(self, batch: list[list]) -> dict:
+        from googleapiclient.errors import HttpError
 
         body = {
             "majorDimension": "ROWS",
-            "range": "RecordOutput!A1:M10000",
-            "values": values,
+            "range": self.range_name,
+            "values": batch,
         }
-        result = (
-            service.spreadsheets()
+        request = (
+            self.service.spreadsheets()
             .values()
             .append(
-                spreadsheetId=spreadsheet_id,
-                range=range_name,
-                valueInputOption=value_input_option,
-                insertDataOption=insert_data_option,
+                spreadsheetId=self.spreadsheet_id,
+                range=self.range_name,
+                valueInputOption=self.value_input_option,
+                insertDataOption=self.insert_data_option,
                 body=body,
             )
-            .execute()
         )
-        return result
-    except HttpError as error:
-        return error
+        attempt = 0
+        while True:
+            self.requests += 1
+            try:
+                return request.execute()
+            except HttpError as error:
+                if error.status_code not in RETRY_STATUSES or (
+                    attempt >= self.max_retries
+                ):
+                    raise
+                self.retries += 1
+                self.sleep(self.backoff * 2**attempt)
+                attempt += 1
+
+    def append(self, values: list[list]) -> list[dict]:
+        """
+        Appends rows to the sheet
+
+        Args:
+            values: list of rows to append
+
+        Returns:
+            list of responses from the Sheets API, one for each batch
+
+        Raises:
+            HttpError: if a batch fails with a status that is not retried or
+                still fails after max_retries retries
+
+        """
+        start = time.perf_counter()
+        results = []
+        try:
+            for batch in self._batches(values):
+                results.append(self._append_batch(batch))
+                self.rows_written += len(batch)
+        finally:
+            self.seconds += time.perf_counter() - start
+        return results
+
+    @property
+    def rows_per_second(self) -> Optional[float]:
+        if not self.seconds:
+            return None
+        return self.rows_written / self.seconds
+
+    def summary(self) -> str:
+        """
+        Returns the number of rows written and throughput as a string
+        """
+        output = (
+            f"Wrote {self.rows_written} row(s) to sheet in {self.requests} request(s)"
+        )
+        if self.retries:
+            output += f" ({self.retries} retried)"
+        if self.rows_per_second is not None:
+            output += f", {self.rows_per_second:.0f} rows/s"
+        return output
+
+
+def write_sheet(
+    spreadsheet_id, range_name, value_input_option, insert_data_option, values
+):
+    """
+    A function to append data to a google sheet
+    """
+    writer = SheetWriter(
+        spreadsheet_id, range_name, value_input_option, insert_data_option
+    )
+    return writer.append(values)
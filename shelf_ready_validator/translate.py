@@ -1,9 +1,22 @@
-from pymarc import Record
+from pymarc import Field, Record
+from pymarc.constants import END_OF_FIELD, SUBFIELD_INDICATOR
 from enum import Enum
-from typing import Generator, Union
+from typing import BinaryIO, Generator, Optional, Union
 
 from bookops_marc import SierraBibReader
 
+from shelf_ready_validator.index import DIRECTORY_ENTRY_LEN, LEADER_LEN
+from shelf_ready_validator.mapped import (
+    SUBJECT_TAGS,
+    MappedRecord,
+    decode_value,
+    is_marc8,
+    read_mapped_records,
+)
+
+END_OF_FIELD_BYTE = END_OF_FIELD.encode("ascii")
+SUBFIELD_INDICATOR_BYTE = SUBFIELD_INDICATOR.encode("ascii")
+
 
 class RLMarcEncoding(Enum):
     """
@@ -48,12 +61,22 @@ class VendorRecord:
 
     def __init__(
         self,
-        record: Record,
+        record: Union[Record, MappedRecord],
     ) -> None:
-
         self.record = record
-        self.dict_input = self._get_dict_input()
+        self.fields = self._get_field_map()
         self.material_type = self._get_material_type()
+        self.dict_input = self._get_dict_input()
+
+    def _get_field_map(self) -> dict[str, list[Field]]:
+        """
+        Reads the fields used by the validator in a single pass over the record
+        and groups them by tag
+        """
+        fields: dict[str, list[Field]] = {}
+        for field in self.record.get_fields(*EXTRACTED_TAGS):
+            fields.setdefault(field.tag, []).append(field)
+        return fields
 
     def _get_field_subfield(self, field: str, subfield: str) -> Union[str, KeyError]:
         """
@@ -62,7 +85,7 @@ class VendorRecord:
         KeyError can be stripped out before reading input into validator
         """
         try:
-            field_subfield = self.record[field][subfield]
+            field_subfield = self.fields[field][0][subfield]
             return field_subfield
         except KeyError as e:
             return e
@@ -74,7 +97,7 @@ class VendorRecord:
         KeyError can be stripped out before reading input into validator
         """
         try:
-            marc_field = self.record[field]
+            marc_field = self.fields[field][0]
             field_indicator = getattr(marc_field, f"{indicator}")
             return field_indicator
         except KeyError as e:
@@ -86,49 +109,26 @@ class VendorRecord:
         Uses get_field_subfield function to return KeyErrors for missing fields
         KeyErrors removed from dict to ensure validator recognizes missing fields
         """
-        r = self.record
         library = self._get_field_subfield("910", "a")
-        record_data = {
-            "material_type": self._get_material_type(),
-            "bib_call_no": self._get_field_subfield("852", "h"),
-            "bib_call_no_ind1": self._get_field_indicators("852", "indicator1"),
-            "bib_call_no_ind2": self._get_field_indicators("852", "indicator2"),
-            "bib_vendor_code": self._get_field_subfield("901", "a"),
-            "lcc": self._get_field_subfield("050", "a"),
-            "invoice_date": self._get_field_subfield("980", "a"),
-            "invoice_price": self._get_field_subfield("980", "b"),
-            "invoice_shipping": self._get_field_subfield("980", "c"),
-            "invoice_tax": self._get_field_subfield("980", "d"),
-            "invoice_net_price": self._get_field_subfield("980", "e"),
-            "invoice_number": self._get_field_subfield("980", "f"),
-            "invoice_copies": self._get_field_subfield("980", "g"),
-            "order_price": self._get_field_subfield("960", "s"),
-            "order_location": self._get_field_subfield("960", "t"),
-            "order_fund": self._get_field_subfield("960", "u"),
-            "order_ind1": self._get_field_indicators("960", "indicator1"),
-            "order_ind2": self._get_field_indicators("960", "indicator2"),
-            "library": library,
-        }
+        record_data: dict = {"material_type": self.material_type}
+        for name, (tag, code) in RECORD_INPUT_FIELDS.items():
+            if code.startswith("indicator"):
+                record_data[name] = self._get_field_indicators(tag, code)
+            else:
+                record_data[name] = self._get_field_subfield(tag, code)
         dict_input = {
             key: val for key, val in record_data.items() if type(val) is not KeyError
         }
-        items = r.get_fields("949")
+        items = self.fields.get(RLMarcEncoding.items.value)
         if items:
             item_list = []
             for item in items:
                 item_output = {
-                    "item_call_tag": item.get("z"),
-                    "item_call_no": item.get("a"),
-                    "item_barcode": item.get("i"),
-                    "item_price": item.get("p"),
-                    "item_vendor_code": item.get("v"),
-                    "item_agency": item.get("h"),
-                    "item_location": item.get("l"),
-                    "item_type": item.get("t"),
-                    "library": library,
-                    "item_ind1": item.indicator1,
-                    "item_ind2": item.indicator2,
+                    name: item.get(code) for name, code in ITEM_INPUT_FIELDS.items()
                 }
+                item_output["library"] = library
+                item_output["item_ind1"] = item.indicator1
+                item_output["item_ind2"] = item.indicator2
                 edited_item = {
                     key: val for key, val in item_output.items() if val is not None
                 }
@@ -136,7 +136,6 @@ class VendorRecord:
             dict_input["items"] = item_list
         if dict_input["material_type"] == "monograph_record":
             del dict_input["library"]
-            return dict_input
         return dict_input
 
     def _get_material_type(self) -> str:
@@ -146,41 +145,209 @@ class VendorRecord:
 
         this function needs to be built out more
         """
-        r = self.record
-        subjects = r.subjects
-        subject_subfield_v = []
-        for subject in subjects:
-            subfield_v = subject.get_subfields("v")
-            subject_subfield_v.append(subfield_v)
         subject_subfield_list = [
-            item for listed in subject_subfield_v for item in listed
+            subfield_v
+            for tag in SUBJECT_TAGS
+            for subject in self.fields.get(tag, [])
+            for subfield_v in subject.get_subfields("v")
         ]
-        physical_desc = self.record.physicaldescription
+        physical_desc = self.fields.get("300", [])
         field_300a = physical_desc[0].get_subfields("a")
-        split_300a = field_300a[0].split()
-        if "Catalogues Raisonnes" in subject_subfield_list:
-            return "catalogue_raissonne"
-        elif "Catalogue Raissonne" in subject_subfield_list:
-            return "catalogue_raissonne"
-        elif "volumes" in split_300a[1]:
-            return "multipart"
-        elif "pages" in split_300a[1]:
-            try:
-                pages = int(split_300a[0])
-                if pages < 50:
-                    return "pamphlet"
-                else:
-                    return "monograph_record"
-            except ValueError:
+        return get_material_type(subject_subfield_list, field_300a)
+
+
+def get_material_type(subject_subfield_v: list[str], field_300a: list[str]) -> str:
+    """
+    Determines material type from the 6XX $v subfields and the 300 $a
+    subfields of a record
+    """
+    split_300a = field_300a[0].split()
+    if "Catalogues Raisonnes" in subject_subfield_v:
+        return "catalogue_raissonne"
+    elif "Catalogue Raissonne" in subject_subfield_v:
+        return "catalogue_raissonne"
+    elif "volumes" in split_300a[1]:
+        return "multipart"
+    elif "pages" in split_300a[1]:
+        try:
+            pages = int(split_300a[0])
+            if pages < 50:
+                return "pamphlet"
+            else:
                 return "monograph_record"
-        else:
+        except ValueError:
             return "monograph_record"
+    else:
+        return "monograph_record"
+
+
+def _marc_location(name: str) -> tuple[str, str]:
+    """
+    Splits the RLMarcEncoding value for a field into a MARC tag and
+    a subfield code or indicator attribute
+    """
+    value = RLMarcEncoding[name].value
+    if "$" in value:
+        tag, code = value.split("$")
+        return tag, code
+    tag, indicator = value.split("_ind")
+    return tag, f"indicator{indicator}"
+
+
+RECORD_INPUT_FIELDS = {
+    # bib_call_no is encoded as the whole 852 field for error reports
+    "bib_call_no": ("852", "h"),
+    **{
+        name: _marc_location(name)
+        for name in (
+            "bib_call_no_ind1",
+            "bib_call_no_ind2",
+            "bib_vendor_code",
+            "lcc",
+            "invoice_date",
+            "invoice_price",
+            "invoice_shipping",
+            "invoice_tax",
+            "invoice_net_price",
+            "invoice_number",
+            "invoice_copies",
+            "order_price",
+            "order_location",
+            "order_fund",
+            "order_ind1",
+            "order_ind2",
+            "library",
+        )
+    },
+}
+"""Dict input keys for bib, order and invoice data with their MARC tag and subfield"""
+
+ITEM_INPUT_FIELDS = {
+    name: _marc_location(name)[1]
+    for name in (
+        "item_call_tag",
+        "item_call_no",
+        "item_barcode",
+        "item_price",
+        "item_vendor_code",
+        "item_agency",
+        "item_location",
+        "item_type",
+    )
+}
+"""Dict input keys for item data with their 949 subfield"""
+
+EXTRACTED_TAGS = frozenset(
+    [tag for tag, _ in RECORD_INPUT_FIELDS.values()]
+    + [RLMarcEncoding.items.value, "300"]
+    + list(SUBJECT_TAGS)
+)
+"""Tags read by VendorRecord"""
+
+
+class _RawField:
+    """
+    A data field decoded straight from a record in transmission format.
+    Supports the parts of the pymarc Field interface used by VendorRecord.
+    Missing indicators are read as blanks and subfields of MARC-8 records are
+    converted to Unicode, as they are by pymarc.
+    """
+
+    __slots__ = ("tag", "indicator1", "indicator2", "subfields")
+
+    def __init__(self, tag: str, data: bytes, marc8: bool = False) -> None:
+        subs = data.split(SUBFIELD_INDICATOR_BYTE)
+        indicators = subs[0].decode("ascii")
+        self.tag = tag
+        self.indicator1 = indicators[0:1] or " "
+        self.indicator2 = indicators[1:2] or " "
+        self.subfields = [
+            (subfield[0:1].decode("ascii"), decode_value(subfield[1:], marc8))
+            for subfield in subs[1:]
+            if subfield
+        ]
+
+    def get(self, code: str, default: Optional[str] = None) -> Optional[str]:
+        for subfield_code, value in self.subfields:
+            if subfield_code == code:
+                return value
+        return default
+
+    def __getitem__(self, code: str) -> str:
+        value = self.get(code)
+        if value is None:
+            raise KeyError
+        return value
+
+    def get_subfields(self, *codes: str) -> list[str]:
+        return [value for code, value in self.subfields if code in codes]
+
+
+class _RawRecord:
+    """
+    A record in transmission format that is only read through its directory
+    """
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+
+    def get_fields(self, *tags: str) -> list[_RawField]:
+        """
+        Walks the directory and decodes the data fields with the given tags
+        """
+        data = self.data
+        marc8 = is_marc8(data)
+        wanted = set(tags)
+        base_address = int(data[12:17])
+        fields = []
+        for entry_start in range(LEADER_LEN, base_address - 1, DIRECTORY_ENTRY_LEN):
+            tag = data[entry_start : entry_start + 3].decode("ascii")
+            if tag not in wanted:
+                continue
+            length = int(data[entry_start + 3 : entry_start + 7])
+            start = base_address + int(data[entry_start + 7 : entry_start + 12])
+            end = start + length
+            if data[end - 1 : end] == END_OF_FIELD_BYTE:
+                end -= 1
+            fields.append(_RawField(tag, data[start:end], marc8))
+        return fields
+
+
+def extract_record_input(data: bytes) -> tuple[dict, str]:
+    """
+    Creates the same dict input and material type as VendorRecord directly from a
+    record in transmission format. Only the fields used by the validator are
+    decoded and no pymarc Record is created.
+
+    Args:
+        data: MARC record as bytes
+
+    Returns:
+        tuple of dict input and material type
+
+    """
+    r = VendorRecord(_RawRecord(data))  # type: ignore[arg-type]
+    return r.dict_input, r.material_type
 
 
-def read_marc_records(file: str) -> Generator[Record, None, None]:
+def read_marc_records(
+    file: Union[str, BinaryIO], backend: str = "sierra"
+) -> Generator[Union[Record, MappedRecord], None, None]:
     """
     Reads .mrc file and returns a record
+    file may also be a binary file object, such as a file open on a vendor site,
+    in which case records are read as the bytes arrive.
+    The "mmap" backend returns records as slices of the memory-mapped file that
+    are only decoded as fields are read.
     """
+    if not isinstance(file, str):
+        if backend == "mmap":
+            raise ValueError("The mmap backend can only read local files")
+        yield from SierraBibReader(file)
+        return
+    if backend == "mmap":
+        yield from read_mapped_records(file)
+        return
     with open(file, "rb") as fh:
         reader = SierraBibReader(fh)
         for record in reader:
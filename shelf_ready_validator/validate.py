@@ -0,0 +1,440 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import count, islice
+from typing import (
+    Any,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Union,
+)
+
+from pydantic import BaseModel, ValidationError
+from pydantic_core import CoreConfig, CoreSchema, ErrorDetails, SchemaValidator
+from pymarc import Record
+
+from shelf_ready_validator import profiling
+from shelf_ready_validator.batch import file_names
+from shelf_ready_validator.cache import ResultCache, record_key
+from shelf_ready_validator.errors import format_errors
+from shelf_ready_validator.mapped import MappedRecord
+from shelf_ready_validator.models import MonographRecord, OtherMaterialRecord
+from shelf_ready_validator.pipeline import pipeline_map
+from shelf_ready_validator.translate import (
+    VendorRecord,
+    extract_record_input,
+    read_marc_records,
+)
+
+
+def _strip_models(schema: Any, config: CoreConfig) -> Any:
+    """
+    Replaces each model schema with the schema for its fields so validating
+    returns plain data instead of model instances. The extra fields setting of
+    each model is kept on its fields schema.
+    """
+    if isinstance(schema, list):
+        return [_strip_models(value, config) for value in schema]
+    if not isinstance(schema, dict):
+        return schema
+    if schema.get("type") == "model":
+        fields_schema = _strip_models(schema["schema"], config)
+        model_config = schema.get("config", {})
+        fields_schema["extra_behavior"] = model_config.get(
+            "extra_fields_behavior", "ignore"
+        )
+        if "ref" in schema:
+            fields_schema["ref"] = schema["ref"]
+        config.update(model_config)
+        return fields_schema
+    return {key: _strip_models(value, config) for key, value in schema.items()}
+
+
+@lru_cache(maxsize=None)
+def get_validator(model: type[BaseModel]) -> SchemaValidator:
+    """
+    Builds a validator for a record model that checks dict input against the
+    model's fields and validators without creating instances of the model.
+    Validators are built once per model and cached.
+    """
+    config: CoreConfig = {}
+    schema: CoreSchema = _strip_models(model.__pydantic_core_schema__, config)
+    config["title"] = model.__name__
+    return SchemaValidator(schema, config)
+
+
+def check_input(dict_input: dict, material_type: str) -> Optional[ValidationError]:
+    """
+    Validates dict input against the model for its material type without
+    creating model instances.
+
+    Args:
+        dict_input: dict input from VendorRecord
+        material_type: material type from VendorRecord
+
+    Returns:
+        ValidationError if the input is not valid, otherwise None
+
+    """
+    if material_type == "monograph_record":
+        model: type[BaseModel] = MonographRecord
+    else:
+        model = OtherMaterialRecord
+    try:
+        get_validator(model).validate_python(dict_input)
+    except ValidationError as e:
+        return e
+    return None
+
+
+class ValidationResult(NamedTuple):
+    """
+    Result of validating the dict input of a single record
+    """
+
+    valid: bool
+    errors: list[ErrorDetails]
+
+
+def _batch_discriminator(dict_input: Any) -> Optional[str]:
+    """
+    Chooses the model for each input in a batch based on its material type
+    """
+    if not isinstance(dict_input, dict):
+        return None
+    if dict_input.get("material_type") == "monograph_record":
+        return "monograph_record"
+    return "other"
+
+
+@lru_cache(maxsize=None)
+def get_batch_validator() -> SchemaValidator:
+    """
+    Builds a validator for a list of dict inputs. Each input is checked against
+    MonographRecord or OtherMaterialRecord, as with check_input, without
+    creating model instances.
+    """
+    config: CoreConfig = {}
+    choices = {
+        "monograph_record": _strip_models(
+            MonographRecord.__pydantic_core_schema__, config
+        ),
+        "other": _strip_models(OtherMaterialRecord.__pydantic_core_schema__, config),
+    }
+    config["title"] = "validate_batch"
+    schema: CoreSchema = {
+        "type": "list",
+        "items_schema": {
+            "type": "tagged-union",
+            "choices": choices,  # type: ignore[typeddict-item]
+            "discriminator": _batch_discriminator,
+        },
+    }
+    return SchemaValidator(schema, config)
+
+
+def validate_batch(dict_inputs: list[dict]) -> list[ValidationResult]:
+    """
+    Validates a batch of dict inputs in a single call to pydantic-core and
+    splits the errors back out for each input.
+
+    Args:
+        dict_inputs: list of dict inputs from VendorRecord
+
+    Returns:
+        list of ValidationResult in the same order as dict_inputs. Error
+        locations are the same as they are when validating a single record.
+
+    """
+    record_errors: list[list[ErrorDetails]] = [[] for _ in dict_inputs]
+    try:
+        get_batch_validator().validate_python(dict_inputs)
+    except ValidationError as e:
+        for error in e.errors():
+            index = error["loc"][0]
+            error["loc"] = error["loc"][2:]
+            record_errors[index].append(error)  # type: ignore[index]
+    return [ValidationResult(not errors, errors) for errors in record_errors]
+
+
+def _get_input(record: Union[Record, MappedRecord]) -> dict:
+    """
+    Converts a record to dict input. Memory-mapped records are converted
+    directly from their raw bytes with extract_record_input.
+    """
+    if isinstance(record, MappedRecord):
+        dict_input, _ = extract_record_input(record.as_marc())
+        return dict_input
+    return VendorRecord(record).dict_input
+
+
+def _validate_chunk(
+    chunk: list[tuple[int, Union[Record, MappedRecord]]]
+) -> list[dict[str, Any]]:
+    """
+    Validates a chunk of numbered records with a single call to validate_batch.
+    Used directly and in worker processes.
+    """
+    with profiling.stage("translate", len(chunk)):
+        dict_inputs = [_get_input(record) for _, record in chunk]
+    with profiling.stage("validate", len(chunk)):
+        validations = validate_batch(dict_inputs)
+    output = []
+    for (n, record), dict_input, validation in zip(chunk, dict_inputs, validations):
+        result: dict[str, Any] = {
+            "record_number": n,
+            "control_number": record["001"].data,
+            "vendor_code": dict_input.get("bib_vendor_code"),
+            "valid": validation.valid,
+            "error_count": len(validation.errors),
+            "errors": validation.errors,
+            "error_summary": None,
+        }
+        if not validation.valid:
+            with profiling.stage("format_errors"):
+                result["error_summary"] = format_errors(validation.errors)
+        output.append(result)
+    return output
+
+
+def _profiled_validate_chunk(
+    chunk: list[tuple[int, Union[Record, MappedRecord]]]
+) -> tuple[list[dict[str, Any]], dict[str, profiling.StageTime]]:
+    """
+    Same as _validate_chunk, but also returns the time spent in each stage so
+    timings from worker processes can be added to the profile of the run
+    """
+    with profiling.collect() as profiler:
+        output = _validate_chunk(chunk)
+    return output, profiler.stages
+
+
+def validate_record(
+    record_number: int, record: Union[Record, MappedRecord]
+) -> dict[str, Any]:
+    """
+    Converts a MARC record to dict input and validates it against the model
+    for its material type.
+
+    Args:
+        record_number: position of the record in the file, starting at 1
+        record: MARC record to validate
+
+    Returns:
+        dict:
+            record_number: int
+            control_number: str
+            vendor_code: str or None
+            valid: bool
+            error_count: int
+            errors: list (raw pydantic errors)
+            error_summary: dict (output of format_errors) or None
+
+    """
+    return _validate_chunk([(record_number, record)])[0]
+
+
+def _chunks(
+    records: Iterable[tuple[int, Union[Record, MappedRecord]]], chunk_size: int
+) -> Iterator[list[tuple[int, Union[Record, MappedRecord]]]]:
+    """
+    Splits a stream of numbered records into lists of chunk_size records
+    """
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _validate_chunks(
+    chunks: Iterable[list[tuple[int, Union[Record, MappedRecord]]]],
+    workers: int,
+    pipeline: str = "sync",
+) -> Generator[list[dict[str, Any]], None, None]:
+    """
+    Validates each chunk of numbered records and yields the results for each
+    chunk in the order the chunks were read. With more than one worker, chunks
+    are validated in a process pool with at most two chunks per worker in flight.
+    The async pipeline reads, validates and hands over chunks at the same time
+    (see pipeline_map).
+    With --profile, the stage timings of each chunk are added to the profile.
+    """
+    profiler = profiling.active()
+    if profiler is None:
+        yield from _map_chunks(_validate_chunk, chunks, workers, pipeline)
+        return
+    for output, stages in _map_chunks(
+        _profiled_validate_chunk, chunks, workers, pipeline
+    ):
+        profiler.merge(stages)
+        yield output
+
+
+def _map_chunks(
+    func: Callable[[list[tuple[int, Union[Record, MappedRecord]]]], Any],
+    chunks: Iterable[list[tuple[int, Union[Record, MappedRecord]]]],
+    workers: int,
+    pipeline: str,
+) -> Generator[Any, None, None]:
+    """
+    Calls func on each chunk in this process, in a process pool or in the async
+    pipeline and yields the return values in the order the chunks were read
+    """
+    if pipeline == "async":
+        yield from pipeline_map(func, chunks, workers)
+        return
+    if workers <= 1:
+        for chunk in chunks:
+            yield func(chunk)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(func, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _validate_cached_chunks(
+    chunks: Iterable[list[tuple[int, Union[Record, MappedRecord]]]],
+    workers: int,
+    cache: ResultCache,
+    pipeline: str = "sync",
+) -> Generator[list[dict[str, Any]], None, None]:
+    """
+    Same as _validate_chunks, but results for records that are in the cache are
+    reused and only the other records in each chunk are validated. New results
+    are added to the cache.
+    """
+    lookups: deque = deque()
+
+    def uncached_chunks():
+        for chunk in chunks:
+            with profiling.stage("cache", len(chunk)):
+                keys = [record_key(record) for _, record in chunk]
+                cached = cache.get_many(keys)
+            lookups.append((chunk, keys, cached))
+            yield [item for item, key in zip(chunk, keys) if key not in cached]
+
+    for validated in _validate_chunks(uncached_chunks(), workers, pipeline):
+        chunk, keys, cached = lookups.popleft()
+        new_results = iter(validated)
+        output = []
+        for (n, _), key in zip(chunk, keys):
+            if key in cached:
+                output.append({"record_number": n, **cached[key]})
+            else:
+                output.append(next(new_results))
+        with profiling.stage("cache", 0):
+            cache.put_many(
+                [
+                    (key, result)
+                    for key, result in zip(keys, output)
+                    if key not in cached
+                ]
+            )
+        yield output
+
+
+def validate_records(
+    records: Iterable[tuple[int, Union[Record, MappedRecord]]],
+    workers: int = 1,
+    chunk_size: int = 100,
+    cache: Optional[ResultCache] = None,
+    pipeline: str = "sync",
+) -> Generator[dict[str, Any], None, None]:
+    """
+    Validates a stream of numbered MARC records and yields one result per record
+    in the order the records were read.
+
+    With more than one worker, records are split into chunks and validated in a
+    process pool. At most two chunks per worker are in flight at a time so a large
+    file is never read into memory all at once.
+
+    Args:
+        records: iterable of (record_number, record) tuples
+        workers: number of worker processes to use
+        chunk_size: number of records sent to a worker at a time
+        cache: ResultCache to reuse the results of unchanged records from
+        pipeline: "sync" or "async"; the async pipeline reads the next chunks
+            while earlier ones are validated and their results are reported
+
+    Yields:
+        validation result for each record (see validate_record)
+
+    """
+    if workers <= 1 and cache is None and pipeline == "sync":
+        for n, record in records:
+            yield validate_record(n, record)
+        return
+    chunks = _chunks(records, chunk_size)
+    if cache is None:
+        validated = _validate_chunks(chunks, workers, pipeline)
+    else:
+        validated = _validate_cached_chunks(chunks, workers, cache, pipeline)
+    for output in validated:
+        yield from output
+
+
+def validate_files(
+    files: Iterable[str],
+    workers: int = 1,
+    chunk_size: int = 100,
+    backend: str = "sierra",
+    cache: Optional[ResultCache] = None,
+    pipeline: str = "sync",
+) -> Generator[dict[str, Any], None, None]:
+    """
+    Validates every record in a list of MARC files and yields one result per
+    record, file by file, in the order the records were read.
+
+    Records from all of the files go through a single work queue, so with more
+    than one worker one process pool is shared by all of the files and is kept
+    busy from the end of one file to the start of the next.
+
+    Args:
+        files: paths of MARC files
+        workers: number of worker processes to use
+        chunk_size: number of records sent to a worker at a time
+        backend: how to read the files (see read_marc_records)
+        cache: ResultCache to reuse the results of unchanged records from
+        pipeline: "sync" or "async"; the async pipeline reads the next chunks
+            while earlier ones are validated and their results are reported
+
+    Yields:
+        validation result for each record (see validate_record), with the
+        name of its file in filename (see batch.file_names). Records are
+        numbered from 1 in each file.
+
+    """
+    files = list(files)
+    names = file_names(files)
+    filenames: deque = deque()
+
+    def file_chunks():
+        # chunks never contain records from more than one file
+        for file in files:
+            records = zip(
+                count(1), profiling.timed("read", read_marc_records(file, backend))
+            )
+            for chunk in _chunks(records, chunk_size):
+                filenames.append(names[file])
+                yield chunk
+
+    if cache is None:
+        validated = _validate_chunks(file_chunks(), workers, pipeline)
+    else:
+        validated = _validate_cached_chunks(file_chunks(), workers, cache, pipeline)
+    for output in validated:
+        filename = filenames.popleft()
+        for result in output:
+            result["filename"] = filename
+            yield result
@@ -0,0 +1,129 @@
+import glob
+import json
+import os
+import platform
+import subprocess
+from datetime import datetime
+from typing import Optional
+
+import pytest
+
+RESULTS_ENV = "RL_VALIDATOR_BENCHMARK_RESULTS"
+"""Environment variable with the directory benchmark results are saved to"""
+
+
+def results_dir() -> str:
+    """
+    Returns the directory benchmark results are saved to. Uses
+    RL_VALIDATOR_BENCHMARK_RESULTS if it is set, otherwise .benchmarks in the
+    current directory.
+    """
+    return os.environ.get(RESULTS_ENV) or ".benchmarks"
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _previous_results(directory: str) -> dict[str, dict]:
+    """
+    Most recent earlier result of each benchmark in the directory, keyed by
+    benchmark name
+    """
+    previous = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        with open(path, encoding="utf-8") as fh:
+            previous.update(
+                (result["name"], result) for result in json.load(fh)["results"]
+            )
+    return previous
+
+
+class BenchmarkResults:
+    """
+    Results of the benchmarks in a session. Saved to a JSON file named after
+    the time of the run and compared with the latest earlier result of each
+    benchmark in the same directory.
+    """
+
+    def __init__(self) -> None:
+        self.started = datetime.now()
+        self.results: list[dict] = []
+
+    def add(self, name: str, **metrics) -> None:
+        self.results.append({"name": name, **metrics})
+
+    def save(self, directory: str) -> str:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.started.strftime('%Y%m%d-%H%M%S')}.json")
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(
+                {
+                    "started": self.started.isoformat(timespec="seconds"),
+                    "commit": _git_commit(),
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "results": self.results,
+                },
+                fh,
+                indent=2,
+            )
+            fh.write("\n")
+        return path
+
+    def comparison(self, previous: dict[str, dict]) -> list[str]:
+        """
+        Throughput and peak memory of each benchmark and their change since
+        the previous run
+        """
+        lines = []
+        for result in self.results:
+            speed = result["records_per_second"]
+            memory = result["peak_memory_mb"]
+            line = f"{result['name']:<32}{speed:>12,.0f} rec/s{memory:>10.2f} MB"
+            before = previous.get(result["name"])
+            if before:
+                line += (
+                    f"  ({speed / before['records_per_second']:.2f}x speed, "
+                    f"{memory - before['peak_memory_mb']:+.2f} MB)"
+                )
+            lines.append(line)
+        return lines
+
+
+summary_key = pytest.StashKey[list[str]]()
+
+
+@pytest.fixture(scope="session")
+def benchmark_results(pytestconfig):
+    """
+    Collects benchmark results for the session and saves them when it ends.
+    The results are compared with the previous run in the terminal summary.
+    """
+    results = BenchmarkResults()
+    yield results
+    if not results.results:
+        return
+    directory = results_dir()
+    previous = _previous_results(directory)
+    path = results.save(directory)
+    pytestconfig.stash[summary_key] = [
+        f"benchmark results saved to {path}",
+        *results.comparison(previous),
+    ]
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    lines = config.stash.get(summary_key, [])
+    if lines:
+        terminalreporter.section("benchmarks")
+        for line in lines:
+            terminalreporter.write_line(line)
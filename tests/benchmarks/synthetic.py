@@ -0,0 +1,169 @@
+"""
+Generators for synthetic vendor MARC files used by the benchmarks
+"""
+
+import random
+from pymarc import Field, Record, Subfield
+
+LOCATIONS = [
+    ("rcmb2", "2", "MAB"),
+    ("rcmf2", "55", "MAF"),
+    ("rcmg2", "55", "MAG"),
+    ("rc2ma", "55", "MAL"),
+    ("rcph2", "55", "PAH"),
+    ("rcpt2", "55", "PAT"),
+]
+
+
+def _field(tag: str, indicators: str, *subfields: tuple[str, str]) -> Field:
+    return Field(
+        tag=tag,
+        indicators=list(indicators),
+        subfields=[Subfield(code=code, value=value) for code, value in subfields],
+    )
+
+
+def synthetic_record(n: int, rng: random.Random, items: int = 1) -> Record:
+    """
+    Creates a valid Research Libraries monograph record with order, invoice and
+    item data
+    """
+    item_location, item_type, order_location = rng.choice(LOCATIONS)
+    call_no = f"ReCAP 24-{n % 1000000:06d}"
+    record = Record(leader="00000cam a2200000 i 4500", force_utf8=True)
+    record.add_field(Field(tag="001", data=f"on{1000000000 + n}"))
+    record.add_field(Field(tag="003", data="OCoLC"))
+    record.add_field(Field(tag="008", data="240131s2024    ru a          000 0 rus d"))
+    record.add_field(
+        _field("050", " 4", ("a", f"DK{rng.randint(1, 999)}"), ("b", ".A1"))
+    )
+    record.add_field(
+        _field("245", "00", ("a", f"Synthetic title {n} /"), ("c", "Vendor."))
+    )
+    record.add_field(_field("300", "  ", ("a", f"{rng.randint(50, 900)} pages :")))
+    record.add_field(_field("650", " 0", ("a", "Russia"), ("x", "History.")))
+    record.add_field(_field("852", "8 ", ("h", call_no)))
+    record.add_field(_field("901", "  ", ("a", "EVP")))
+    record.add_field(_field("910", "  ", ("a", "RL")))
+    for i in range(items):
+        record.add_field(
+            _field(
+                "949",
+                " 1",
+                ("z", "8528"),
+                ("a", call_no),
+                ("i", f"33433{rng.randint(0, 999999999):09d}"),
+                ("p", "10.00"),
+                ("v", "EVP"),
+                ("h", "43"),
+                ("l", item_location),
+                ("t", item_type),
+            )
+        )
+    record.add_field(
+        _field("960", "  ", ("s", "1000"), ("t", order_location), ("u", "123456apprv"))
+    )
+    record.add_field(
+        _field(
+            "980",
+            "  ",
+            ("a", "240131"),
+            ("b", "1000"),
+            ("c", "000"),
+            ("d", "000"),
+            ("e", "1000"),
+            ("f", f"{rng.randint(10000000, 99999999)}"),
+            ("g", "1"),
+        )
+    )
+    return record
+
+
+def write_synthetic_file(path: str, count: int, seed: int = 0) -> str:
+    """
+    Writes count synthetic records to a .mrc file and returns its path
+    """
+    rng = random.Random(seed)
+    with open(path, "wb") as fh:
+        for n in range(1, count + 1):
+            fh.write(synthetic_record(n, rng).as_marc())
+    return path
+
+
+RECORD_MIX = {
+    "monograph": 50,
+    "multi_item": 15,
+    "pamphlet": 8,
+    "multipart": 8,
+    "catalogue_raisonne": 7,
+    "invalid": 12,
+}
+"""Relative number of each kind of record in a vendor file"""
+
+
+def _replace_field(record: Record, field: Field) -> None:
+    record.remove_fields(field.tag)
+    record.add_ordered_field(field)
+
+
+def _break_record(record: Record, rng: random.Random) -> None:
+    """
+    Introduces one or two of the mistakes found in vendor files: a missing
+    invoice field, a badly formed call number, an unknown item location, a
+    short barcode or a price without cents
+    """
+    mistakes = rng.sample(range(5), rng.randint(1, 2))
+    item = record.get_fields("949")[0]
+    if 0 in mistakes:
+        record.remove_fields("980")
+    if 1 in mistakes:
+        _replace_field(record, _field("852", "8 ", ("h", "ReCAP 24- 1")))
+    if 2 in mistakes:
+        item["l"] = "zzzzz"
+    if 3 in mistakes:
+        item["i"] = "1234"
+    if 4 in mistakes:
+        item["p"] = "1000"
+
+
+def vendor_record(n: int, rng: random.Random, kind: str) -> Record:
+    """
+    Creates a synthetic record of one of the kinds in RECORD_MIX. Pamphlets,
+    multipart sets and catalogues raisonnés are validated against
+    OtherMaterialRecord; the other kinds are monographs.
+    """
+    if kind == "multi_item":
+        return synthetic_record(n, rng, items=rng.randint(2, 6))
+    record = synthetic_record(n, rng)
+    if kind == "pamphlet":
+        _replace_field(
+            record, _field("300", "  ", ("a", f"{rng.randint(8, 49)} pages :"))
+        )
+    elif kind == "multipart":
+        _replace_field(
+            record, _field("300", "  ", ("a", f"{rng.randint(2, 12)} volumes :"))
+        )
+    elif kind == "catalogue_raisonne":
+        record.add_ordered_field(
+            _field("650", " 0", ("a", "Painters"), ("v", "Catalogues Raisonnes"))
+        )
+    elif kind == "invalid":
+        _break_record(record, rng)
+    return record
+
+
+def write_vendor_file(path: str, count: int, seed: int = 0) -> dict[str, int]:
+    """
+    Writes count synthetic records of the kinds in RECORD_MIX to a .mrc file,
+    chosen at random in proportion to their weights
+
+    Returns:
+        number of records of each kind in the file
+
+    """
+    rng = random.Random(seed)
+    kinds = rng.choices(list(RECORD_MIX), weights=list(RECORD_MIX.values()), k=count)
+    with open(path, "wb") as fh:
+        for n, kind in enumerate(kinds, 1):
+            fh.write(vendor_record(n, rng, kind).as_marc())
+    return {kind: kinds.count(kind) for kind in RECORD_MIX}
@@ -0,0 +1,50 @@
+import random
+import time
+import pytest
+from shelf_ready_validator.errors import format_errors
+from shelf_ready_validator.translate import VendorRecord
+from shelf_ready_validator.validate import validate_batch
+from tests.benchmarks.synthetic import synthetic_record
+
+pytestmark = pytest.mark.perf
+
+RECORD_COUNT = 1000
+
+
+def badly_formed_input(n: int, rng: random.Random, items: int) -> dict:
+    """
+    Dict input of a synthetic record whose items all have an invalid barcode,
+    price, call tag and location and no agency code, as in a badly formed
+    vendor file. Each item adds six errors.
+    """
+    dict_input = VendorRecord(synthetic_record(n, rng, items=items)).dict_input
+    dict_input["invoice_date"] = "jan 1"
+    for item in dict_input["items"]:
+        item["item_barcode"] = "1234"
+        item["item_price"] = "1000"
+        item["item_call_tag"] = "8582"
+        item["item_location"] = "zzzzz"
+        del item["item_agency"]
+    return dict_input
+
+
+@pytest.mark.parametrize("items", [1, 8, 25])
+def test_format_errors_throughput(items, capsys):
+    rng = random.Random(0)
+    record_errors = [
+        result.errors
+        for result in validate_batch(
+            [badly_formed_input(n, rng, items) for n in range(RECORD_COUNT)]
+        )
+    ]
+    error_count = sum(len(errors) for errors in record_errors)
+    start = time.perf_counter()
+    for errors in record_errors:
+        format_errors(errors)
+    elapsed = time.perf_counter() - start
+    with capsys.disabled():
+        print(
+            f"\nformat_errors with {error_count // RECORD_COUNT} errors per record: "
+            f"{RECORD_COUNT / elapsed:,.0f} records/sec, "
+            f"{error_count / elapsed:,.0f} errors/sec"
+        )
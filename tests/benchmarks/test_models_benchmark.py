@@ -0,0 +1,34 @@
+import random
+import time
+import pytest
+from shelf_ready_validator.models import MonographRecord
+from shelf_ready_validator.translate import VendorRecord
+from shelf_ready_validator.validate import check_input
+from tests.benchmarks.synthetic import synthetic_record
+
+pytestmark = pytest.mark.perf
+
+RECORD_COUNT = 2000
+
+
+@pytest.mark.parametrize("items", [1, 10, 100])
+def test_monograph_validation_throughput(items, capsys):
+    rng = random.Random(0)
+    inputs = [
+        VendorRecord(synthetic_record(n, rng, items=items)).dict_input
+        for n in range(RECORD_COUNT)
+    ]
+    start = time.perf_counter()
+    for dict_input in inputs:
+        MonographRecord(**dict_input)
+    model_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    for dict_input in inputs:
+        check_input(dict_input, "monograph_record")
+    check_elapsed = time.perf_counter() - start
+    with capsys.disabled():
+        print(
+            f"\nMonographRecord with {items} item(s): "
+            f"model {RECORD_COUNT / model_elapsed:,.0f} records/sec, "
+            f"check_input {RECORD_COUNT / check_elapsed:,.0f} records/sec"
+        )
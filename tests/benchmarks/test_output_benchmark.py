@@ -0,0 +1,53 @@
+import time
+import pytest
+from click.testing import CliRunner
+from shelf_ready_validator import cli
+from tests.benchmarks.synthetic import write_synthetic_file
+
+pytestmark = pytest.mark.perf
+
+RECORD_COUNT = 5000
+TEST_FILE_COPIES = 500
+
+
+@pytest.fixture(scope="module")
+def mixed_file(tmp_path_factory):
+    """
+    Valid synthetic records followed by copies of tests/test.mrc, most of which
+    are invalid, so the text output prints errors as well as valid records
+    """
+    path = tmp_path_factory.mktemp("output") / "mixed.mrc"
+    write_synthetic_file(str(path), RECORD_COUNT)
+    with open(path, "ab") as out, open("tests/test.mrc", "rb") as test_file:
+        data = test_file.read()
+        for _ in range(TEST_FILE_COPIES):
+            out.write(data)
+    return path
+
+
+def _run(path, *options):
+    start = time.perf_counter()
+    result = CliRunner(mix_stderr=False).invoke(
+        cli,
+        ["--vendor", "eastview", "--file", str(path), "--no-cache", *options]
+        + ["validate-all"],
+    )
+    assert result.exit_code == 0, result.stderr
+    return time.perf_counter() - start
+
+
+def test_console_output_wall_time(mixed_file, capsys):
+    records = RECORD_COUNT + TEST_FILE_COPIES * 10
+    timings = {
+        "text": _run(mixed_file),
+        "json": _run(mixed_file, "--output", "json"),
+        "quiet": _run(mixed_file, "--quiet"),
+    }
+    with capsys.disabled():
+        print(f"\nvalidate-all on {records:,} records:")
+        for mode, elapsed in timings.items():
+            print(
+                f"  {mode:<5} {elapsed:.2f}s "
+                f"({elapsed / timings['text']:.0%} of text output)"
+            )
+    assert timings["quiet"] < timings["text"]
@@ -0,0 +1,74 @@
+import time
+import pytest
+from shelf_ready_validator.translate import (
+    VendorRecord,
+    get_material_type,
+    read_marc_records,
+)
+from tests.benchmarks.synthetic import write_synthetic_file
+
+pytestmark = pytest.mark.perf
+
+RECORD_COUNT = 50000
+
+
+class PerLookupVendorRecord(VendorRecord):
+    """
+    VendorRecord as it was before the single-pass field map: every subfield and
+    indicator looks its field up on the record again and the material type is
+    calculated twice
+    """
+
+    def __init__(self, record):
+        self.record = record
+        self.dict_input = self._get_dict_input()
+        self.material_type = self._get_material_type()
+
+    def _get_field_subfield(self, field, subfield):
+        try:
+            return self.record[field][subfield]
+        except KeyError as e:
+            return e
+
+    def _get_field_indicators(self, field, indicator):
+        try:
+            return getattr(self.record[field], indicator)
+        except KeyError as e:
+            return e
+
+    def _get_dict_input(self):
+        self.material_type = self._get_material_type()
+        self.fields = {"949": self.record.get_fields("949")}
+        return super()._get_dict_input()
+
+    def _get_material_type(self):
+        subject_subfield_v = [
+            v for subject in self.record.subjects for v in subject.get_subfields("v")
+        ]
+        field_300a = self.record.physicaldescription[0].get_subfields("a")
+        return get_material_type(subject_subfield_v, field_300a)
+
+
+@pytest.fixture(scope="module")
+def synthetic_file(tmp_path_factory):
+    path = tmp_path_factory.mktemp("synthetic") / "synthetic.mrc"
+    return write_synthetic_file(str(path), RECORD_COUNT)
+
+
+def test_vendor_record_throughput(synthetic_file, capsys):
+    before = after = 0.0
+    for record in read_marc_records(synthetic_file):
+        start = time.perf_counter()
+        old = PerLookupVendorRecord(record)
+        before += time.perf_counter() - start
+        start = time.perf_counter()
+        new = VendorRecord(record)
+        after += time.perf_counter() - start
+        assert new.dict_input == old.dict_input
+    with capsys.disabled():
+        print(
+            f"\nVendorRecord on {RECORD_COUNT} records: "
+            f"before {RECORD_COUNT / before:,.0f} records/sec, "
+            f"after {RECORD_COUNT / after:,.0f} records/sec "
+            f"({before / after:.2f}x)"
+        )
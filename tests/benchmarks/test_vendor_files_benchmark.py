@@ -0,0 +1,182 @@
+import json
+import time
+import tracemalloc
+import pytest
+from click.testing import CliRunner
+from shelf_ready_validator import cli
+from shelf_ready_validator.errors import format_errors
+from shelf_ready_validator.translate import VendorRecord, read_marc_records
+from shelf_ready_validator.validate import validate_batch
+from tests.benchmarks.synthetic import write_vendor_file
+
+pytestmark = pytest.mark.perf
+
+FILE_SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+"""Number of records in each synthetic vendor file"""
+
+CHUNK_SIZE = 100
+"""Number of records validated in a single call, as in validate_records"""
+
+
+@pytest.fixture(scope="module", params=list(FILE_SIZES))
+def vendor_file(request, tmp_path_factory):
+    """
+    Synthetic vendor file with a mix of monographs, multi-item records,
+    pamphlets, multipart sets, catalogues raisonnés and invalid records
+    """
+    path = tmp_path_factory.mktemp("vendor") / f"vendor_{request.param}.mrc"
+    write_vendor_file(str(path), FILE_SIZES[request.param])
+    return request.param, str(path)
+
+
+def measure(run):
+    """
+    Calls run twice: once to time it and once with tracemalloc to find its
+    peak memory, so tracing does not slow down the timed run.
+
+    Args:
+        run: function that returns the number of records it processed and the
+            seconds spent in the code being measured
+
+    Returns:
+        records, seconds and peak memory in bytes
+
+    """
+    records, seconds = run()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return records, seconds, peak
+
+
+def save_result(benchmark_results, capsys, name, records, seconds, peak, **extra):
+    benchmark_results.add(
+        name,
+        records=records,
+        seconds=seconds,
+        records_per_second=records / seconds,
+        peak_memory_mb=peak / 1024 / 1024,
+        **extra,
+    )
+    with capsys.disabled():
+        print(
+            f"\n{name}: {records:,} records in {seconds:.2f}s, "
+            f"{records / seconds:,.0f} records/sec, "
+            f"peak memory {peak / 1024 / 1024:.2f} MB"
+        )
+
+
+def dict_input_chunks(path):
+    """Dict input of the records in a file, CHUNK_SIZE records at a time"""
+    chunk = []
+    for record in read_marc_records(path):
+        chunk.append(VendorRecord(record).dict_input)
+        if len(chunk) == CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+@pytest.mark.parametrize("backend", ["sierra", "mmap"])
+def test_read_marc_records(vendor_file, backend, benchmark_results, capsys):
+    size, path = vendor_file
+
+    def run():
+        records = 0
+        start = time.perf_counter()
+        for _ in read_marc_records(path, backend):
+            records += 1
+        return records, time.perf_counter() - start
+
+    save_result(
+        benchmark_results, capsys, f"read_marc_records[{backend}-{size}]", *measure(run)
+    )
+
+
+def test_vendor_record(vendor_file, benchmark_results, capsys):
+    size, path = vendor_file
+
+    def run():
+        records = 0
+        elapsed = 0.0
+        for record in read_marc_records(path):
+            start = time.perf_counter()
+            VendorRecord(record)
+            elapsed += time.perf_counter() - start
+            records += 1
+        return records, elapsed
+
+    save_result(benchmark_results, capsys, f"VendorRecord[{size}]", *measure(run))
+
+
+def test_model_validation(vendor_file, benchmark_results, capsys):
+    size, path = vendor_file
+
+    def run():
+        records = 0
+        elapsed = 0.0
+        for chunk in dict_input_chunks(path):
+            start = time.perf_counter()
+            validate_batch(chunk)
+            elapsed += time.perf_counter() - start
+            records += len(chunk)
+        return records, elapsed
+
+    save_result(benchmark_results, capsys, f"validate_batch[{size}]", *measure(run))
+
+
+def test_format_errors(vendor_file, benchmark_results, capsys):
+    size, path = vendor_file
+
+    def run():
+        records = 0
+        elapsed = 0.0
+        for chunk in dict_input_chunks(path):
+            for result in validate_batch(chunk):
+                if result.valid:
+                    continue
+                start = time.perf_counter()
+                format_errors(result.errors)
+                elapsed += time.perf_counter() - start
+                records += 1
+        return records, elapsed
+
+    save_result(benchmark_results, capsys, f"format_errors[{size}]", *measure(run))
+
+
+def test_validate_all(vendor_file, tmp_path, benchmark_results, capsys):
+    """
+    Runs validate-all on the whole file with --quiet, so the time of printing
+    each result (see test_output_benchmark) is not included. The time spent in
+    each stage is saved from the --profile-json metrics of the timed run.
+    """
+    size, path = vendor_file
+    metrics = tmp_path / "metrics.json"
+    profiles = []
+
+    def run():
+        start = time.perf_counter()
+        result = CliRunner().invoke(
+            cli,
+            ["--vendor", "eastview", "--file", path, "--no-cache", "--quiet"]
+            + ["--profile-json", str(metrics), "validate-all"],
+        )
+        elapsed = time.perf_counter() - start
+        assert result.exit_code == 0, result.output
+        profiles.append(json.loads(metrics.read_text()))
+        return profiles[-1]["records"], elapsed
+
+    records, seconds, peak = measure(run)
+    save_result(
+        benchmark_results,
+        capsys,
+        f"validate-all[{size}]",
+        records,
+        seconds,
+        peak,
+        stages=profiles[0]["stages"],
+    )
@@ -3,6 +3,16 @@ from bookops_marc import Bib
 from pymarc import Field, Subfield
 
 
+@pytest.fixture(autouse=True)
+def result_cache(tmp_path, monkeypatch):
+    """
+    Keeps the validation result cache of each test in its own directory
+    """
+    path = tmp_path / "result_cache.db"
+    monkeypatch.setenv("RL_VALIDATOR_RESULT_CACHE", str(path))
+    return path
+
+
 @pytest.fixture
 def test_output_data():
     test_output_data = [
@@ -260,3 +270,16 @@ def stub_record():
         )
     )
     return bib
+
+
+@pytest.fixture
+def marc8_record(stub_record):
+    """
+    stub_record in transmission format as a MARC-8 record with a combining
+    acute accent in 980$f (invoice_number)
+    """
+    stub_record.remove_fields("050")
+    stub_record["980"].delete_subfield("f")
+    stub_record["980"].add_subfield("f", "#Etude")
+    data = stub_record.as_marc().replace(b"#Etude", b"\xe2Etude")
+    return data[:9] + b" " + data[10:]
@@ -0,0 +1,157 @@
+"""
+Local stand-ins for vendor FTP and SFTP sites that serve files from a directory
+"""
+
+import os
+import socket
+import stat
+import threading
+import time
+from contextlib import contextmanager
+
+import paramiko
+
+USERNAME = "vendor"
+PASSWORD = "password"
+
+
+class StubServer(paramiko.ServerInterface):
+    def check_auth_password(self, username, password):
+        if (username, password) == (USERNAME, PASSWORD):
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED
+
+
+class StubSFTPHandle(paramiko.SFTPHandle):
+    def stat(self):
+        return paramiko.SFTPAttributes.from_stat(os.fstat(self.readfile.fileno()))
+
+
+class StubSFTPServer(paramiko.SFTPServerInterface):
+    """
+    Read-only SFTP server for the files in root
+    """
+
+    root = ""
+
+    def _local(self, path):
+        return os.path.join(self.root, self.canonicalize(path).lstrip("/"))
+
+    def list_folder(self, path):
+        local = self._local(path)
+        return [
+            paramiko.SFTPAttributes.from_stat(
+                os.stat(os.path.join(local, name)), filename=name
+            )
+            for name in sorted(os.listdir(local))
+        ]
+
+    def stat(self, path):
+        return paramiko.SFTPAttributes.from_stat(os.stat(self._local(path)))
+
+    lstat = stat
+
+    def open(self, path, flags, attr):
+        handle = StubSFTPHandle(flags)
+        handle.filename = self._local(path)
+        handle.readfile = open(handle.filename, "rb")
+        return handle
+
+
+@contextmanager
+def sftp_server(root):
+    """
+    Serves root over SFTP on a local port. Yields the port.
+    """
+    host_key = paramiko.RSAKey.generate(1024)
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    transports = []
+    StubSFTPServer.root = str(root)
+
+    def serve():
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return
+            transport = paramiko.Transport(conn)
+            transport.add_server_key(host_key)
+            transport.set_subsystem_handler("sftp", paramiko.SFTPServer, StubSFTPServer)
+            transport.start_server(server=StubServer())
+            transports.append(transport)
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    try:
+        yield listener.getsockname()[1]
+    finally:
+        listener.close()
+        for transport in transports:
+            transport.close()
+
+
+@contextmanager
+def ftp_server(root, mlsd=True):
+    """
+    Serves root over FTP on a local port. LIST output is laid out the same way
+    as on the vendor site. With mlsd=False the server does not support MLSD,
+    like older vendor sites. Yields the port.
+    """
+    from pyftpdlib.authorizers import DummyAuthorizer
+    from pyftpdlib.filesystems import AbstractedFS
+    from pyftpdlib.handlers import FTPHandler
+    from pyftpdlib.ioloop import IOLoop
+    from pyftpdlib.servers import ThreadedFTPServer
+
+    class VendorFS(AbstractedFS):
+        def chdir(self, path):
+            # AbstractedFS changes the working directory of the whole process,
+            # which races with the tests and the other sessions
+            if not os.path.isdir(path):
+                raise FileNotFoundError(path)
+            self.cwd = self.fs2ftp(path)
+
+        def format_list(self, basedir, listing, ignore_err=True):
+            for basename in listing:
+                st = os.stat(os.path.join(basedir, basename))
+                # like ls -l, files older than six months show the year
+                recent = time.time() - st.st_mtime < 180 * 86400
+                mtime = time.strftime(
+                    "%b %d %H:%M" if recent else "%b %d  %Y",
+                    time.localtime(st.st_mtime),
+                )
+                mode = "drwxr-xr-x" if stat.S_ISDIR(st.st_mode) else "-rw-r--r--"
+                line = (
+                    f"{mode} {1:>4} {'owner':<8} {'group':<8} "
+                    f"{st.st_size:>8} {mtime} {basename}\r\n"
+                )
+                yield line.encode("utf-8")
+
+    authorizer = DummyAuthorizer()
+    authorizer.add_user(USERNAME, PASSWORD, str(root), perm="elr")
+    handler = type("Handler", (FTPHandler,), {})
+    handler.authorizer = authorizer
+    handler.abstracted_fs = VendorFS
+    if not mlsd:
+        handler.proto_cmds = {
+            cmd: info for cmd, info in FTPHandler.proto_cmds.items() if cmd != "MLSD"
+        }
+    # pyftpdlib shares the IOLoop and the event that stops worker threads
+    # between servers, so a server shutting down at the end of one test would
+    # stop the server of the next
+    server_class = type("Server", (ThreadedFTPServer,), {"_exit": threading.Event()})
+    server = server_class(("127.0.0.1", 0), handler, ioloop=IOLoop())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.address[1]
+    finally:
+        server.close_all()
@@ -0,0 +1,159 @@
+import shutil
+
+import pytest
+from click.testing import CliRunner
+
+from shelf_ready_validator import cli
+from shelf_ready_validator.batch import BatchSummary, file_names, find_files
+
+
+@pytest.fixture
+def marc_dir(tmp_path):
+    shutil.copy("tests/test.mrc", tmp_path / "small.mrc")
+    with open(tmp_path / "large.mrc", "wb") as fh:
+        fh.write(open("tests/test.mrc", "rb").read() * 2)
+    (tmp_path / "notes.txt").write_text("not a MARC file")
+    (tmp_path / "sub").mkdir()
+    shutil.copy("tests/test.mrc", tmp_path / "sub" / "other.mrc")
+    return tmp_path
+
+
+def test_find_files_directory(marc_dir):
+    assert find_files(str(marc_dir)) == [
+        str(marc_dir / "large.mrc"),
+        str(marc_dir / "small.mrc"),
+    ]
+
+
+def test_find_files_glob(marc_dir):
+    assert find_files(str(marc_dir / "**" / "*.mrc")) == [
+        str(marc_dir / "large.mrc"),
+        str(marc_dir / "small.mrc"),
+        str(marc_dir / "sub" / "other.mrc"),
+    ]
+
+
+def test_find_files_list(marc_dir):
+    small = str(marc_dir / "small.mrc")
+    assert find_files(f"{small}, {marc_dir}, {small}") == [
+        str(marc_dir / "large.mrc"),
+        small,
+    ]
+
+
+@pytest.mark.parametrize("spec", ["tests/test.mrc", "missing.mrc"])
+def test_find_files_single_file(spec):
+    assert find_files(spec) == [spec]
+
+
+@pytest.mark.parametrize("spec", ["none", ""])
+def test_find_files_none(spec):
+    assert find_files(spec) == []
+
+
+def test_file_names():
+    assert file_names(["a/x.mrc", "b/y.mrc", "c/x.mrc"]) == {
+        "a/x.mrc": "a/x.mrc",
+        "b/y.mrc": "y.mrc",
+        "c/x.mrc": "c/x.mrc",
+    }
+
+
+def test_batch_summary():
+    summary = BatchSummary()
+    results = [
+        {"filename": "a.mrc", "valid": True, "error_count": 0},
+        {"filename": "a.mrc", "valid": False, "error_count": 3},
+        {"filename": "b.mrc", "valid": False, "error_count": 1},
+    ]
+    assert list(summary.track(results)) == results
+    assert summary.total()["records"] == 3
+    assert summary.lines() == [
+        "a.mrc: 2 record(s), 1 valid, 1 invalid, 3 error(s)",
+        "b.mrc: 1 record(s), 0 valid, 1 invalid, 1 error(s)",
+        "All 2 file(s): 3 record(s), 1 valid, 2 invalid, 4 error(s)",
+    ]
+    assert summary.as_dict() == {
+        "files": {
+            "a.mrc": {"records": 2, "valid": 1, "invalid": 1, "errors": 3},
+            "b.mrc": {"records": 1, "valid": 0, "invalid": 1, "errors": 1},
+        },
+        "total": {"records": 3, "valid": 1, "invalid": 2, "errors": 4},
+    }
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_cli_validate_brief_directory(marc_dir, workers):
+    result = CliRunner().invoke(
+        cli,
+        ["--vendor", "eastview", "--file", str(marc_dir), "--workers", workers]
+        + ["validate-brief"],
+    )
+    assert result.exit_code == 0, result.output
+    assert result.output.splitlines()[-3:] == [
+        "large.mrc: 20 record(s), 2 valid, 18 invalid, 58 error(s)",
+        "small.mrc: 10 record(s), 1 valid, 9 invalid, 29 error(s)",
+        "All 2 file(s): 30 record(s), 3 valid, 27 invalid, 87 error(s)",
+    ]
+
+
+def test_cli_export_directory(marc_dir, tmp_path):
+    out = tmp_path / "report.csv"
+    result = CliRunner().invoke(
+        cli,
+        ["--vendor", "eastview", "--file", str(marc_dir), "validate-all", "export"]
+        + ["--format", "csv", "--out", str(out)],
+    )
+    assert result.exit_code == 0, result.output
+    rows = out.read_text().splitlines()[1:]
+    assert [row.split(",")[1] for row in rows] == ["large.mrc"] * 20 + [
+        "small.mrc"
+    ] * 10
+
+
+def test_cli_record_with_several_files(marc_dir):
+    result = CliRunner().invoke(
+        cli,
+        ["--vendor", "eastview", "--file", str(marc_dir), "--record", "1", "read"],
+    )
+    assert result.exit_code == 2
+    assert "can only be used with a single file" in result.output
+
+
+@pytest.mark.parametrize("command", ["read", "read-input"])
+def test_cli_read_with_several_files(marc_dir, command):
+    result = CliRunner().invoke(
+        cli, ["--vendor", "eastview", "--file", str(marc_dir), command]
+    )
+    assert result.exit_code == 2
+    assert f"{command} can only be used with a single file" in result.output
+
+
+@pytest.mark.parametrize("spec", ["sub", "sub/", "sub/*.mrc"])
+def test_cli_export_single_file_name(marc_dir, tmp_path, monkeypatch, spec):
+    monkeypatch.chdir(marc_dir)
+    out = tmp_path / "report.csv"
+    result = CliRunner().invoke(
+        cli,
+        ["--vendor", "eastview", "--file", spec, "--no-cache", "validate-all"]
+        + ["export", "--format", "csv", "--out", str(out)],
+    )
+    assert result.exit_code == 0, result.output
+    rows = out.read_text().splitlines()[1:]
+    assert [row.split(",")[1] for row in rows] == ["other.mrc"] * 10
+
+
+def test_cli_validate_brief_same_file_names(marc_dir, monkeypatch):
+    shutil.copy("tests/test.mrc", marc_dir / "sub" / "small.mrc")
+    monkeypatch.chdir(marc_dir)
+    result = CliRunner().invoke(
+        cli,
+        ["--vendor", "eastview", "--file", "**/*.mrc", "--no-cache", "validate-brief"],
+    )
+    assert result.exit_code == 0, result.output
+    assert sorted(result.output.splitlines()[-5:-1]) == [
+        "large.mrc: 20 record(s), 2 valid, 18 invalid, 58 error(s)",
+        "other.mrc: 10 record(s), 1 valid, 9 invalid, 29 error(s)",
+        "small.mrc: 10 record(s), 1 valid, 9 invalid, 29 error(s)",
+        "sub/small.mrc: 10 record(s), 1 valid, 9 invalid, 29 error(s)",
+    ]
@@ -0,0 +1,152 @@
+import shutil
+
+import pytest
+from click.testing import CliRunner
+
+from shelf_ready_validator import cli
+from shelf_ready_validator.cache import ResultCache, record_key, rules_version
+from shelf_ready_validator.mapped import read_mapped_records
+from shelf_ready_validator.translate import read_marc_records
+from shelf_ready_validator.validate import validate_files, validate_records
+
+
+def numbered(file="tests/test.mrc"):
+    return enumerate(read_marc_records(file), 1)
+
+
+def result(n):
+    return {
+        "record_number": n,
+        "control_number": f"ocm{n}",
+        "vendor_code": "EVP",
+        "valid": False,
+        "error_count": 1,
+        "errors": [{"type": "missing", "loc": ("invoice_tax",)}],
+        "error_summary": {"error_count": 1},
+    }
+
+
+def test_result_cache_get_put(result_cache):
+    with ResultCache() as cache:
+        assert cache.path == str(result_cache)
+        assert cache.get_many([b"a", b"b"]) == {}
+        cache.put_many([(b"a", result(1))])
+        found = cache.get_many([b"a", b"b"])
+    expected = result(1)
+    del expected["record_number"]
+    assert found == {b"a": expected}
+    assert found[b"a"]["errors"][0]["loc"] == ("invoice_tax",)
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_result_cache_persists(tmp_path):
+    with ResultCache(str(tmp_path / "cache.db")) as cache:
+        cache.put_many([(b"a", result(1))])
+    with ResultCache(str(tmp_path / "cache.db")) as cache:
+        assert len(cache) == 1
+        assert b"a" in cache.get_many([b"a"])
+
+
+def test_result_cache_drops_other_versions(tmp_path):
+    with ResultCache(str(tmp_path / "cache.db"), version="old") as cache:
+        cache.put_many([(b"a", result(1))])
+    with ResultCache(str(tmp_path / "cache.db"), version="new") as cache:
+        assert len(cache) == 0
+        assert cache.get_many([b"a"]) == {}
+
+
+def test_result_cache_size_after_replace(tmp_path):
+    with ResultCache(str(tmp_path / "cache.db")) as cache:
+        cache.put_many([(b"a", result(1))])
+        size = cache.size
+        cache.put_many([(b"a", result(1))])
+        cache.put_many([(b"a", result(1)), (b"a", result(1))])
+        assert cache.size == size
+        assert len(cache) == 1
+
+
+def test_result_cache_size_matches_table(tmp_path):
+    with ResultCache(str(tmp_path / "cache.db")) as cache:
+        cache.put_many([(b"a", result(1)), (b"b", result(22))])
+        cache.put_many([(b"a", result(333)), (b"c", result(4))])
+        (size,) = cache.conn.execute("SELECT SUM(size) FROM results").fetchone()
+        assert cache.size == size
+
+
+def test_result_cache_evicts_least_recently_used(tmp_path):
+    with ResultCache(str(tmp_path / "cache.db")) as cache:
+        cache.put_many([(b"a", result(1))])
+        cache.max_bytes = cache.size * 2
+        cache.put_many([(b"b", result(2))])
+        cache.get_many([b"a"])
+        cache.put_many([(b"c", result(3))])
+        assert len(cache) == 2
+        assert set(cache.get_many([b"a", b"b", b"c"])) == {b"a", b"c"}
+        assert cache.size <= cache.max_bytes
+
+
+def test_rules_version():
+    assert rules_version() == rules_version()
+    assert len(rules_version()) == 64
+
+
+def test_record_key_matches_mapped_records():
+    records = [record for _, record in numbered()]
+    mapped = list(read_mapped_records("tests/test.mrc"))
+    assert [record_key(r) for r in records] == [record_key(r) for r in mapped]
+
+
+@pytest.mark.parametrize("workers, chunk_size", [(1, 100), (1, 3), (2, 3)])
+def test_validate_records_cached(workers, chunk_size):
+    expected = list(validate_records(numbered()))
+    with ResultCache() as cache:
+        first = list(validate_records(numbered(), workers, chunk_size, cache))
+        assert cache.hits < cache.misses
+        cache.hits = cache.misses = 0
+        second = list(validate_records(numbered(), workers, chunk_size, cache))
+        assert cache.misses == 0
+    assert first == expected
+    assert second == expected
+
+
+def test_validate_records_revalidates_changed_records():
+    records = [record for _, record in numbered()]
+    with ResultCache() as cache:
+        list(validate_records(enumerate(records, 1), cache=cache))
+        records[3]["001"].data = "changed"
+        cache.hits = cache.misses = 0
+        results = list(validate_records(enumerate(records, 1), cache=cache))
+    assert cache.misses == 1
+    assert results[3]["control_number"] == "changed"
+
+
+def test_validate_files_cached(tmp_path):
+    shutil.copy("tests/test.mrc", tmp_path / "a.mrc")
+    shutil.copy("tests/test.mrc", tmp_path / "b.mrc")
+    files = [str(tmp_path / "a.mrc"), str(tmp_path / "b.mrc")]
+    expected = list(validate_files(files))
+    with ResultCache() as cache:
+        assert list(validate_files(files, cache=cache)) == expected
+        assert cache.hits > 0
+
+
+@pytest.mark.parametrize("command", ["validate-all", "validate-brief", "validate-raw"])
+def test_cli_cache(result_cache, command):
+    args = ["--vendor", "eastview", "--file", "tests/test.mrc"]
+    first = CliRunner().invoke(cli, args + [command])
+    assert first.exit_code == 0, first.output
+    assert result_cache.exists()
+    second = CliRunner().invoke(cli, args + [command])
+    assert second.output == first.output
+    uncached = CliRunner().invoke(cli, args + ["--no-cache", command])
+    assert uncached.output == first.output
+
+
+def test_cli_no_cache(result_cache):
+    result = CliRunner().invoke(
+        cli,
+        ["--vendor", "eastview", "--file", "tests/test.mrc", "--no-cache"]
+        + ["validate-brief"],
+    )
+    assert result.exit_code == 0, result.output
+    assert not result_cache.exists()
@@ -0,0 +1,288 @@
+import json
+import os
+import shutil
+import pytest
+from click.testing import CliRunner
+from shelf_ready_validator import cli
+from shelf_ready_validator.connect import (
+    ConnectionManager,
+    ftpConnection,
+    sftpConnection,
+)
+from shelf_ready_validator.translate import read_marc_records
+from tests.servers import PASSWORD, USERNAME, ftp_server, sftp_server
+
+
+@pytest.fixture
+def remote(tmp_path):
+    remote = tmp_path / "remote" / "files"
+    remote.mkdir(parents=True)
+    for n in range(5):
+        (remote / f"file{n}.mrc").write_bytes(bytes([n]) * 1000 * (n + 1))
+    old = remote / "old.mrc"
+    old.write_bytes(b"old")
+    os.utime(old, (0, 0))
+    return remote
+
+
+@pytest.fixture
+def userprofile(tmp_path, monkeypatch):
+    monkeypatch.setenv("USERPROFILE", str(tmp_path))
+    return tmp_path
+
+
+def write_creds(userprofile, vendor, port):
+    cred_dir = userprofile / ".cred" / ".sftp"
+    cred_dir.mkdir(parents=True, exist_ok=True)
+    creds = {
+        "host": "127.0.0.1",
+        "port": port,
+        "username": USERNAME,
+        "password": PASSWORD,
+        "filepath": "/files",
+    }
+    (cred_dir / f"{vendor}.json").write_text(json.dumps(creds))
+    local = userprofile / "github" / "RL-shelf-ready-validation" / "temp" / vendor
+    local.mkdir(parents=True)
+    return local
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 3])
+def test_sftp_get_recent_records(remote, userprofile, max_concurrency):
+    with sftp_server(remote.parent) as port:
+        local = write_creds(userprofile, "eastview", port)
+        with sftpConnection("eastview") as connection:
+            files = connection.get_recent_records(max_concurrency)
+    assert sorted(os.path.basename(file) for file in files) == [
+        f"file{n}.mrc" for n in range(5)
+    ]
+    for n in range(5):
+        assert (local / f"file{n}.mrc").read_bytes() == (
+            remote / f"file{n}.mrc"
+        ).read_bytes()
+    assert not (local / "old.mrc").exists()
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 3])
+def test_ftp_get_recent_records(remote, userprofile, max_concurrency):
+    pytest.importorskip("pyftpdlib")
+    with ftp_server(remote.parent) as port:
+        local = write_creds(userprofile, "leila", port)
+        with ftpConnection("leila") as connection:
+            files = connection.get_recent_records(max_concurrency)
+    assert sorted(os.path.basename(file) for file in files) == [
+        f"file{n}.mrc" for n in range(5)
+    ]
+    for n in range(5):
+        assert (local / f"file{n}.mrc").read_bytes() == (
+            remote / f"file{n}.mrc"
+        ).read_bytes()
+    assert not (local / "old.mrc").exists()
+
+
+@pytest.mark.parametrize(
+    "vendor, server, connection",
+    [("eastview", sftp_server, sftpConnection), ("leila", ftp_server, ftpConnection)],
+)
+def test_get_records(remote, userprofile, vendor, server, connection):
+    if server is ftp_server:
+        pytest.importorskip("pyftpdlib")
+    with server(remote.parent) as port:
+        local = write_creds(userprofile, vendor, port)
+        with connection(vendor) as vendor_connection:
+            files = vendor_connection.get_records()
+    assert sorted(files) == [f"file{n}.mrc" for n in range(5)] + ["old.mrc"]
+    for file in files:
+        assert (local / file).read_bytes() == (remote / file).read_bytes()
+
+
+@pytest.mark.parametrize(
+    "vendor, server, connection",
+    [("eastview", sftp_server, sftpConnection), ("leila", ftp_server, ftpConnection)],
+)
+def test_get_recent_records_skips_downloaded_files(
+    remote, userprofile, vendor, server, connection
+):
+    if server is ftp_server:
+        pytest.importorskip("pyftpdlib")
+    with server(remote.parent) as port:
+        write_creds(userprofile, vendor, port)
+        with connection(vendor) as vendor_connect:
+            assert len(vendor_connect.get_recent_records()) == 5
+            assert vendor_connect.get_recent_records() == []
+            (remote / "file1.mrc").write_bytes(b"changed")
+            files = vendor_connect.get_recent_records()
+    assert [os.path.basename(file) for file in files] == ["file1.mrc"]
+
+
+@pytest.mark.parametrize(
+    "vendor, server, connection",
+    [("eastview", sftp_server, sftpConnection), ("leila", ftp_server, ftpConnection)],
+)
+def test_get_recent_records_resumes(
+    remote, userprofile, vendor, server, connection, capsys
+):
+    if server is ftp_server:
+        pytest.importorskip("pyftpdlib")
+    with server(remote.parent) as port:
+        local = write_creds(userprofile, vendor, port)
+        (local / "file4.mrc.part").write_bytes(bytes([4]) * 1234)
+        with connection(vendor) as vendor_connect:
+            file = next(f for f in vendor_connect.list_files() if f.name == "file4.mrc")
+            (local / "file4.mrc.part-info").write_text(f"{file.size}\t{file.mtime!r}\n")
+            vendor_connect.get_recent_records()
+    assert "resumed at 1234 bytes" in " ".join(capsys.readouterr().out.split())
+    assert (local / "file4.mrc").read_bytes() == (remote / "file4.mrc").read_bytes()
+    assert not (local / "file4.mrc.part").exists()
+    assert not (local / "file4.mrc.part-info").exists()
+
+
+@pytest.mark.parametrize(
+    "vendor, server, connection",
+    [("eastview", sftp_server, sftpConnection), ("leila", ftp_server, ftpConnection)],
+)
+def test_open_files_streams_records(remote, userprofile, vendor, server, connection):
+    if server is ftp_server:
+        pytest.importorskip("pyftpdlib")
+    shutil.copy("tests/test.mrc", remote / "test.mrc")
+    expected = [record.as_marc() for record in read_marc_records("tests/test.mrc")]
+    with server(remote.parent) as port:
+        local = write_creds(userprofile, vendor, port)
+        opened = []
+        with connection(vendor) as vendor_connect:
+            for name, remote_file in vendor_connect.open_files(["test.mrc"] * 2):
+                opened.append(name)
+                records = [
+                    record.as_marc() for record in read_marc_records(remote_file)
+                ]
+                assert records == expected
+    assert opened == ["test.mrc", "test.mrc"]
+    assert list(local.iterdir()) == []
+
+
+@pytest.mark.parametrize(
+    "vendor, server, connection",
+    [("eastview", sftp_server, sftpConnection), ("leila", ftp_server, ftpConnection)],
+)
+def test_open_files_recent(remote, userprofile, vendor, server, connection):
+    if server is ftp_server:
+        pytest.importorskip("pyftpdlib")
+    with server(remote.parent) as port:
+        write_creds(userprofile, vendor, port)
+        with connection(vendor) as vendor_connect:
+            files = {
+                name: remote_file.read()
+                for name, remote_file in vendor_connect.open_files()
+            }
+    assert sorted(files) == [f"file{n}.mrc" for n in range(5)]
+    assert files["file2.mrc"] == (remote / "file2.mrc").read_bytes()
+
+
+def test_ftp_open_files_closed_early(remote, userprofile):
+    pytest.importorskip("pyftpdlib")
+    (remote / "large.mrc").write_bytes(b"x" * 5_000_000)
+    with ftp_server(remote.parent) as port:
+        write_creds(userprofile, "leila", port)
+        connection = ftpConnection("leila")
+        for name, remote_file in connection.open_files(["large.mrc"]):
+            assert remote_file.read(10) == b"x" * 10
+            break
+        assert connection._ftp_client is None
+        files = {name: f.read() for name, f in connection.open_files(["file0.mrc"])}
+        assert files["file0.mrc"] == (remote / "file0.mrc").read_bytes()
+        assert connection.handshakes == 2
+        connection.close()
+
+
+@pytest.mark.parametrize(
+    "vendor, server, connection",
+    [("eastview", sftp_server, sftpConnection), ("leila", ftp_server, ftpConnection)],
+)
+def test_connection_reuses_session(remote, userprofile, vendor, server, connection):
+    if server is ftp_server:
+        pytest.importorskip("pyftpdlib")
+    with server(remote.parent) as port:
+        write_creds(userprofile, vendor, port)
+        with connection(vendor) as vendor_connect:
+            vendor_connect.list_all_files()
+            vendor_connect.list_recent_records()
+            assert vendor_connect.handshakes == 1
+            vendor_connect.get_recent_records(max_concurrency=1)
+        assert vendor_connect.handshake_seconds > 0
+        if vendor == "eastview":
+            # downloads use extra channels on the same ssh connection
+            assert vendor_connect.handshakes == 1
+        else:
+            # downloads use their own ftp sessions
+            assert vendor_connect.handshakes == 2
+
+
+@pytest.mark.parametrize(
+    "vendor, server, connection",
+    [
+        ("eastview", sftp_server, sftpConnection),
+        ("leila", ftp_server, ftpConnection),
+        ("leila", lambda root: ftp_server(root, mlsd=False), ftpConnection),
+    ],
+)
+def test_list_files(remote, userprofile, vendor, server, connection):
+    pytest.importorskip("pyftpdlib")
+    (remote / "subdir").mkdir()
+    with server(remote.parent) as port:
+        write_creds(userprofile, vendor, port)
+        with connection(vendor) as vendor_connect:
+            files = {file.name: file for file in vendor_connect.list_files()}
+    assert sorted(files) == [f"file{n}.mrc" for n in range(5)] + ["old.mrc"]
+    for name, file in files.items():
+        assert file.size == (remote / name).stat().st_size
+        # LIST output only has minutes, or only the day for old files
+        assert abs(file.mtime - (remote / name).stat().st_mtime) < 86400
+
+
+def test_ftp_get_recent_records_without_mlsd(remote, userprofile):
+    pytest.importorskip("pyftpdlib")
+    with ftp_server(remote.parent, mlsd=False) as port:
+        local = write_creds(userprofile, "leila", port)
+        with ftpConnection("leila") as connection:
+            files = connection.get_recent_records()
+    assert sorted(os.path.basename(file) for file in files) == [
+        f"file{n}.mrc" for n in range(5)
+    ]
+    assert (local / "file4.mrc").read_bytes() == (remote / "file4.mrc").read_bytes()
+
+
+def test_connection_manager():
+    connections = ConnectionManager()
+    assert isinstance(connections.get("eastview"), sftpConnection)
+    assert isinstance(connections.get("leila"), ftpConnection)
+    assert connections.get("eastview") is connections.get("eastview")
+    assert connections.summary() == []
+    connections.get("eastview").handshakes = 1
+    assert connections.summary() == ["Opened 1 connection(s) to eastview in 0.00s"]
+    connections.close()
+    assert connections.connections == {}
+
+
+def test_connection_manager_unknown_vendor():
+    with pytest.raises(ValueError):
+        ConnectionManager().get("amalivre")
+
+
+def test_cli_chained_commands_share_connection(remote, userprofile):
+    with sftp_server(remote.parent) as port:
+        write_creds(userprofile, "eastview", port)
+        result = CliRunner().invoke(
+            cli,
+            [
+                "--vendor",
+                "eastview",
+                "--file",
+                "none",
+                "list-all-files",
+                "list-recent-files",
+                "get-recent-files",
+            ],
+        )
+    assert result.exit_code == 0, result.output
+    assert "Downloaded 5 file(s)" in result.output
+    assert "Opened 1 connection(s) to eastview" in result.output
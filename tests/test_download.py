@@ -0,0 +1,211 @@
+import shutil
+import threading
+import time
+import pytest
+from shelf_ready_validator.download import (
+    ClientPool,
+    DownloadStats,
+    RemoteFile,
+    download_files,
+    download_summary,
+)
+
+
+class Client:
+    def __init__(self):
+        self.closed = False
+
+
+@pytest.fixture
+def remote(tmp_path):
+    remote = tmp_path / "remote"
+    remote.mkdir()
+    for n in range(6):
+        (remote / f"file{n}.mrc").write_bytes(b"x" * (n + 1) * 100)
+    return remote
+
+
+@pytest.fixture
+def remote_files(remote):
+    return [
+        RemoteFile(file.name, file.stat().st_size, file.stat().st_mtime)
+        for file in sorted(remote.iterdir())
+    ]
+
+
+def copy_from(remote):
+    def fetch(client, file, part_path, offset):
+        with open(remote / file, "rb") as src, open(part_path, "ab") as dst:
+            src.seek(offset)
+            shutil.copyfileobj(src, dst)
+
+    return fetch
+
+
+def test_download_files(tmp_path, remote, remote_files):
+    local = tmp_path / "local"
+    local.mkdir()
+    opened = []
+
+    def open_client():
+        client = Client()
+        opened.append(client)
+        return client
+
+    completed = []
+    with ClientPool(open_client, lambda c: setattr(c, "closed", True), 3) as pool:
+        all_stats = download_files(
+            remote_files,
+            str(local),
+            copy_from(remote),
+            pool,
+            3,
+            lambda file, stats: completed.append(file.name),
+        )
+    assert [stats.file for stats in all_stats] == [f"file{n}.mrc" for n in range(6)]
+    assert sorted(completed) == [f"file{n}.mrc" for n in range(6)]
+    assert not list(local.glob("*.part"))
+    assert [stats.size for stats in all_stats] == [100, 200, 300, 400, 500, 600]
+    assert (local / "file5.mrc").read_bytes() == b"x" * 600
+    assert 1 <= len(opened) <= 3
+    assert all(client.closed for client in opened)
+
+
+def test_download_files_concurrent(tmp_path, remote, remote_files):
+    active = []
+    max_active = []
+    lock = threading.Lock()
+
+    def fetch(client, file, part_path, offset):
+        with lock:
+            active.append(file)
+            max_active.append(len(active))
+        time.sleep(0.05)
+        copy_from(remote)(client, file, part_path, offset)
+        with lock:
+            active.remove(file)
+
+    with ClientPool(Client, lambda c: None, 3) as pool:
+        download_files(remote_files, str(tmp_path), fetch, pool, 3)
+    assert max(max_active) == 3
+
+
+def interrupt_after(remote, size):
+    def fetch(client, file, part_path, offset):
+        with open(remote / file, "rb") as src, open(part_path, "ab") as dst:
+            src.seek(offset)
+            dst.write(src.read(size))
+
+    return fetch
+
+
+def test_download_files_resumes(tmp_path, remote, remote_files):
+    with ClientPool(Client, lambda c: None, 1) as pool:
+        with pytest.raises(OSError):
+            download_files(
+                remote_files[5:], str(tmp_path), interrupt_after(remote, 250), pool, 1
+            )
+    offsets = []
+
+    def fetch(client, file, part_path, offset):
+        offsets.append(offset)
+        copy_from(remote)(client, file, part_path, offset)
+
+    with ClientPool(Client, lambda c: None, 1) as pool:
+        stats = download_files(remote_files[5:], str(tmp_path), fetch, pool, 1)[0]
+    assert offsets == [250]
+    assert stats.offset == 250
+    assert stats.transferred == 350
+    assert (tmp_path / "file5.mrc").read_bytes() == b"x" * 600
+    assert not (tmp_path / "file5.mrc.part").exists()
+    assert not (tmp_path / "file5.mrc.part-info").exists()
+
+
+def test_download_files_restarts_changed_file(tmp_path, remote, remote_files):
+    with ClientPool(Client, lambda c: None, 1) as pool:
+        with pytest.raises(OSError):
+            download_files(
+                remote_files[5:], str(tmp_path), interrupt_after(remote, 250), pool, 1
+            )
+    (remote / "file5.mrc").write_bytes(b"z" * 600)
+    changed = RemoteFile("file5.mrc", 600, remote_files[5].mtime + 60)
+    with ClientPool(Client, lambda c: None, 1) as pool:
+        stats = download_files([changed], str(tmp_path), copy_from(remote), pool, 1)[0]
+    assert stats.offset == 0
+    assert (tmp_path / "file5.mrc").read_bytes() == b"z" * 600
+
+
+def test_download_files_restarts_part_without_info(tmp_path, remote, remote_files):
+    (tmp_path / "file5.mrc.part").write_bytes(b"y" * 250)
+    with ClientPool(Client, lambda c: None, 1) as pool:
+        stats = download_files(
+            remote_files[5:], str(tmp_path), copy_from(remote), pool, 1
+        )[0]
+    assert stats.offset == 0
+    assert (tmp_path / "file5.mrc").read_bytes() == b"x" * 600
+
+
+def test_download_files_restarts_oversized_part(tmp_path, remote, remote_files):
+    (tmp_path / "file0.mrc.part").write_bytes(b"y" * 500)
+    with ClientPool(Client, lambda c: None, 1) as pool:
+        download_files(remote_files[:1], str(tmp_path), copy_from(remote), pool, 1)
+    assert (tmp_path / "file0.mrc").read_bytes() == b"x" * 100
+
+
+def test_download_files_incomplete(tmp_path, remote, remote_files):
+    def fetch(client, file, part_path, offset):
+        with open(part_path, "ab") as dst:
+            dst.write(b"x" * 10)
+
+    completed = []
+    with ClientPool(Client, lambda c: None, 1) as pool:
+        with pytest.raises(OSError):
+            download_files(
+                remote_files[:1],
+                str(tmp_path),
+                fetch,
+                pool,
+                1,
+                lambda file, stats: completed.append(file),
+            )
+    assert completed == []
+    assert (tmp_path / "file0.mrc.part").read_bytes() == b"x" * 10
+    assert not (tmp_path / "file0.mrc").exists()
+
+
+def test_client_pool_reuses_clients():
+    opened = []
+
+    def open_client():
+        opened.append(Client())
+        return opened[-1]
+
+    pool = ClientPool(open_client, lambda c: None, 2)
+    with pool.client() as first:
+        pass
+    with pool.client() as second:
+        pass
+    assert first is second
+    assert len(opened) == 1
+
+
+def test_client_pool_open_error():
+    def open_client():
+        raise ConnectionError
+
+    pool = ClientPool(open_client, lambda c: None, 1)
+    with pytest.raises(ConnectionError):
+        with pool.client():
+            pass
+    assert pool.opened == 0
+
+
+def test_download_stats():
+    stats = DownloadStats("file.mrc", "/tmp/file.mrc", 2048, 0.5)
+    assert stats.rate == 4096
+    assert str(stats) == "2048 bytes in 0.50s, 4.0 KB/s"
+    resumed = DownloadStats("file.mrc", "/tmp/file.mrc", 3072, 0.5, 1024)
+    assert str(resumed) == "2048 bytes in 0.50s, 4.0 KB/s, resumed at 1024 bytes"
+    assert download_summary([stats, stats], 1.0) == (
+        "Downloaded 2 file(s), 4096 bytes in 1.00s (4.0 KB/s)"
+    )
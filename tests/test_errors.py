@@ -3,10 +3,16 @@ from pydantic import ValidationError
 from shelf_ready_validator.models import MonographRecord, OtherMaterialRecord
 from contextlib import nullcontext as does_not_raise
 from shelf_ready_validator.errors import (
+    FIELD_LOCATIONS,
+    MARC_TAGS,
+    MAX_TABLE_ITEMS,
     format_errors,
+    item_order_errors,
     match_errors,
+    missing_errors,
     extra_errors,
 )
+from shelf_ready_validator.translate import RLMarcEncoding
 
 
 def test_error_count(valid_rl_monograph_record):
@@ -463,3 +469,119 @@ def test_string_error_pass(string_barcode_error):
 def test_extra_field_error_pass(vendor_code_error):
     with does_not_raise():
         extra_errors(vendor_code_error)
+
+
+@pytest.mark.parametrize(
+    "ctx, output",
+    [
+        ({"expected": "' '"}, "Invalid indicator"),
+        ({"expected": "'1'"}, "Invalid indicator"),
+        ({"expected": "'2'"}, "Input should be '2'"),
+        ({"pattern": "' '"}, "Input should be '2'"),
+    ],
+)
+def test_match_errors_indicator(ctx, output):
+    error = {
+        "type": "literal_error",
+        "loc": ("items", 0, "RL", "item_ind2"),
+        "msg": "Input should be '2'",
+        "input": "3",
+        "ctx": ctx,
+    }
+    assert match_errors(error)["msg"] == output
+
+
+def test_match_errors_price_pattern():
+    error = {
+        "type": "string_pattern_mismatch",
+        "loc": ("order_price",),
+        "msg": "String should match pattern '^\\d{1,}$'",
+        "input": "1.00",
+        "ctx": {"pattern": "^\\d{1,}$"},
+    }
+    new_error = match_errors(error)
+    assert new_error["msg"] == "Invalid price; price should not include a decimal point"
+    assert error["msg"] == "String should match pattern '^\\d{1,}$'"
+
+
+@pytest.mark.parametrize(
+    "loc, output",
+    [
+        (("bib_call_no",), "852"),
+        (("items",), "949"),
+        (("items", 0, "RL", "item_barcode"), ("item_0", "949$i")),
+        (("items", 3, "BPL", "item_call_tag"), ("item_3", "949$z")),
+        (("items", 250, "RL", "item_barcode"), ("item_250", "949$i")),
+        (("items", 0), "949"),
+    ],
+)
+def test_missing_errors_loc(loc, output):
+    error = {"type": "missing", "loc": loc, "msg": "Field required", "input": {}}
+    new_error = missing_errors(error)
+    assert new_error["loc"] == output
+    assert new_error["input"] == loc
+
+
+@pytest.mark.parametrize(
+    "loc, output",
+    [
+        (("items", 1, "RL", "item_location"), ("item_1", "949$l")),
+        (("items", 2), ("item_2", "949")),
+        (("items", 250), ("item_250", "949")),
+        (("order_location",), "960$t"),
+    ],
+)
+def test_match_errors_loc(loc, output):
+    error = {
+        "type": "union_tag_invalid",
+        "loc": loc,
+        "msg": "Input tag 'NYPL' found using 'library' does not match",
+        "input": {},
+        "ctx": {"discriminator": "'library'"},
+    }
+    assert match_errors(error)["loc"] == output
+
+
+@pytest.mark.parametrize("item", ["0", "99", "250"])
+def test_item_order_errors_loc(item):
+    error = {
+        "type": "Item/Order location check",
+        "loc": (item, "item_location", "item_type", "order_location"),
+        "msg": "Check item and order data; combination is not valid.",
+        "input": ("rc2ma", "2", "MAL"),
+    }
+    assert item_order_errors(error)["loc"] == (
+        f"item_{item}",
+        "949$l",
+        "949$t",
+        "960$t",
+    )
+
+
+@pytest.mark.parametrize("count", [1, 3, 150])
+def test_extra_errors_loc(count):
+    error = {
+        "type": "extra_forbidden",
+        "loc": ("items",),
+        "msg": "Extra inputs are not permitted",
+        "input": [{}] * count,
+    }
+    assert extra_errors(error)["loc"] == [f"949_{i}" for i in range(count)]
+
+
+def test_unknown_field_loc():
+    error = {"type": "missing", "loc": ("not_a_field",), "msg": "", "input": {}}
+    with pytest.raises(KeyError):
+        missing_errors(error)
+
+
+def test_location_tables_match_encoding():
+    for name, tag in MARC_TAGS.items():
+        assert RLMarcEncoding[name].value == tag
+        assert FIELD_LOCATIONS[(name,)] == tag
+        assert FIELD_LOCATIONS[("items", MAX_TABLE_ITEMS - 1, "RL", name)] == (
+            f"item_{MAX_TABLE_ITEMS - 1}",
+            tag,
+        )
+    with pytest.raises(TypeError):
+        FIELD_LOCATIONS[("bib_call_no",)] = "999"  # type: ignore[index]
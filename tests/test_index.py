@@ -0,0 +1,86 @@
+import os
+import shutil
+import pytest
+from shelf_ready_validator.index import (
+    build_index,
+    find_records,
+    index_path,
+    load_index,
+    read_indexed_records,
+)
+from shelf_ready_validator.translate import read_marc_records
+
+
+@pytest.fixture
+def marc_file(tmp_path):
+    file = tmp_path / "test.mrc"
+    shutil.copy("tests/test.mrc", file)
+    return str(file)
+
+
+def test_build_index(marc_file):
+    index = build_index(marc_file)
+    records = list(read_marc_records(marc_file))
+    assert len(index) == 10
+    assert [entry.record_number for entry in index] == list(range(1, 11))
+    assert [entry.control_number for entry in index] == [
+        record["001"].data for record in records
+    ]
+    assert index[0].offset == 0
+    assert index[-1].offset + index[-1].length == os.path.getsize(marc_file)
+    assert os.path.exists(index_path(marc_file))
+
+
+@pytest.mark.parametrize(
+    "data,message",
+    [
+        (b"00000" + b" " * 21, "Invalid record length b'00000'"),
+        (b"00010" + b" " * 21, "Invalid record length b'00010'"),
+        (b"0abcd" + b" " * 21, "Invalid record length b'0abcd'"),
+        (b"00100" + b" " * 21, "Truncated record"),
+    ],
+)
+def test_build_index_corrupt_leader(marc_file, data, message):
+    valid = open(marc_file, "rb").read()
+    with open(marc_file, "ab") as fh:
+        fh.write(data)
+    with pytest.raises(ValueError, match=f"{message} at byte {len(valid)}"):
+        build_index(marc_file)
+
+
+def test_build_index_zero_length_first_record(marc_file):
+    with open(marc_file, "r+b") as fh:
+        fh.write(b"00000")
+    with pytest.raises(ValueError, match="Invalid record length b'00000' at byte 0"):
+        build_index(marc_file)
+
+
+def test_load_index_reads_sidecar(marc_file):
+    index = build_index(marc_file)
+    assert load_index(marc_file) == index
+
+
+def test_load_index_rebuilds_stale_index(marc_file):
+    with open(index_path(marc_file), "w") as idx:
+        idx.write("foo\n")
+    assert len(load_index(marc_file)) == 10
+
+
+@pytest.mark.parametrize("record_number", [1, 5, 10])
+def test_read_indexed_records_by_number(marc_file, record_number):
+    entries = find_records(load_index(marc_file), record_number=record_number)
+    records = list(read_indexed_records(marc_file, entries))
+    expected = list(read_marc_records(marc_file))[record_number - 1]
+    assert len(records) == 1
+    assert records[0].as_marc() == expected.as_marc()
+
+
+def test_read_indexed_records_by_control_number(marc_file):
+    entries = find_records(load_index(marc_file), control_number="AAL08292435-0001")
+    records = list(read_indexed_records(marc_file, entries))
+    assert [entry.record_number for entry in entries] == [2, 9]
+    assert [record["001"].data for record in records] == ["AAL08292435-0001"] * 2
+
+
+def test_find_records_no_match(marc_file):
+    assert find_records(load_index(marc_file), control_number="foo") == []
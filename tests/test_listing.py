@@ -0,0 +1,164 @@
+import ftplib
+from datetime import datetime, timezone
+
+import pytest
+
+from shelf_ready_validator.download import RemoteFile
+from shelf_ready_validator.listing import (
+    list_ftp_files,
+    list_sftp_files,
+    parse_list_line,
+    parse_mlsd_modify,
+    recent_files,
+)
+
+NOW = datetime(2024, 3, 15, 12, 0)
+
+
+@pytest.mark.parametrize(
+    "line, name, size, modified",
+    [
+        (
+            "-rw-r--r--    1 owner    group        2000 Mar 14 09:30 file1.mrc",
+            "file1.mrc",
+            2000,
+            datetime(2024, 3, 14, 9, 30),
+        ),
+        (
+            "-rw-r--r-- 1 ftp ftp 123456789 Mar  1 23:59 file2.mrc",
+            "file2.mrc",
+            123456789,
+            datetime(2024, 3, 1, 23, 59),
+        ),
+        (
+            "-rw-rw-r--   1 1001  1001   12 Dec 30 10:00 last year.mrc",
+            "last year.mrc",
+            12,
+            datetime(2023, 12, 30, 10, 0),
+        ),
+        (
+            "-rw-r--r--   1 owner group  512 Jun  3  2021 old.mrc",
+            "old.mrc",
+            512,
+            datetime(2021, 6, 3),
+        ),
+        (
+            "-rw-r--r--   1 owner      2048 Mar 14 09:30 no group.mrc",
+            "no group.mrc",
+            2048,
+            datetime(2024, 3, 14, 9, 30),
+        ),
+        (
+            "-rw-r--r--   1 1001 1001  2048 Mar 14 09:30 numeric group.mrc",
+            "numeric group.mrc",
+            2048,
+            datetime(2024, 3, 14, 9, 30),
+        ),
+        (
+            "03-14-24  09:30AM                 2000 file1.mrc",
+            "file1.mrc",
+            2000,
+            datetime(2024, 3, 14, 9, 30),
+        ),
+        (
+            "03-14-2024  01:05PM       7 file 2.mrc",
+            "file 2.mrc",
+            7,
+            datetime(2024, 3, 14, 13, 5),
+        ),
+    ],
+)
+def test_parse_list_line(line, name, size, modified):
+    assert parse_list_line(line, NOW) == RemoteFile(name, size, modified.timestamp())
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "drwxr-xr-x    2 owner    group        4096 Mar 14 09:30 archive",
+        "lrwxrwxrwx    1 owner    group          11 Mar 14 09:30 latest -> file1.mrc",
+        "03-14-24  09:30AM       <DIR>          archive",
+        "total 12",
+        "",
+    ],
+)
+def test_parse_list_line_skips(line):
+    assert parse_list_line(line, NOW) is None
+
+
+def test_parse_mlsd_modify():
+    assert parse_mlsd_modify("20240314093000") == (
+        datetime(2024, 3, 14, 9, 30, tzinfo=timezone.utc).timestamp()
+    )
+    assert parse_mlsd_modify("20240314093000.123") == parse_mlsd_modify(
+        "20240314093000"
+    )
+
+
+class StubFTP:
+    def __init__(self, mlsd_error=None):
+        self.mlsd_error = mlsd_error
+        self.commands = []
+
+    def mlsd(self, path="", facts=[]):
+        self.commands.append("MLSD")
+        if self.mlsd_error:
+            raise self.mlsd_error
+        yield ".", {"type": "cdir", "modify": "20240314093000"}
+        yield "archive", {"type": "dir", "modify": "20240314093000"}
+        yield "file1.mrc", {"type": "file", "size": "2000", "modify": "20240314093000"}
+
+    def retrlines(self, cmd, callback):
+        self.commands.append(cmd)
+        callback("drwxr-xr-x  2 owner  group  4096 Mar 14 09:30 archive")
+        callback("-rw-r--r--  1 owner  group  2000 Mar 14 09:30 file1.mrc")
+
+
+def test_list_ftp_files_mlsd():
+    ftp_client = StubFTP()
+    assert list_ftp_files(ftp_client) == [
+        RemoteFile("file1.mrc", 2000, parse_mlsd_modify("20240314093000"))
+    ]
+    assert ftp_client.commands == ["MLSD"]
+
+
+def test_list_ftp_files_falls_back_to_list():
+    ftp_client = StubFTP(ftplib.error_perm("500 Unknown command."))
+    files = list_ftp_files(ftp_client)
+    assert [(file.name, file.size) for file in files] == [("file1.mrc", 2000)]
+    assert ftp_client.commands == ["MLSD", "LIST"]
+
+
+def test_list_ftp_files_other_errors():
+    ftp_client = StubFTP(ftplib.error_perm("550 No such file or directory."))
+    with pytest.raises(ftplib.error_perm):
+        list_ftp_files(ftp_client)
+
+
+def test_list_sftp_files():
+    paramiko = pytest.importorskip("paramiko")
+
+    class StubSFTP:
+        def listdir_attr(self, path):
+            file = paramiko.SFTPAttributes()
+            file.filename, file.st_size, file.st_mtime = "file1.mrc", 2000, 1.0
+            file.st_mode = 0o100644
+            directory = paramiko.SFTPAttributes()
+            directory.filename, directory.st_size, directory.st_mtime = "a", 0, 1.0
+            directory.st_mode = 0o040755
+            return [file, directory]
+
+    assert list_sftp_files(StubSFTP(), "/files") == [RemoteFile("file1.mrc", 2000, 1.0)]
+
+
+def test_recent_files():
+    files = [
+        RemoteFile("new.mrc", 1, datetime(2024, 3, 14).timestamp()),
+        RemoteFile("week.mrc", 1, datetime(2024, 3, 8, 12, 0).timestamp()),
+        RemoteFile("old.mrc", 1, datetime(2024, 3, 1).timestamp()),
+    ]
+    assert [file.name for file in recent_files(files, now=NOW)] == [
+        "new.mrc",
+        "week.mrc",
+    ]
+    assert [file.name for file in recent_files(files, days=2, now=NOW)] == ["new.mrc"]
@@ -0,0 +1,81 @@
+import os
+
+import pytest
+from shelf_ready_validator.download import RemoteFile
+from shelf_ready_validator.manifest import (
+    MANIFEST_ENV,
+    SyncManifest,
+    default_manifest_path,
+    hash_file,
+)
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    with SyncManifest(str(tmp_path / "manifest.db")) as manifest:
+        yield manifest
+
+
+@pytest.fixture
+def local_file(tmp_path):
+    path = tmp_path / "file.mrc"
+    path.write_bytes(b"x" * 100)
+    return str(path)
+
+
+def test_manifest_record(manifest, local_file):
+    file = RemoteFile("file.mrc", 100, 1700000000.0)
+    assert manifest.get("eastview", "file.mrc") is None
+    assert manifest.is_current("eastview", file) is False
+    manifest.record("eastview", file, local_file, "abc")
+    entry = manifest.get("eastview", "file.mrc")
+    assert entry["size"] == 100
+    assert entry["sha256"] == "abc"
+    assert entry["local_path"] == local_file
+    assert manifest.is_current("eastview", file) is True
+    assert manifest.is_current("leila", file) is False
+
+
+@pytest.mark.parametrize(
+    "changed",
+    [RemoteFile("file.mrc", 101, 1700000000.0), RemoteFile("file.mrc", 100, 1.0)],
+)
+def test_manifest_changed_file(manifest, local_file, changed):
+    manifest.record("eastview", RemoteFile("file.mrc", 100, 1700000000.0), local_file)
+    assert manifest.is_current("eastview", changed) is False
+    manifest.record("eastview", changed, local_file)
+    assert manifest.is_current("eastview", changed) is True
+
+
+def test_manifest_deleted_file(manifest, local_file):
+    file = RemoteFile("file.mrc", 100, 1700000000.0)
+    manifest.record("eastview", file, local_file)
+    os.remove(local_file)
+    assert manifest.is_current("eastview", file) is False
+
+
+def test_manifest_persists(tmp_path, local_file):
+    path = str(tmp_path / "manifest.db")
+    file = RemoteFile("file.mrc", 100, 1700000000.0)
+    with SyncManifest(path) as manifest:
+        manifest.record("eastview", file, local_file)
+    with SyncManifest(path) as manifest:
+        assert manifest.is_current("eastview", file) is True
+
+
+def test_default_manifest_path(tmp_path, monkeypatch):
+    monkeypatch.setenv("USERPROFILE", str(tmp_path))
+    monkeypatch.delenv(MANIFEST_ENV, raising=False)
+    assert default_manifest_path() == str(
+        tmp_path / "github/RL-shelf-ready-validation/temp/sync_manifest.db"
+    )
+    monkeypatch.setenv(MANIFEST_ENV, "manifest.db")
+    assert default_manifest_path() == "manifest.db"
+
+
+def test_hash_file(tmp_path):
+    file = tmp_path / "file.mrc"
+    file.write_bytes(b"")
+    assert hash_file(str(file)) == (
+        "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"
+    )
@@ -0,0 +1,115 @@
+import io
+import pickle
+import pytest
+from bookops_marc import SierraBibReader
+from shelf_ready_validator.mapped import MappedRecord, read_mapped_records
+from shelf_ready_validator.translate import VendorRecord, read_marc_records
+from shelf_ready_validator.validate import validate_records
+
+
+@pytest.fixture
+def record_pairs():
+    return list(
+        zip(
+            read_marc_records("tests/test.mrc"),
+            read_marc_records("tests/test.mrc", backend="mmap"),
+        )
+    )
+
+
+@pytest.fixture
+def mapped_record():
+    with open("tests/test.mrc", "rb") as fh:
+        length = int(fh.read(5))
+        fh.seek(0)
+        return MappedRecord(fh.read(length))
+
+
+def test_read_mapped_records():
+    records = list(read_mapped_records("tests/test.mrc"))
+    assert len(records) == 10
+    assert all(isinstance(record, MappedRecord) for record in records)
+
+
+def test_read_mapped_records_empty_file(tmp_path):
+    file = tmp_path / "empty.mrc"
+    file.write_bytes(b"")
+    assert list(read_mapped_records(str(file))) == []
+
+
+@pytest.mark.parametrize(
+    "data,message",
+    [
+        (b"00000" + b" " * 21, "Invalid record length b'00000'"),
+        (b"00010" + b" " * 21, "Invalid record length b'00010'"),
+        (b"0abcd" + b" " * 21, "Invalid record length b'0abcd'"),
+        (b"00100" + b" " * 21, "Truncated record"),
+    ],
+)
+def test_read_mapped_records_corrupt_leader(tmp_path, data, message):
+    file = tmp_path / "corrupt.mrc"
+    valid = open("tests/test.mrc", "rb").read()
+    file.write_bytes(valid + data)
+    records = read_mapped_records(str(file))
+    for _ in range(10):
+        next(records)
+    with pytest.raises(ValueError, match=f"{message} at byte {len(valid)}"):
+        next(records)
+
+
+def test_mapped_record_fields_match(record_pairs):
+    for record, mapped in record_pairs:
+        assert mapped.leader == str(record.leader)
+        assert [str(f) for f in mapped.fields] == [str(f) for f in record.fields]
+        assert mapped["001"].data == record["001"].data
+        assert mapped.as_marc() == record.as_marc()
+
+
+def test_mapped_record_lazy_decoding(mapped_record):
+    assert mapped_record._fields == {}
+    mapped_record["960"]
+    assert [f.tag for f in mapped_record._fields.values()] == ["960"]
+
+
+def test_mapped_record_missing_field(mapped_record):
+    assert "999" not in mapped_record
+    assert mapped_record.get("999") is None
+    with pytest.raises(KeyError):
+        mapped_record["999"]
+
+
+def test_mapped_record_vendor_record_match(record_pairs):
+    for record, mapped in record_pairs:
+        r = VendorRecord(record)
+        m = VendorRecord(mapped)
+        assert m.dict_input == r.dict_input
+        assert m.material_type == r.material_type
+
+
+def test_mapped_record_marc8(marc8_record):
+    record = next(iter(SierraBibReader(io.BytesIO(marc8_record))))
+    mapped = MappedRecord(marc8_record)
+    assert [str(f) for f in mapped.fields] == [str(f) for f in record.fields]
+    assert VendorRecord(mapped).dict_input["invoice_number"] == "\xc9tude"
+    assert VendorRecord(mapped).dict_input == VendorRecord(record).dict_input
+
+
+def test_mapped_record_pickle(mapped_record):
+    unpickled = pickle.loads(pickle.dumps(mapped_record))
+    assert unpickled.as_marc() == mapped_record.as_marc()
+
+
+def test_mapped_record_str(mapped_record):
+    assert str(mapped_record) == str(next(read_marc_records("tests/test.mrc")))
+
+
+def test_validate_mapped_records_with_workers():
+    serial = list(validate_records(enumerate(read_marc_records("tests/test.mrc"), 1)))
+    mapped = list(
+        validate_records(
+            enumerate(read_marc_records("tests/test.mrc", backend="mmap"), 1),
+            workers=2,
+            chunk_size=3,
+        )
+    )
+    assert mapped == serial
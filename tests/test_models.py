@@ -1,7 +1,20 @@
+import json
+import os
+import subprocess
+import sys
 import pytest
 from pydantic import ValidationError
 from contextlib import nullcontext as does_not_raise
-from shelf_ready_validator.models import MonographRecord, OtherMaterialRecord
+from shelf_ready_validator.models import (
+    ITEM_LOCATIONS,
+    LOCATION_RULES_ENV,
+    ORDER_LOCATIONS,
+    VALID_LOCATION_COMBINATIONS,
+    MonographRecord,
+    OtherMaterialRecord,
+    load_location_codes,
+    load_location_rules,
+)
 
 
 def test_monograph_record_valid(valid_rl_monograph_record):
@@ -47,3 +60,116 @@ def test_monograph_empty_items(valid_rl_monograph_record):
     with pytest.raises(ValidationError) as e:
         MonographRecord(**valid_rl_monograph_record)
     assert e.value.errors()[0]["type"] == "missing"
+
+
+def test_location_rules_default():
+    rules = load_location_rules()
+    assert len(rules) == 19
+    assert ("rcmb2", "2", "MAB") in rules
+    assert (None, None, "MAL") in rules
+    assert rules == VALID_LOCATION_COMBINATIONS
+
+
+def test_location_rules_from_file(tmp_path, monkeypatch):
+    rules_file = tmp_path / "rules.json"
+    rules_file.write_text(
+        json.dumps(
+            {
+                "valid_combinations": [
+                    {
+                        "item_location": "rcxx2",
+                        "item_type": "2",
+                        "order_location": "MAX",
+                    }
+                ]
+            }
+        )
+    )
+    assert load_location_rules(str(rules_file)) == frozenset([("rcxx2", "2", "MAX")])
+    monkeypatch.setenv(LOCATION_RULES_ENV, str(rules_file))
+    assert load_location_rules() == frozenset([("rcxx2", "2", "MAX")])
+
+
+def test_location_codes_default():
+    item_locations, order_locations = load_location_codes()
+    assert item_locations == ITEM_LOCATIONS
+    assert order_locations == ORDER_LOCATIONS
+    assert item_locations[0] == "rcmb2"
+    assert len(item_locations) == 9
+    assert "PAD" in order_locations
+    assert len(order_locations) == 11
+
+
+def test_location_codes_from_file(tmp_path):
+    rules_file = tmp_path / "rules.json"
+    rules_file.write_text(
+        json.dumps(
+            {
+                "item_locations": ["rcyy2"],
+                "order_locations": ["MAY"],
+                "valid_combinations": [
+                    {
+                        "item_location": "rcxx2",
+                        "item_type": "2",
+                        "order_location": "MAX",
+                    },
+                    {"item_location": None, "item_type": None, "order_location": "MAX"},
+                ],
+            }
+        )
+    )
+    assert load_location_codes(str(rules_file)) == (("rcyy2", "rcxx2"), ("MAY", "MAX"))
+
+
+def test_new_location_codes_from_rules_file(tmp_path):
+    rules_file = tmp_path / "rules.json"
+    rules_file.write_text(
+        json.dumps(
+            {
+                "valid_combinations": [
+                    {
+                        "item_location": "rcxx2",
+                        "item_type": "2",
+                        "order_location": "MAX",
+                    }
+                ]
+            }
+        )
+    )
+    script = (
+        "from pydantic import TypeAdapter\n"
+        "from shelf_ready_validator import models\n"
+        "print(TypeAdapter(models.ItemLocation).validate_python('rcxx2'))\n"
+        "print(TypeAdapter(models.OrderLocation).validate_python('MAX'))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        env={**os.environ, LOCATION_RULES_ENV: str(rules_file)},
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["rcxx2", "MAX"]
+
+
+def test_order_location_error_message(valid_rl_monograph_record):
+    valid_rl_monograph_record["order_location"] = 123
+    with pytest.raises(ValidationError) as e:
+        MonographRecord(**valid_rl_monograph_record)
+    error = next(
+        error for error in e.value.errors() if error["loc"] == ("order_location",)
+    )
+    assert error["type"] == "literal_error"
+    assert error["msg"] == (
+        "Input should be 'MAB', 'MAF', 'MAG', 'MAL', 'MAP', 'MAS', 'PAD', 'PAH', "
+        "'PAM', 'PAT' or 'SC'"
+    )
+
+
+def test_monograph_location_combo_many_items(valid_rl_monograph_record):
+    item = valid_rl_monograph_record["items"][0]
+    valid_rl_monograph_record["items"] = [dict(item) for _ in range(10)]
+    valid_rl_monograph_record["items"][7]["item_type"] = "55"
+    with pytest.raises(ValidationError) as e:
+        MonographRecord(**valid_rl_monograph_record)
+    assert [error["loc"][0] for error in e.value.errors()] == ["7"]
@@ -0,0 +1,154 @@
+import io
+import json
+import pytest
+from click.testing import CliRunner
+from rich.console import Console
+from shelf_ready_validator import cli
+from shelf_ready_validator.output import (
+    JsonResultPrinter,
+    ResultPrinter,
+    get_result_printer,
+)
+
+
+@pytest.fixture
+def valid_report():
+    return {
+        "vendor_code": "EVP",
+        "record_number": 1,
+        "control_number": "on1234567890",
+        "valid": True,
+    }
+
+
+@pytest.fixture
+def invalid_report():
+    return {
+        "vendor_code": "EVP",
+        "record_number": 2,
+        "control_number": "on1234567891",
+        "valid": False,
+        "error_count": 1,
+    }
+
+
+@pytest.fixture
+def errors():
+    return [{"msg": "Field required", "input": {"a": 1}, "loc": "949$i"}]
+
+
+def test_result_printer(valid_report, invalid_report, errors):
+    console = Console(file=io.StringIO(), width=200)
+    printer = ResultPrinter(console)
+    printer.report(valid_report, [])
+    printer.report(invalid_report, errors)
+    assert console.file.getvalue().splitlines() == [
+        "",
+        "Record #1 (control_no on1234567890) is valid.",
+        "",
+        "Record #2 contains 1 error(s)",
+        "        Field required: {'a': 1} 949$i",
+    ]
+
+
+def test_result_printer_quiet(valid_report, invalid_report, errors):
+    console = Console(file=io.StringIO())
+    printer = ResultPrinter(console, quiet=True)
+    printer.report(valid_report, [])
+    printer.report(invalid_report, errors)
+    printer.raw({**invalid_report, "errors": errors})
+    printer.summary("File contains 2 record(s)", {})
+    assert console.file.getvalue() == "File contains 2 record(s)\n"
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 256])
+def test_json_result_printer(valid_report, invalid_report, errors, batch_size):
+    stream = io.StringIO()
+    console = Console(file=io.StringIO())
+    with JsonResultPrinter(stream, console, batch_size=batch_size) as printer:
+        printer.message("Checking all records...")
+        printer.report(valid_report, [])
+        printer.report(invalid_report, errors)
+        printer.raw({**invalid_report, "errors": errors})
+        printer.summary("File contains 2 record(s)", {"records": 2})
+    assert [json.loads(line) for line in stream.getvalue().splitlines()] == [
+        {**valid_report, "errors": []},
+        {**invalid_report, "errors": errors},
+        {
+            "record_number": 2,
+            "control_number": "on1234567891",
+            "valid": False,
+            "errors": errors,
+        },
+        {"records": 2},
+    ]
+    assert console.file.getvalue() == "Checking all records...\n"
+
+
+def test_json_result_printer_quiet(valid_report):
+    stream = io.StringIO()
+    with JsonResultPrinter(stream, quiet=True) as printer:
+        printer.report(valid_report, [])
+        printer.summary("File contains 1 record(s)", {"records": 1})
+    assert stream.getvalue() == '{"records": 1}\n'
+
+
+def test_json_result_printer_error(valid_report):
+    class BrokenStream(io.StringIO):
+        def write(self, s):
+            raise BrokenPipeError("closed")
+
+    printer = JsonResultPrinter(BrokenStream(), batch_size=1)
+    printer.report(valid_report, [])
+    with pytest.raises(BrokenPipeError):
+        printer.close()
+
+
+def test_get_result_printer():
+    console = Console(file=io.StringIO())
+    assert type(get_result_printer("text", console)) is ResultPrinter
+    json_printer = get_result_printer("json", console, quiet=True)
+    assert isinstance(json_printer, JsonResultPrinter)
+    assert json_printer.quiet is True
+    json_printer.close()
+    with pytest.raises(ValueError):
+        get_result_printer("html", console)
+
+
+def test_cli_json_output():
+    result = CliRunner(mix_stderr=False).invoke(
+        cli,
+        ["--vendor", "eastview", "--file", "tests/test.mrc", "--output", "json"]
+        + ["validate-all"],
+    )
+    assert result.exit_code == 0, result.stderr
+    lines = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [line["record_number"] for line in lines] == list(range(1, 11))
+    assert lines[0]["valid"] is True
+    assert lines[0]["errors"] == []
+    assert all(line["error_count"] for line in lines[1:])
+    assert "Checking all records..." in result.stderr
+
+
+def test_cli_json_validate_brief():
+    result = CliRunner(mix_stderr=False).invoke(
+        cli,
+        ["--vendor", "eastview", "--file", "tests/test.mrc", "--output", "json"]
+        + ["validate-brief"],
+    )
+    assert result.exit_code == 0, result.stderr
+    summary = json.loads(result.stdout)
+    assert summary["file"] == "test.mrc"
+    assert summary["records"] == 10
+    assert summary["valid"] + summary["invalid"] == 10
+    assert len(summary["invalid_records"]) == summary["invalid"]
+
+
+@pytest.mark.parametrize("command", ["validate-all", "validate-raw"])
+def test_cli_quiet(command):
+    result = CliRunner().invoke(
+        cli,
+        ["--vendor", "eastview", "--file", "tests/test.mrc", "--quiet", command],
+    )
+    assert result.exit_code == 0, result.output
+    assert "Record" not in result.output
@@ -0,0 +1,105 @@
+import time
+
+import pytest
+
+from shelf_ready_validator.cache import ResultCache
+from shelf_ready_validator.pipeline import pipeline_map
+from shelf_ready_validator.translate import read_marc_records
+from shelf_ready_validator.validate import validate_files, validate_records
+
+
+def square(chunk):
+    return [n * n for n in chunk]
+
+
+def slow_square(chunk):
+    time.sleep(0.05)
+    return square(chunk)
+
+
+def fail_on_three(chunk):
+    if 3 in chunk:
+        raise ValueError("bad chunk")
+    return chunk
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_pipeline_map_order(workers):
+    chunks = [[n, n + 1] for n in range(0, 40, 2)]
+    assert list(pipeline_map(square, chunks, workers, queue_size=1)) == [
+        square(chunk) for chunk in chunks
+    ]
+
+
+def test_pipeline_map_empty():
+    assert list(pipeline_map(square, [])) == []
+
+
+def test_pipeline_map_func_error():
+    with pytest.raises(ValueError, match="bad chunk"):
+        list(pipeline_map(fail_on_three, [[1], [2], [3], [4]]))
+
+
+def test_pipeline_map_read_error():
+    def chunks():
+        yield [1]
+        raise OSError("file went away")
+
+    with pytest.raises(OSError, match="file went away"):
+        list(pipeline_map(square, chunks()))
+
+
+def test_pipeline_map_stops_reading_when_closed():
+    read = []
+
+    def chunks():
+        for n in range(1000):
+            read.append(n)
+            yield [n]
+
+    results = pipeline_map(square, chunks(), queue_size=2)
+    assert next(results) == [0]
+    results.close()
+    assert len(read) < 20
+
+
+def test_pipeline_map_overlaps_stages():
+    def slow_chunks():
+        for n in range(10):
+            time.sleep(0.05)
+            yield [n]
+
+    start = time.perf_counter()
+    for _ in pipeline_map(slow_square, slow_chunks()):
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    # the three stages take 0.5s each; run one after another they take 1.5s
+    assert elapsed < 1.0
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_validate_records_async_pipeline(workers):
+    records = enumerate(read_marc_records("tests/test.mrc"), 1)
+    expected = list(validate_records(records))
+    records = enumerate(read_marc_records("tests/test.mrc"), 1)
+    results = validate_records(records, workers, chunk_size=3, pipeline="async")
+    assert list(results) == expected
+
+
+def test_validate_files_async_pipeline():
+    files = ["tests/test.mrc", "tests/test.mrc"]
+    assert list(validate_files(files, chunk_size=4, pipeline="async")) == list(
+        validate_files(files)
+    )
+
+
+def test_validate_records_async_pipeline_cached():
+    expected = list(validate_records(enumerate(read_marc_records("tests/test.mrc"), 1)))
+    with ResultCache() as cache:
+        for _ in range(2):
+            records = enumerate(read_marc_records("tests/test.mrc"), 1)
+            results = validate_records(
+                records, chunk_size=3, cache=cache, pipeline="async"
+            )
+            assert list(results) == expected
+        assert cache.hits >= len(expected)
@@ -0,0 +1,126 @@
+import json
+import pstats
+import pytest
+from click.testing import CliRunner
+from shelf_ready_validator import cli, profiling
+from shelf_ready_validator.profiling import Profiler, StageTime
+
+
+@pytest.fixture
+def profiler():
+    profiler = profiling.enable()
+    yield profiler
+    profiling.disable()
+
+
+def test_stage_is_noop_when_disabled():
+    assert profiling.active() is None
+    with profiling.stage("validate"):
+        pass
+    records = [1, 2, 3]
+    assert profiling.timed("read", records) is records
+
+
+def test_stage(profiler):
+    with profiling.stage("translate", 100):
+        pass
+    with profiling.stage("translate", 50):
+        pass
+    assert profiler.stages["translate"].calls == 150
+    assert profiler.stages["translate"].wall >= 0
+
+
+def test_timed(profiler):
+    assert list(profiling.timed("read", iter("abc"))) == ["a", "b", "c"]
+    assert profiler.records == 3
+
+
+def test_collect_does_not_change_active_profiler(profiler):
+    with profiling.collect() as collector:
+        assert profiling.active() is collector
+        with profiling.stage("validate", 10):
+            pass
+    assert profiling.active() is profiler
+    assert "validate" not in profiler.stages
+    profiler.merge(collector.stages)
+    assert profiler.stages["validate"].calls == 10
+
+
+def test_merge():
+    profiler = Profiler()
+    profiler.merge({"validate": StageTime(10, 1.0, 0.5)})
+    profiler.merge({"validate": StageTime(5, 0.5, 0.25), "cache": StageTime(1)})
+    assert profiler.as_dict(["validate-all"])["stages"] == {
+        "validate": {"calls": 15, "wall_seconds": 1.5, "cpu_seconds": 0.75},
+        "cache": {"calls": 1, "wall_seconds": 0.0, "cpu_seconds": 0.0},
+    }
+
+
+def test_lines():
+    profiler = Profiler()
+    profiler.add("print", 0.2, 0.1, 4)
+    profiler.add("read", 0.4, 0.3, 4)
+    lines = profiler.lines()
+    assert lines[0].startswith("\nProfile of 4 record(s) in ")
+    assert lines[1].split() == ["stage", "calls", "wall", "s", "cpu", "s"] + [
+        "ms/record",
+        "%",
+        "wall",
+    ]
+    assert [line.split()[:2] for line in lines[2:]] == [["read", "4"], ["print", "4"]]
+    assert lines[2].split()[2:4] == ["0.400", "0.300"]
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_cli_profile(workers):
+    result = CliRunner().invoke(
+        cli,
+        ["--vendor", "eastview", "--file", "tests/test.mrc", "--no-cache"]
+        + ["--workers", workers, "--profile", "validate-all"],
+    )
+    assert result.exit_code == 0, result.output
+    lines = result.output.splitlines()
+    start = lines.index(next(line for line in lines if line.startswith("Profile")))
+    assert lines[start].startswith("Profile of 10 record(s) in ")
+    assert {line.split()[0]: line.split()[1] for line in lines[start + 2 :]} == {
+        "read": "10",
+        "translate": "10",
+        "validate": "10",
+        "format_errors": "9",
+        "print": "10",
+    }
+    assert profiling.active() is None
+
+
+def test_cli_profile_json_and_stats(tmp_path):
+    metrics = tmp_path / "metrics.json"
+    stats = tmp_path / "run.prof"
+    result = CliRunner(mix_stderr=False).invoke(
+        cli,
+        ["--vendor", "eastview", "--file", "tests/test.mrc", "--no-cache"]
+        + ["--output", "json", "--profile-json", str(metrics)]
+        + ["--profile-stats", str(stats), "validate-all"],
+    )
+    assert result.exit_code == 0, result.stderr
+    assert len(result.stdout.splitlines()) == 10
+    assert "Profile of 10 record(s)" in result.stderr
+    data = json.loads(metrics.read_text())
+    assert data["records"] == 10
+    assert data["stages"]["validate"]["calls"] == 10
+    assert list(data["stages"]) == [
+        "read",
+        "translate",
+        "validate",
+        "format_errors",
+        "print",
+    ]
+    assert pstats.Stats(str(stats)).total_calls > 0
+
+
+def test_cli_without_profile():
+    result = CliRunner().invoke(
+        cli,
+        ["--vendor", "eastview", "--file", "tests/test.mrc", "validate-brief"],
+    )
+    assert result.exit_code == 0, result.output
+    assert "Profile of" not in result.output
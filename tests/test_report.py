@@ -0,0 +1,230 @@
+import json
+import threading
+import time
+import pandas as pd
+import pytest
+from shelf_ready_validator import report
+from shelf_ready_validator.report import (
+    REPORT_COLUMNS,
+    REPORT_HEADER,
+    AsyncReportWriter,
+    CsvReportWriter,
+    ReportWriter,
+    JsonlReportWriter,
+    ParquetReportWriter,
+    get_report_writer,
+    report_chunks,
+)
+
+
+@pytest.fixture
+def reports():
+    valid = {
+        "vendor_code": "EVP",
+        "record_number": 1,
+        "control_number": "on1234567890",
+        "valid": True,
+    }
+    invalid = {
+        "vendor_code": "EVP",
+        "record_number": 2,
+        "control_number": "on1234567891",
+        "valid": False,
+        "error_count": 1,
+        "missing_field_count": 1,
+        "missing_fields": ["949$i"],
+        "extra_field_count": 0,
+        "extra_fields": [],
+        "invalid_field_count": 0,
+        "invalid_fields": [],
+        "other_errors": [],
+        "other_error_fields": [],
+    }
+    return [valid, invalid]
+
+
+def test_report_columns_match_output(test_output_data):
+    assert REPORT_COLUMNS == test_output_data[0]
+
+
+def test_report_chunks_columns(reports):
+    chunks = list(report_chunks(reports, "test.mrc", "2024-01-01 12:00:00"))
+    assert len(chunks) == 1
+    output_df = chunks[0]
+    assert list(output_df.columns) == ["validation-date", "filename"] + REPORT_COLUMNS
+    assert (
+        output_df.values.tolist()[0]
+        == [
+            "2024-01-01 12:00:00",
+            "test.mrc",
+            "EVP",
+            "1",
+            "on1234567890",
+            "True",
+        ]
+        + ["None"] * 9
+    )
+    assert output_df.loc[1, "missing_fields"] == "['949$i']"
+
+
+def test_report_chunks_size(reports):
+    chunks = list(report_chunks(reports * 5, "test.mrc", "2024-01-01", chunk_size=3))
+    assert [len(chunk) for chunk in chunks] == [3, 3, 3, 1]
+
+
+def test_report_chunks_counts_match_across_chunks(reports):
+    chunks = list(
+        report_chunks(reports + reports[1:], "test.mrc", "2024-01-01", chunk_size=2)
+    )
+    assert len(chunks) == 2
+    counts = [
+        "record_number",
+        "error_count",
+        "missing_field_count",
+        "extra_field_count",
+        "invalid_field_count",
+    ]
+    assert chunks[0].loc[1, counts].tolist() == ["2", "1", "1", "0", "0"]
+    assert chunks[1].loc[0, counts].tolist() == ["2", "1", "1", "0", "0"]
+
+
+def test_report_chunks_empty():
+    assert list(report_chunks([], "test.mrc", "2024-01-01")) == []
+
+
+def test_report_chunks_reads_one_chunk_at_a_time(reports):
+    read = []
+
+    def stream():
+        for n in range(10):
+            read.append(n)
+            yield reports[n % 2]
+
+    chunks = report_chunks(stream(), "test.mrc", "2024-01-01", chunk_size=4)
+    next(chunks)
+    assert len(read) == 4
+    next(chunks)
+    assert len(read) == 8
+
+
+@pytest.fixture
+def report_df(reports):
+    return next(report_chunks(reports, "test.mrc", "2024-01-01 12:00:00"))
+
+
+def test_csv_report_writer_appends(tmp_path, report_df):
+    out = str(tmp_path / "report.csv")
+    for _ in range(2):
+        with CsvReportWriter(out) as writer:
+            writer.write(report_df)
+            writer.write(report_df)
+    output_df = pd.read_csv(out, dtype="string", keep_default_na=False)
+    assert list(output_df.columns) == REPORT_HEADER
+    assert len(output_df) == 8
+    assert output_df.values.tolist()[:2] == report_df.values.tolist()
+
+
+def test_jsonl_report_writer(tmp_path, report_df):
+    out = tmp_path / "report.jsonl"
+    with JsonlReportWriter(str(out)) as writer:
+        writer.write(report_df)
+        writer.write(report_df)
+    lines = out.read_text().splitlines()
+    assert len(lines) == 4
+    assert json.loads(lines[1])["missing_fields"] == "['949$i']"
+    assert list(json.loads(lines[0])) == REPORT_HEADER
+
+
+def test_parquet_report_writer_partitions(tmp_path, report_df):
+    pq = pytest.importorskip("pyarrow.parquet")
+    for _ in range(2):
+        with ParquetReportWriter(
+            str(tmp_path), "eastview", "2024-01-01", "test.mrc"
+        ) as writer:
+            writer.write(report_df)
+            writer.write(report_df)
+    partition = tmp_path / "vendor=eastview" / "date=2024-01-01"
+    files = list(partition.glob("test-*.parquet"))
+    assert len(files) == 2
+    assert pq.read_table(files[0]).num_rows == 4
+    dataset = pq.read_table(tmp_path)
+    assert dataset.num_rows == 8
+    assert set(dataset.column("vendor").to_pylist()) == {"eastview"}
+    assert dataset.column("control_number").to_pylist()[:2] == [
+        "on1234567890",
+        "on1234567891",
+    ]
+
+
+def test_get_report_writer_sheet(monkeypatch, report_df):
+    calls = []
+    monkeypatch.setattr(
+        report.SheetWriter, "append", lambda self, values: calls.append(values)
+    )
+    with get_report_writer("sheet") as writer:
+        writer.write(report_df)
+        writer.write(report_df)
+    assert calls == [report_df.values.tolist()] * 2
+    assert writer.sheet_writer.spreadsheet_id == report.SPREADSHEET_ID
+    assert writer.sheet_writer.range_name == report.SHEET_RANGE
+
+
+def test_get_report_writer_requires_out():
+    with pytest.raises(ValueError):
+        get_report_writer("csv")
+
+
+def test_get_report_writer_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        get_report_writer("xlsx", str(tmp_path))
+
+
+def test_report_chunks_filename_from_report(reports):
+    reports[1]["filename"] = "remote.mrc"
+    output_df = next(report_chunks(reports, "none", "2024-01-01"))
+    assert output_df["filename"].tolist() == ["none", "remote.mrc"]
+
+
+class SlowWriter(ReportWriter):
+    def __init__(self, fail=False):
+        self.written = []
+        self.closed = False
+        self.fail = fail
+        self.threads = set()
+
+    def write(self, output_df):
+        time.sleep(0.05)
+        self.threads.add(threading.current_thread().name)
+        if self.fail:
+            raise OSError("sheet unavailable")
+        self.written.append(output_df)
+
+    def close(self):
+        self.closed = True
+
+    def summary(self):
+        return f"{len(self.written)} chunks"
+
+
+def test_async_report_writer(report_df):
+    slow = SlowWriter()
+    start = time.perf_counter()
+    with AsyncReportWriter(slow, queue_size=5) as writer:
+        for _ in range(4):
+            writer.write(report_df)
+        # chunks are queued, not written, while the next ones are built
+        assert time.perf_counter() - start < 0.15
+    assert len(slow.written) == 4
+    assert slow.closed
+    assert threading.current_thread().name not in slow.threads
+    assert writer.summary() == "4 chunks"
+
+
+def test_async_report_writer_error(report_df):
+    slow = SlowWriter(fail=True)
+    with pytest.raises(OSError, match="sheet unavailable"):
+        with AsyncReportWriter(slow, queue_size=1) as writer:
+            for _ in range(5):
+                writer.write(report_df)
+    assert slow.closed
+    assert slow.written == []
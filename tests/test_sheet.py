@@ -0,0 +1,113 @@
+import json
+import httplib2
+import pytest
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from shelf_ready_validator.sheet import SheetWriter
+
+
+class FakeSheetsHttp:
+    """
+    Stands in for the Sheets API. Responds to each request with the next
+    status in statuses (200 once they run out) and keeps the request bodies.
+    """
+
+    def __init__(self, statuses=()):
+        self.statuses = list(statuses)
+        self.bodies = []
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        status = self.statuses.pop(0) if self.statuses else 200
+        self.bodies.append(json.loads(body))
+        if status != 200:
+            content = {"error": {"code": status, "message": "error"}}
+        else:
+            rows = len(self.bodies[-1]["values"])
+            content = {"updates": {"updatedRows": rows}}
+        return httplib2.Response({"status": status}), json.dumps(content).encode()
+
+
+@pytest.fixture
+def sleeps():
+    return []
+
+
+def make_writer(http, sleeps, **kwargs):
+    return SheetWriter(
+        "spreadsheet",
+        "RecordOutput!A1:M10000",
+        service=build("sheets", "v4", http=http),
+        sleep=sleeps.append,
+        **kwargs,
+    )
+
+
+def test_sheet_writer_append(sleeps):
+    http = FakeSheetsHttp()
+    writer = make_writer(http, sleeps)
+    results = writer.append([["a", "1"], ["b", "2"]])
+    assert results == [{"updates": {"updatedRows": 2}}]
+    assert http.bodies == [
+        {
+            "majorDimension": "ROWS",
+            "range": "RecordOutput!A1:M10000",
+            "values": [["a", "1"], ["b", "2"]],
+        }
+    ]
+    assert writer.rows_written == 2
+    assert sleeps == []
+
+
+def test_sheet_writer_batches_by_rows(sleeps):
+    http = FakeSheetsHttp()
+    writer = make_writer(http, sleeps, batch_size=2)
+    writer.append([[str(n)] for n in range(5)])
+    assert [len(body["values"]) for body in http.bodies] == [2, 2, 1]
+    assert writer.requests == 3
+    assert writer.rows_written == 5
+
+
+def test_sheet_writer_batches_by_bytes(sleeps):
+    http = FakeSheetsHttp()
+    writer = make_writer(http, sleeps, max_bytes=30)
+    writer.append([["x" * 10] for _ in range(5)])
+    assert [len(body["values"]) for body in http.bodies] == [2, 2, 1]
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_sheet_writer_retries(sleeps, status):
+    http = FakeSheetsHttp([status, status, 200])
+    writer = make_writer(http, sleeps, backoff=0.5)
+    results = writer.append([["a"]])
+    assert results == [{"updates": {"updatedRows": 1}}]
+    assert sleeps == [0.5, 1.0]
+    assert writer.retries == 2
+    assert "(2 retried)" in writer.summary()
+
+
+def test_sheet_writer_gives_up(sleeps):
+    http = FakeSheetsHttp([429] * 4)
+    writer = make_writer(http, sleeps, max_retries=3)
+    with pytest.raises(HttpError):
+        writer.append([["a"]])
+    assert sleeps == [1.0, 2.0, 4.0]
+    assert writer.rows_written == 0
+
+
+def test_sheet_writer_raises_client_errors(sleeps):
+    http = FakeSheetsHttp([400])
+    writer = make_writer(http, sleeps)
+    with pytest.raises(HttpError):
+        writer.append([["a"]])
+    assert sleeps == []
+
+
+def test_sheet_writer_reuses_service(sleeps):
+    http = FakeSheetsHttp()
+    writer = make_writer(http, sleeps)
+    service = writer.service
+    writer.append([["a"]])
+    writer.append([["b"]])
+    assert writer.service is service
+    assert writer.rows_written == 2
+    assert writer.summary().startswith("Wrote 2 row(s) to sheet in 2 request(s)")
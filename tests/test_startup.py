@@ -0,0 +1,79 @@
+import re
+import shutil
+import subprocess
+import sys
+
+IMPORT_BUDGET_MS = 500
+"""Cumulative time allowed for `import shelf_ready_validator`"""
+
+HEAVY_MODULES = {
+    "pandas",
+    "numpy",
+    "pyarrow",
+    "paramiko",
+    "googleapiclient",
+    "google_auth_oauthlib",
+    "pydantic",
+}
+"""Dependencies that should only be imported by the commands that use them"""
+
+IMPORT_LINE = re.compile(
+    r"^import time:\s+\d+ \|\s+(?P<cumulative>\d+) \| \s*(?P<module>\S+)$"
+)
+
+
+def import_times(*args):
+    """
+    Runs python -X importtime with args and returns the cumulative import time
+    of each module in microseconds
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            times[match["module"]] = int(match["cumulative"])
+    return times
+
+
+def heavy_modules(times):
+    return HEAVY_MODULES & {module.split(".")[0] for module in times}
+
+
+def test_import_does_not_load_heavy_modules():
+    times = import_times("-c", "import shelf_ready_validator")
+    assert "shelf_ready_validator" in times
+    assert heavy_modules(times) == set()
+
+
+def test_read_input_does_not_load_heavy_modules(tmp_path):
+    shutil.copy("tests/test.mrc", tmp_path / "test.mrc")
+    times = import_times(
+        "-c",
+        "from shelf_ready_validator import cli; cli()",
+        "--vendor",
+        "eastview",
+        "--file",
+        str(tmp_path / "test.mrc"),
+        "--record",
+        "1",
+        "read-input",
+    )
+    assert "shelf_ready_validator.translate" in times
+    assert heavy_modules(times) == set()
+
+
+def test_import_time_budget():
+    elapsed = min(
+        import_times("-c", "import shelf_ready_validator")["shelf_ready_validator"]
+        for _ in range(3)
+    )
+    assert elapsed / 1000 < IMPORT_BUDGET_MS, (
+        f"import shelf_ready_validator took {elapsed / 1000:.0f}ms, "
+        f"over the {IMPORT_BUDGET_MS}ms budget"
+    )
@@ -1,4 +1,11 @@
-from shelf_ready_validator.translate import VendorRecord, read_marc_records
+import io
+from bookops_marc import SierraBibReader
+from shelf_ready_validator.index import scan_marc_file
+from shelf_ready_validator.translate import (
+    VendorRecord,
+    extract_record_input,
+    read_marc_records,
+)
 from pymarc import Field, Subfield
 import pytest
 
@@ -102,3 +109,81 @@ def test_convert_invalid_record(stub_record):
     with pytest.raises(KeyError):
         r = VendorRecord(stub_record)
         r.dict_input["bib_call_no_ind1"]
+
+
+def _raw_test_records():
+    with open("tests/test.mrc", "rb") as fh:
+        data = fh.read()
+    return [
+        data[entry.offset : entry.offset + entry.length]
+        for entry in scan_marc_file(io.BytesIO(data))
+    ]
+
+
+@pytest.mark.parametrize("data", _raw_test_records())
+def test_extract_record_input_matches_vendor_record(data):
+    record = next(iter(SierraBibReader(io.BytesIO(data))))
+    r = VendorRecord(record)
+    dict_input, material_type = extract_record_input(data)
+    assert dict_input == r.dict_input
+    assert list(dict_input) == list(r.dict_input)
+    assert material_type == r.material_type
+
+
+@pytest.mark.parametrize(
+    "field",
+    [
+        Field(tag="300", indicators=[" ", " "], subfields=[Subfield("a", "10 pages")]),
+        Field(tag="300", indicators=[" ", " "], subfields=[Subfield("a", "2 volumes")]),
+        Field(tag="300", indicators=[" ", " "], subfields=[Subfield("a", "xi pages")]),
+        Field(
+            tag="650",
+            indicators=[" ", "0"],
+            subfields=[Subfield("a", "foo"), Subfield("v", "Catalogues Raisonnes")],
+        ),
+        Field(
+            tag="949",
+            indicators=[" ", "1"],
+            subfields=[
+                Subfield("z", "8528"),
+                Subfield("a", "ReCAP 23-100000"),
+                Subfield("i", "33433123456789"),
+                Subfield("p", "1.00"),
+                Subfield("l", "rc2ma"),
+            ],
+        ),
+        Field(tag="852", indicators=["0", "1"], subfields=[Subfield("h", "foo")]),
+    ],
+)
+def test_extract_record_input_matches_modified_record(stub_record, field):
+    stub_record.remove_fields("050", field.tag)
+    stub_record.add_ordered_field(field)
+    data = stub_record.as_marc()
+    r = VendorRecord(stub_record)
+    dict_input, material_type = extract_record_input(data)
+    assert dict_input == r.dict_input
+    assert material_type == r.material_type
+
+
+def test_extract_record_input_marc8(marc8_record):
+    data = marc8_record
+    record = next(iter(SierraBibReader(io.BytesIO(data))))
+    r = VendorRecord(record)
+    dict_input, material_type = extract_record_input(data)
+    assert dict_input["invoice_number"] == "\xc9tude"
+    assert dict_input == r.dict_input
+    assert material_type == r.material_type
+
+
+def test_read_marc_records_file_object():
+    with open("tests/test.mrc", "rb") as fh:
+        records = [record.as_marc() for record in read_marc_records(fh)]
+    assert records == [
+        record.as_marc() for record in read_marc_records("tests/test.mrc")
+    ]
+
+
+def test_read_marc_records_file_object_mmap():
+    with open("tests/test.mrc", "rb") as fh:
+        with pytest.raises(ValueError):
+            list(read_marc_records(fh, backend="mmap"))
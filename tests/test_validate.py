@@ -0,0 +1,176 @@
+import copy
+import shutil
+from pydantic import ValidationError
+from pymarc import Field, Subfield
+import pytest
+from shelf_ready_validator.errors import format_errors
+from shelf_ready_validator.models import MonographRecord, OtherMaterialRecord
+from shelf_ready_validator.translate import VendorRecord, read_marc_records
+from shelf_ready_validator.validate import (
+    check_input,
+    get_validator,
+    validate_batch,
+    validate_files,
+    validate_record,
+    validate_records,
+)
+
+
+def test_validate_record_invalid(stub_record):
+    result = validate_record(1, stub_record)
+    assert result["record_number"] == 1
+    assert result["control_number"] == "on1381158740"
+    assert result["vendor_code"] == "EVP"
+    assert result["valid"] is False
+    assert result["error_summary"]["missing_fields"] == ["949"]
+
+
+def test_validate_record_valid(stub_record):
+    stub_record.add_field(
+        Field(
+            tag="949",
+            indicators=[" ", "1"],
+            subfields=[
+                Subfield(code="z", value="8528"),
+                Subfield(code="a", value="ReCAP 23-100000"),
+                Subfield(code="i", value="33433123456789"),
+                Subfield(code="p", value="1.00"),
+                Subfield(code="v", value="EVP"),
+                Subfield(code="h", value="43"),
+                Subfield(code="l", value="rc2ma"),
+                Subfield(code="t", value="55"),
+            ],
+        )
+    )
+    result = validate_record(1, stub_record)
+    assert result["valid"] is True
+    assert result["error_count"] == 0
+    assert result["error_summary"] is None
+
+
+@pytest.mark.parametrize("workers, chunk_size", [(2, 1), (2, 3), (3, 100)])
+def test_validate_records_workers_match_serial(workers, chunk_size):
+    serial = list(validate_records(enumerate(read_marc_records("tests/test.mrc"), 1)))
+    parallel = list(
+        validate_records(
+            enumerate(read_marc_records("tests/test.mrc"), 1),
+            workers=workers,
+            chunk_size=chunk_size,
+        )
+    )
+    assert [r["record_number"] for r in parallel] == list(range(1, 11))
+    assert parallel == serial
+
+
+@pytest.mark.parametrize("workers, chunk_size", [(1, 100), (2, 3), (3, 100)])
+def test_validate_files(tmp_path, workers, chunk_size):
+    shutil.copy("tests/test.mrc", tmp_path / "a.mrc")
+    shutil.copy("tests/test.mrc", tmp_path / "b.mrc")
+    files = [str(tmp_path / "a.mrc"), str(tmp_path / "b.mrc")]
+    serial = list(validate_records(enumerate(read_marc_records("tests/test.mrc"), 1)))
+    results = list(validate_files(files, workers=workers, chunk_size=chunk_size))
+    assert [r.pop("filename") for r in results] == ["a.mrc"] * 10 + ["b.mrc"] * 10
+    assert results == serial * 2
+
+
+def test_validate_files_mmap(tmp_path):
+    shutil.copy("tests/test.mrc", tmp_path / "a.mrc")
+    results = list(validate_files([str(tmp_path / "a.mrc")], backend="mmap"))
+    serial = list(validate_records(enumerate(read_marc_records("tests/test.mrc"), 1)))
+    assert [r.pop("filename") for r in results] == ["a.mrc"] * 10
+    assert results == serial
+
+
+def _model_errors(model, dict_input):
+    try:
+        model(**dict_input)
+    except ValidationError as e:
+        return e.errors()
+    return None
+
+
+def test_check_input_valid(valid_rl_monograph_record, valid_pamphlet_record):
+    assert check_input(valid_rl_monograph_record, "monograph_record") is None
+    assert check_input(valid_pamphlet_record, "pamphlet") is None
+
+
+@pytest.mark.parametrize(
+    "key, value",
+    [
+        ("bib_call_no", "ReCAP 23-12345"),
+        ("order_location", "MAL"),
+        ("invoice_copies", 1),
+        ("bib_vendor_code", "EVIS"),
+        ("foo", "bar"),
+    ],
+)
+def test_check_input_monograph_matches_model(valid_rl_monograph_record, key, value):
+    valid_rl_monograph_record[key] = value
+    valid_rl_monograph_record["items"][1]["library"] = "BL"
+    del valid_rl_monograph_record["items"][0]["item_call_tag"]
+    e = check_input(valid_rl_monograph_record, "monograph_record")
+    assert e.errors() == _model_errors(MonographRecord, valid_rl_monograph_record)
+
+
+@pytest.mark.parametrize(
+    "key, value",
+    [("bib_call_no", "ReCAP 23-000000"), ("library", "NYPL"), ("lcc", None)],
+)
+def test_check_input_other_matches_model(valid_pamphlet_record, key, value):
+    valid_pamphlet_record[key] = value
+    e = check_input(valid_pamphlet_record, "pamphlet")
+    assert e.errors() == _model_errors(OtherMaterialRecord, valid_pamphlet_record)
+
+
+def test_check_input_matches_model_on_test_file():
+    for record in read_marc_records("tests/test.mrc"):
+        r = VendorRecord(record)
+        if r.material_type == "monograph_record":
+            model = MonographRecord
+        else:
+            model = OtherMaterialRecord
+        e = check_input(r.dict_input, r.material_type)
+        expected = _model_errors(model, r.dict_input)
+        assert (e.errors() if e else None) == expected
+
+
+def test_get_validator_does_not_create_instances(valid_rl_monograph_record):
+    output = get_validator(MonographRecord).validate_python(valid_rl_monograph_record)
+    assert not isinstance(output, MonographRecord)
+    assert get_validator(MonographRecord) is get_validator(MonographRecord)
+
+
+def test_validate_batch_matches_check_input(
+    valid_rl_monograph_record, valid_pamphlet_record
+):
+    invalid_monograph = copy.deepcopy(valid_rl_monograph_record)
+    invalid_monograph["order_location"] = "MAL"
+    del invalid_monograph["items"][1]["item_barcode"]
+    invalid_pamphlet = copy.deepcopy(valid_pamphlet_record)
+    invalid_pamphlet["bib_call_no"] = "ReCAP 23-000000"
+    inputs = [
+        valid_rl_monograph_record,
+        invalid_monograph,
+        valid_pamphlet_record,
+        invalid_pamphlet,
+    ] + [
+        VendorRecord(record).dict_input
+        for record in read_marc_records("tests/test.mrc")
+    ]
+    results = validate_batch(inputs)
+    assert len(results) == len(inputs)
+    for dict_input, result in zip(inputs, results):
+        e = check_input(dict_input, dict_input["material_type"])
+        assert result.valid is (e is None)
+        assert result.errors == (e.errors() if e else [])
+
+
+def test_validate_batch_empty():
+    assert validate_batch([]) == []
+
+
+def test_validate_batch_format_errors(valid_rl_monograph_record):
+    del valid_rl_monograph_record["bib_call_no"]
+    result = validate_batch([valid_rl_monograph_record])[0]
+    assert result.valid is False
+    assert format_errors(result.errors)["missing_fields"] == ["852"]